@@ -0,0 +1,101 @@
+"""
+Benchmark de los backends de decodificación de video sobre un clip sintético
+(o uno propio). Mide frames por segundo y tiempo de CPU por frame, incluido
+el de los procesos ffmpeg hijos.
+
+Con --output-size se decodifica ya reducido, como hace el reproductor en ventanas
+más pequeñas que la fuente.
+
+Uso: python benchmarks/bench_decode.py [--codec libx265] [--size 1920x1080] [--video clip.mp4]
+                                       [--output-size 1280x720]
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from DecodeBackend import BACKENDS
+
+def make_clip(path, duration, size, codec, fps=30):
+    """Clip de prueba con testsrc2 de lavfi, sin audio"""
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate={fps}:duration={duration}',
+        '-c:v', codec, '-pix_fmt', 'yuv420p', path
+    ], check=True)
+
+def cpu_seconds():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+def run_backend(name, video_path, max_frames, output_size=None):
+    backend = BACKENDS[name](video_path)
+    if not backend.isOpened():
+        return {'backend': name, 'error': 'no se pudo abrir'}
+    backend.set_output_size(output_size)
+    buffer = np.empty(backend.frame_shape, np.uint8)
+
+    frames = 0
+    cpu_before = cpu_seconds()
+    started = time.perf_counter()
+    while frames < max_frames:
+        ret, _ = backend.read(buffer)
+        if not ret:
+            break
+        frames += 1
+    elapsed = time.perf_counter() - started
+    # Se cierra antes de medir: la CPU de los hijos solo cuenta tras esperarlos
+    backend.release()
+    cpu = cpu_seconds() - cpu_before
+
+    return {
+        'backend': name,
+        'output_size': list(output_size) if output_size else None,
+        'frames': frames,
+        'seconds': round(elapsed, 3),
+        'fps': round(frames / elapsed, 1) if elapsed else None,
+        'cpu_ms_per_frame': round(cpu * 1000 / frames, 3) if frames else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--video', default=None)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--size', default='1280x720')
+    parser.add_argument('--codec', default='libx264')
+    parser.add_argument('--frames', type=int, default=100000)
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS))
+    parser.add_argument('--output-size', default=None)
+    args = parser.parse_args()
+    output_size = tuple(int(v) for v in args.output_size.split('x')) if args.output_size else None
+
+    video_path = args.video
+    tmp_path = None
+    if video_path is None:
+        fd, tmp_path = tempfile.mkstemp(suffix='.mp4')
+        os.close(fd)
+        make_clip(tmp_path, args.duration, args.size, args.codec)
+        video_path = tmp_path
+    try:
+        results = [run_backend(name, video_path, args.frames, output_size) for name in args.backends]
+    finally:
+        if tmp_path:
+            os.unlink(tmp_path)
+    print(json.dumps({
+        'benchmark': 'decode',
+        'video': args.video or f'testsrc2 {args.size} {args.codec}',
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }, indent=2))
+
+if __name__ == '__main__':
+    main()
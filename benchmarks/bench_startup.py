@@ -0,0 +1,94 @@
+"""
+Tiempo hasta la primera ventana: desde que se lanza el intérprete hasta que la
+ventana principal está visible, en procesos nuevos para no heredar imports.
+Comprueba además que decodificación, audio y transcripción no se cargan al arrancar.
+
+Con --max-ms termina con código 1 si la mediana supera el umbral.
+
+Uso: python benchmarks/bench_startup.py [--runs 5] [--max-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Módulos que solo deben importarse al abrir un archivo o generar subtítulos
+DEFERRED_MODULES = ('numpy', 'cv2', 'pygame', 'speech_recognition', 'pydub', 'langdetect',
+                    'deep_translator')
+DEFAULT_MAX_MS = 1500
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+from ui import UserInterface
+from player import VideoPlayer
+imported = time.perf_counter()
+app = QApplication(sys.argv)
+ui = UserInterface(VideoPlayer())
+ui.show()
+app.processEvents()
+shown = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'window_ms': (shown - started) * 1000,
+    'loaded': [m for m in %r if m in sys.modules],
+}), flush=True)
+"""
+
+def measure_once():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SRC_DIR, env.get('PYTHONPATH')]))
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    started = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, '-c', CHILD % (DEFERRED_MODULES,)],
+                            stdout=subprocess.PIPE, env=env, text=True)
+    # Se ignora lo que impriman las bibliotecas al importarse (el saludo de pygame)
+    line = proc.stdout.readline()
+    while line and not line.startswith('{'):
+        line = proc.stdout.readline()
+    # Incluye el arranque del intérprete, que no ve el propio proceso
+    total = (time.perf_counter() - started) * 1000
+    proc.stdout.close()
+    proc.wait()
+    if not line:
+        raise RuntimeError(f"el proceso terminó sin abrir la ventana (código {proc.returncode})")
+    result = json.loads(line)
+    result['total_ms'] = total
+    return result
+
+def run(runs=5):
+    samples = [measure_once() for _ in range(runs)]
+    totals = [s['total_ms'] for s in samples]
+    return {
+        'benchmark': 'startup',
+        'runs': runs,
+        'median_ms': round(statistics.median(totals), 1),
+        'max_ms': round(max(totals), 1),
+        'import_ms': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'window_ms': round(statistics.median(s['window_ms'] for s in samples), 1),
+        'loaded_deferred': sorted({m for s in samples for m in s['loaded']}),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    report = run(args.runs)
+    if args.max_ms is not None:
+        report['threshold_ms'] = args.max_ms
+        report['regression'] = report['median_ms'] > args.max_ms
+    print(json.dumps(report, indent=2))
+    if report.get('regression') or report['loaded_deferred']:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+Suite de benchmarks sin ventana sobre medios sintéticos generados con ffmpeg
+(testsrc2 y un tono sine de lavfi) a varias resoluciones, frame rates y duraciones.
+
+Mide por clip: fps de decodificación de cada backend, latencia de conversión de
+frames para la GUI, latencia de seek y tiempo de extracción de audio. Además, el
+coste de búsqueda de subtítulos y el rendimiento de la transcripción con el
+reconocedor falso.
+
+El resultado es JSON. Con --compare se contrasta con una ejecución anterior y
+termina con código 1 si alguna métrica empeora más de --tolerance.
+
+Uso: python benchmarks/bench_suite.py [--sizes 640x360 1280x720] [--fps 30]
+                                      [--durations 10] [--output resultados.json]
+                                      [--compare base.json] [--tolerance 0.25]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+# La salida estándar queda solo para el JSON
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from bench_decode import run_backend
+from bench_transcription import write_speech_like_wav, run_generator
+from AudioExtractor import AudioExtractor
+from DecodeBackend import BACKENDS
+from FrameConverter import FrameConverter
+from KeyframeIndex import KeyframeIndex
+from SubtitleStore import SubtitleStore
+
+# Métricas en las que más es mejor; en el resto (tiempos) menos es mejor
+HIGHER_IS_BETTER = ('fps', 'per_second')
+
+def make_media(path, size, fps, duration):
+    """Clip H.264 + AAC con GOP de 2 s, como un archivo real típico"""
+    subprocess.run([
+        'ffmpeg', '-v', 'error', '-y',
+        '-f', 'lavfi', '-i', f'testsrc2=size={size}:rate={fps}:duration={duration}',
+        '-f', 'lavfi', '-i', f'sine=frequency=440:sample_rate=44100:duration={duration}',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-g', str(int(fps * 2)), '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-shortest', path
+    ], check=True)
+
+def summarize_ms(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        'mean_ms': round(float(samples.mean()), 3),
+        'p95_ms': round(float(np.percentile(samples, 95)), 3),
+    }
+
+def bench_conversion(video_path, target_size=(960, 540), frames=100):
+    """Escalado y conversión a QImage de frames decodificados, como en la GUI"""
+    backend = BACKENDS['opencv'](video_path)
+    decoded = []
+    while len(decoded) < min(frames, 30):
+        ret, frame = backend.read()
+        if not ret:
+            break
+        decoded.append(frame)
+    backend.release()
+    if not decoded:
+        return {'error': 'sin frames'}
+
+    converter = FrameConverter()
+    converter.set_target_size(*target_size)
+    samples = []
+    for i in range(frames):
+        started = time.perf_counter()
+        converter.convert(decoded[i % len(decoded)])
+        samples.append(time.perf_counter() - started)
+    return {'target_size': list(target_size), 'frames': frames, **summarize_ms(samples)}
+
+def bench_seek(video_path, name, duration, seeks=20, seed=1):
+    """Seek a posiciones aleatorias hasta tener el frame pedido decodificado"""
+    backend = BACKENDS[name](video_path)
+    if not backend.isOpened():
+        return {'backend': name, 'error': 'no se pudo abrir'}
+    index = KeyframeIndex.probe(video_path) if not backend.accurate_seek else None
+    targets = random.Random(seed).sample(range(int(duration * 10)), min(seeks, int(duration * 10)))
+
+    samples = []
+    for target in targets:
+        seconds = target / 10
+        started = time.perf_counter()
+        if index:
+            index.seek(backend, seconds, backend.fps)
+        else:
+            backend.set_position(int(round(seconds * backend.fps)))
+        backend.read()
+        samples.append(time.perf_counter() - started)
+    backend.release()
+    return {'backend': name, 'seeks': len(samples), 'keyframe_index': index is not None,
+            **summarize_ms(samples)}
+
+def bench_audio(video_path):
+    """Extracción completa a WAV y latencia hasta el primer bloque por tubería"""
+    fd, wav_path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+    try:
+        started = time.perf_counter()
+        ok = AudioExtractor.extract(video_path, wav_path) is not None
+        extract = time.perf_counter() - started
+    finally:
+        os.unlink(wav_path)
+
+    started = time.perf_counter()
+    stream = AudioExtractor.stream(video_path)
+    first_block = None
+    if stream:
+        if stream.read_block(timeout=5.0) is not None:
+            first_block = time.perf_counter() - started
+        stream.close()
+    return {
+        'extracted': ok,
+        'extract_ms': round(extract * 1000, 1),
+        'stream_first_block_ms': round(first_block * 1000, 1) if first_block is not None else None,
+    }
+
+def bench_subtitle_lookup(cues=10000, lookups=200000, seed=1):
+    """find() en reproducción continua (cursor) y en saltos aleatorios (bisección)"""
+    store = SubtitleStore()
+    for i in range(cues):
+        store.add(f"subtítulo {i}", None, i * 3.0, i * 3.0 + 2.5, 'es')
+    duration = cues * 3.0
+
+    step = duration / lookups
+    started = time.perf_counter()
+    for i in range(lookups):
+        store.find(i * step)
+    sequential = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    positions = [rng.uniform(0, duration) for _ in range(lookups)]
+    started = time.perf_counter()
+    for position in positions:
+        store.find(position)
+    jumps = time.perf_counter() - started
+    return {
+        'cues': cues,
+        'lookups': lookups,
+        'sequential_ns': round(sequential * 1e9 / lookups, 1),
+        'random_ns': round(jumps * 1e9 / lookups, 1),
+    }
+
+def bench_transcription(tmp_dir, duration=30, latency=0.05, workers=(1, 4)):
+    audio_path = os.path.join(tmp_dir, 'speech.wav')
+    write_speech_like_wav(audio_path, duration)
+    return [run_generator(audio_path, w, latency, None) for w in workers]
+
+def run_clip(tmp_dir, size, fps, duration, backends):
+    video_path = os.path.join(tmp_dir, f'clip_{size}_{fps}_{duration}.mp4')
+    make_media(video_path, size, fps, duration)
+    return {
+        'clip': {'size': size, 'fps': fps, 'duration': duration},
+        'decode': [run_backend(name, video_path, 100000) for name in backends],
+        'conversion': bench_conversion(video_path),
+        'seek': [bench_seek(video_path, name, duration) for name in backends],
+        'audio': bench_audio(video_path),
+    }
+
+def flatten(results):
+    """Métricas numéricas con nombre estable para comparar ejecuciones"""
+    metrics = {}
+    for clip in results['clips']:
+        c = clip['clip']
+        prefix = f"{c['size']}@{c['fps']}fps-{c['duration']:g}s"
+        for entry in clip['decode']:
+            metrics[f"{prefix}.decode.{entry['backend']}.fps"] = entry.get('fps')
+        metrics[f"{prefix}.conversion.mean_ms"] = clip['conversion'].get('mean_ms')
+        for entry in clip['seek']:
+            metrics[f"{prefix}.seek.{entry['backend']}.mean_ms"] = entry.get('mean_ms')
+        metrics[f"{prefix}.audio.extract_ms"] = clip['audio']['extract_ms']
+        metrics[f"{prefix}.audio.stream_first_block_ms"] = clip['audio']['stream_first_block_ms']
+    lookup = results['subtitle_lookup']
+    metrics['subtitle_lookup.sequential_ns'] = lookup['sequential_ns']
+    metrics['subtitle_lookup.random_ns'] = lookup['random_ns']
+    for entry in results['transcription']:
+        metrics[f"transcription.workers{entry['workers']}.chunks_per_second"] = entry['chunks_per_second']
+    return {k: v for k, v in metrics.items() if v is not None}
+
+def compare(current, previous, tolerance):
+    """Métricas que empeoran más de la tolerancia respecto a la ejecución anterior"""
+    regressions = []
+    for name, value in current.items():
+        before = previous.get(name)
+        if not before:
+            continue
+        change = (value - before) / before
+        if name.endswith(HIGHER_IS_BETTER):
+            change = -change
+        if change > tolerance:
+            regressions.append({'metric': name, 'before': before, 'after': value,
+                                'change': round(change, 3)})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', nargs='+', default=['640x360', '1280x720'])
+    parser.add_argument('--fps', nargs='+', type=int, default=[30])
+    parser.add_argument('--durations', nargs='+', type=float, default=[10])
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS))
+    parser.add_argument('--transcription-duration', type=float, default=30)
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--compare', default=None)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        # Los mensajes de progreso de los módulos van a stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            results = {
+                'benchmark': 'suite',
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'clips': [run_clip(tmp_dir, size, fps, duration, args.backends)
+                          for size in args.sizes for fps in args.fps for duration in args.durations],
+                'subtitle_lookup': bench_subtitle_lookup(),
+                'transcription': bench_transcription(tmp_dir, args.transcription_duration),
+            }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    results['metrics'] = flatten(results)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        results['compared_to'] = args.compare
+        results['regressions'] = compare(results['metrics'], previous.get('metrics', {}),
+                                         args.tolerance)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    print(output)
+    if results.get('regressions'):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
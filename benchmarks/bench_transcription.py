@@ -0,0 +1,87 @@
+"""
+Benchmark de la generación de subtítulos contra un reconocedor local
+con latencia inyectada. Compara el modo secuencial con el pool de workers.
+
+Uso: python benchmarks/bench_transcription.py [--duration 60] [--latency 0.3]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import wave
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from Recognizers import FakeRecognizer
+from SubtitleGenerator import SubtitleGenerator
+
+def write_speech_like_wav(path, duration, sample_rate=44100):
+    """Ráfagas de tono de 2 s separadas por 0.5 s de silencio"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    signal = 0.5 * np.sin(2 * np.pi * 220 * t)
+    signal[(t % 2.5) >= 2.0] = 0
+    pcm = (signal * 32767).astype(np.int16)
+    stereo = np.column_stack([pcm, pcm])
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(2)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(stereo.tobytes())
+
+def io_counters():
+    """Bytes escritos por el proceso (solo Linux; None en otras plataformas)"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def run_generator(audio_path, workers, latency, rate):
+    recognizer = FakeRecognizer(
+        latency=latency, jitter=latency / 2, seed=1,
+        text_for=lambda audio: "hola esto es una prueba de subtítulos"
+    )
+    generator = SubtitleGenerator(audio_path, recognizer=recognizer,
+                                  max_workers=workers, requests_per_second=rate)
+    starts = []
+    generator.subtitle_ready.connect(lambda text, start, end, lang: starts.append(start))
+
+    written_before = io_counters()
+    started = time.perf_counter()
+    generator.run()
+    elapsed = time.perf_counter() - started
+    written_after = io_counters()
+    return {
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'subtitles': len(starts),
+        'in_order': starts == sorted(starts),
+        'max_concurrent': recognizer.max_concurrent,
+        'chunks_per_second': round(recognizer.calls / elapsed, 2),
+        'bytes_written': None if written_before is None else written_after - written_before,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duration', type=float, default=60)
+    parser.add_argument('--latency', type=float, default=0.3)
+    parser.add_argument('--rate', type=float, default=None)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    args = parser.parse_args()
+
+    fd, audio_path = tempfile.mkstemp(suffix='.wav')
+    os.close(fd)
+    try:
+        write_speech_like_wav(audio_path, args.duration)
+        results = [run_generator(audio_path, w, args.latency, args.rate) for w in args.workers]
+    finally:
+        os.unlink(audio_path)
+    print(json.dumps({'benchmark': 'transcription', 'results': results}, indent=2))
+
+if __name__ == '__main__':
+    main()
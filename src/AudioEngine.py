@@ -0,0 +1,272 @@
+import threading
+import time
+import numpy as np
+from AudioExtractor import AudioStream, SAMPLE_RATE, CHANNELS, FRAME_BYTES
+
+# Tamaño del bloque que pide el dispositivo en cada callback
+CHUNK_FRAMES = 1024
+# Audio decodificado por delante y total retenido (lo ya sonado sirve para seeks hacia atrás)
+LOOKAHEAD_SECONDS = 3
+RING_SECONDS = 15
+PREBUFFER_SECONDS = 0.2
+# Diferencia por debajo de la cual play(start) reanuda en lugar de buscar
+RESUME_TOLERANCE = 0.05
+
+class PCMRing:
+    """Anillo de PCM int16 direccionado por frame absoluto del archivo"""
+
+    def __init__(self, seconds=RING_SECONDS, lookahead=LOOKAHEAD_SECONDS, rate=SAMPLE_RATE,
+                 channels=CHANNELS):
+        self.capacity = int(seconds * rate)
+        self.lookahead = int(lookahead * rate)
+        self.data = np.zeros((self.capacity, channels), np.int16)
+        self.origin = 0
+        self.read_frame = 0
+        self.write_frame = 0
+        self.eof = False
+        # Cambia en cada reset: un escritor de la fuente anterior ya no puede escribir
+        self.epoch = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def reset(self, frame):
+        """Descarta el contenido; la escritura continúa en ese frame"""
+        with self._cond:
+            self.origin = self.read_frame = self.write_frame = frame
+            self.eof = False
+            self.epoch += 1
+            self._cond.notify_all()
+            return self.epoch
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def oldest(self):
+        return max(self.origin, self.write_frame - self.capacity)
+
+    def buffered(self):
+        """Frames decodificados pendientes de reproducir"""
+        return self.write_frame - self.read_frame
+
+    def seek(self, frame):
+        """Mueve la lectura si el frame sigue en el anillo; False si hay que redecodificar"""
+        with self._cond:
+            if self.oldest() <= frame < self.write_frame:
+                self.read_frame = frame
+                self._cond.notify_all()
+                return True
+            return False
+
+    def write(self, frames, epoch):
+        """Copia frames (n, canales) esperando mientras haya suficiente por delante"""
+        offset = 0
+        while offset < len(frames):
+            with self._cond:
+                self._cond.wait_for(lambda: self.write_frame - self.read_frame < self.lookahead
+                                    or self._closed or self.epoch != epoch)
+                if self._closed or self.epoch != epoch:
+                    return False
+                n = min(len(frames) - offset, self.lookahead - (self.write_frame - self.read_frame))
+                self._copy_in(frames[offset:offset + n])
+                self.write_frame += n
+                offset += n
+                self._cond.notify_all()
+        return True
+
+    def _copy_in(self, frames):
+        start = self.write_frame % self.capacity
+        first = min(len(frames), self.capacity - start)
+        self.data[start:start + first] = frames[:first]
+        self.data[:len(frames) - first] = frames[first:]
+
+    def finish(self, epoch):
+        with self._cond:
+            if self.epoch != epoch:
+                return
+            self.eof = True
+            self._cond.notify_all()
+
+    def wait_buffered(self, frames, timeout):
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self.buffered() >= frames or self.eof or self._closed, timeout)
+
+    def read_into(self, out):
+        """Llena out con lo disponible sin bloquear; devuelve los frames leídos"""
+        with self._cond:
+            n = min(len(out), self.write_frame - self.read_frame)
+            start = self.read_frame % self.capacity
+            first = min(n, self.capacity - start)
+            out[:first] = self.data[start:start + first]
+            out[first:n] = self.data[:n - first]
+            self.read_frame += n
+            self._cond.notify_all()
+            return n
+
+class AudioEngine:
+    """Salida de audio por callback sobre un anillo de PCM con posición por muestras"""
+
+    _shared = None
+
+    def __init__(self, device_factory, chunk_frames=CHUNK_FRAMES, ramp_ms=10):
+        self.ring = PCMRing()
+        self.rate = SAMPLE_RATE
+        self.chunk_frames = chunk_frames
+        self.media_path = None
+        self.playing = False
+        self.target_gain = 0.5
+        self.underruns = 0
+        self._gain = 0.0
+        self._ramp_frames = max(1, int(self.rate * ramp_ms / 1000))
+        self._out = np.zeros((chunk_frames, CHANNELS), np.int16)
+        self._stream = None
+        self._feeder = None
+        self._lock = threading.Lock()
+        # (frame leído al final del último callback, instante, frames reales entregados)
+        self._last_callback = (0, time.monotonic(), 0)
+        self.device = device_factory(self._callback)
+
+    @classmethod
+    def shared(cls):
+        """Motor único del proceso, o None si no hay dispositivo con callback"""
+        if cls._shared is None:
+            try:
+                cls._shared = cls(open_sdl_device)
+            except Exception as e:
+                print(f"Motor de audio no disponible ({e}); se usa pygame.mixer")
+                cls._shared = False
+        return cls._shared or None
+
+    def load(self, media_path, stream=None):
+        """stream: AudioStream ya lanzado desde el principio (precarga), o None"""
+        self.pause()
+        self.media_path = media_path
+        self._restart_source(0.0, stream)
+
+    def _restart_source(self, seconds, stream=None):
+        """Relanza ffmpeg en la posición pedida: solo si no está en el anillo"""
+        if self._stream:
+            self._stream.close()
+        frame = int(round(seconds * self.rate))
+        epoch = self.ring.reset(frame)
+        self._mark(frame, 0)
+        if stream is not None and abs(stream.start_position - frame / self.rate) < 1e-3:
+            # Lo que ya tiene en su buffer pasa al anillo sin esperar a ffmpeg
+            self._stream = stream
+        else:
+            if stream is not None:
+                stream.close()
+            self._stream = AudioStream(self.media_path, start=frame / self.rate)
+            self._stream.start()
+        self._feeder = threading.Thread(target=self._feed, args=(self._stream, epoch), daemon=True)
+        self._feeder.start()
+
+    def _feed(self, stream, epoch):
+        while self.ring.epoch == epoch:
+            block = stream.read_block(timeout=0.1)
+            if block is None:
+                if stream.exhausted:
+                    self.ring.finish(epoch)
+                    break
+                continue
+            frames = np.frombuffer(block, np.int16).reshape(-1, CHANNELS)
+            if not self.ring.write(frames, epoch):
+                break
+
+    def _mark(self, frame, delivered):
+        with self._lock:
+            self._last_callback = (frame, time.monotonic(), delivered)
+
+    def _callback(self, device, stream):
+        frames = len(stream) // FRAME_BYTES
+        if len(self._out) < frames:
+            self._out = np.zeros((frames, CHANNELS), np.int16)
+        out = self._out[:frames]
+
+        target = self.target_gain if self.playing else 0.0
+        if not self.playing and self._gain == 0.0:
+            # En pausa no se consume el anillo: la posición queda quieta
+            out[:] = 0
+            stream[:] = memoryview(out).cast('B')
+            return
+
+        n = self.ring.read_into(out)
+        out[n:] = 0
+        if n < frames and self.playing and not self.ring.eof:
+            self.underruns += 1
+
+        if self._gain != target:
+            # Rampa dentro del bloque: sin clics al pausar, reanudar o cambiar volumen
+            ramp = np.full(frames, target, np.float32)
+            steps = min(frames, self._ramp_frames)
+            ramp[:steps] = np.linspace(self._gain, target, steps, dtype=np.float32)
+            out[:] = out * ramp[:, None]
+            self._gain = target
+        elif target != 1.0:
+            out[:] = out * np.float32(target)
+        stream[:] = memoryview(out).cast('B')
+        self._mark(self.ring.read_frame, n)
+
+    def play(self, start=None):
+        if not self.media_path:
+            return
+        if start is not None and abs(self.position() - start) > RESUME_TOLERANCE:
+            # Mientras se rellena el anillo el callback emite silencio sin contar underruns
+            self.playing = False
+            self.seek(start)
+        self.ring.wait_buffered(int(PREBUFFER_SECONDS * self.rate), timeout=2.0)
+        self._mark(self.ring.read_frame, 0)
+        self.playing = True
+        self.device.pause(0)
+
+    def pause(self):
+        self.playing = False
+
+    def seek(self, seconds):
+        """Instantáneo dentro del audio ya decodificado; si no, redecodifica desde ahí"""
+        frame = int(round(seconds * self.rate))
+        if self.ring.seek(frame):
+            self._mark(frame, 0)
+        else:
+            self._restart_source(seconds)
+
+    def set_volume(self, volume):
+        self.target_gain = volume / 100.0
+
+    @property
+    def finished(self):
+        return self.ring.eof and self.ring.buffered() == 0
+
+    def position(self):
+        """Segundos según las muestras entregadas al dispositivo"""
+        with self._lock:
+            frame, stamp, delivered = self._last_callback
+        if not self.playing:
+            return self.ring.read_frame / self.rate
+        # El último bloque entregado suena mientras llega el siguiente callback
+        elapsed = min((time.monotonic() - stamp) * self.rate, delivered)
+        return (frame - delivered + elapsed) / self.rate
+
+    def close(self):
+        self.playing = False
+        self.ring.close()
+        if self._stream:
+            self._stream.close()
+        self.device.pause(1)
+        self.device.close()
+
+def open_sdl_device(callback):
+    """Dispositivo de salida de SDL2 alimentado por callback"""
+    from pygame._sdl2 import sdl2
+    from pygame._sdl2.audio import AudioDevice, AUDIO_S16, get_audio_device_names
+    sdl2.init_subsystem(sdl2.INIT_AUDIO)
+    names = get_audio_device_names(False)
+    if not names:
+        raise OSError("sin dispositivos de salida")
+    device = AudioDevice(
+        devicename=names[0], iscapture=False, frequency=SAMPLE_RATE, audioformat=AUDIO_S16,
+        numchannels=CHANNELS, chunksize=CHUNK_FRAMES, allowed_changes=0, callback=callback
+    )
+    return device
@@ -1,33 +1,189 @@
-import cv2
+# numpy y pygame se importan aquí arriba: este módulo no debe importarse al arrancar.
+# player.py lo importa dentro de los métodos y tests/test_startup.py lo comprueba
 import numpy as np
 import pygame
 import subprocess
 import os
 import tempfile
+import threading
+import time
+from collections import deque
 from PyQt5.QtCore import QThread, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap
 
+# Formato PCM común a extracción, streaming y mezclador
+SAMPLE_RATE = 44100
+CHANNELS = 2
+SAMPLE_WIDTH = 2
+FRAME_BYTES = CHANNELS * SAMPLE_WIDTH
+AUDIO_CACHE_NAME = 'audio.wav'
+
+def bytes_for_ms(ms):
+    """Bytes de PCM equivalentes a una duración, alineados a frame"""
+    return int(SAMPLE_RATE * ms / 1000) * FRAME_BYTES
+
+class AudioStream:
+    """Lee el PCM que produce ffmpeg por una tubería hacia un buffer acotado"""
+    
+    def __init__(self, media_path, start=0.0, block_ms=100, max_buffer_ms=3000):
+        self.media_path = media_path
+        self.start_position = start
+        self.block_size = bytes_for_ms(block_ms)
+        self.max_blocks = max(1, max_buffer_ms // block_ms)
+        self.finished = False
+        self.bytes_read = 0
+        self.blocks_served = 0
+        self._blocks = deque()
+        self._buffered = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._process = None
+        self._reader = None
+    
+    def start(self):
+        """Lanza ffmpeg y el hilo lector"""
+        cmd = ['ffmpeg']
+        if self.start_position > 0:
+            cmd += ['-ss', f'{self.start_position:.3f}']
+        cmd += [
+            '-i', self.media_path,
+            '-vn', '-f', 's16le', '-acodec', 'pcm_s16le',
+            '-ar', str(SAMPLE_RATE), '-ac', str(CHANNELS),
+            'pipe:1'
+        ]
+        self._process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0
+        )
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+    
+    def _read_exact(self, size):
+        data = bytearray()
+        while len(data) < size and not self._closed:
+            chunk = self._process.stdout.read(size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        # Descartar un frame incompleto al final del stream
+        usable = len(data) - len(data) % FRAME_BYTES
+        return bytes(data[:usable])
+    
+    def _read_loop(self):
+        try:
+            while not self._closed:
+                block = self._read_exact(self.block_size)
+                if not block:
+                    break
+                with self._cond:
+                    # Contrapresión: ffmpeg se bloquea en la tubería mientras el buffer está lleno
+                    while len(self._blocks) >= self.max_blocks and not self._closed:
+                        self._cond.wait()
+                    if self._closed:
+                        break
+                    self._blocks.append(block)
+                    self._buffered += len(block)
+                    self.bytes_read += len(block)
+                    self._cond.notify_all()
+        except (OSError, ValueError):
+            pass
+        finally:
+            with self._cond:
+                self.finished = True
+                self._cond.notify_all()
+    
+    def buffered_ms(self):
+        """Audio disponible en el buffer, en milisegundos"""
+        return self._buffered / FRAME_BYTES / SAMPLE_RATE * 1000
+    
+    def wait_ready(self, prebuffer_ms=300, timeout=5.0):
+        """Espera a que haya suficiente audio para empezar a reproducir"""
+        with self._cond:
+            self._cond.wait_for(
+                lambda: self.finished or self.buffered_ms() >= prebuffer_ms,
+                timeout
+            )
+            return self._buffered > 0
+    
+    def read_block(self, timeout=None):
+        """Devuelve el siguiente bloque PCM o None si no hay datos"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._blocks or self.finished, timeout)
+            if not self._blocks:
+                return None
+            block = self._blocks.popleft()
+            self._buffered -= len(block)
+            self.blocks_served += 1
+            self._cond.notify_all()
+            return block
+    
+    @property
+    def exhausted(self):
+        return self.finished and not self._blocks
+    
+    def close(self):
+        """Detiene ffmpeg y libera el buffer"""
+        with self._cond:
+            self._closed = True
+            self._blocks.clear()
+            self._buffered = 0
+            self._cond.notify_all()
+        if self._process and self._process.poll() is None:
+            # ffmpeg bloqueado escribiendo en la tubería no atiende SIGTERM hasta un segundo después
+            self._process.kill()
+            self._process.wait()
+        if self._process and self._process.stdout:
+            self._process.stdout.close()
+
 class AudioExtractor:
     """Clase para extraer y manejar audio de videos"""
     
     @staticmethod
-    def extract(video_path):
-        """Extrae audio del video y retorna la ruta del archivo temporal"""
+    def extract(video_path, output_path=None):
+        """Extrae audio del video y retorna la ruta del archivo (temporal si no se indica)"""
         try:
-            temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_audio.close()
+            if output_path is None:
+                temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
+                temp_audio.close()
+                output_path = temp_audio.name
             
             subprocess.run([
                 'ffmpeg', '-i', video_path,
                 '-vn', '-acodec', 'pcm_s16le', 
                 '-ar', '44100', '-ac', '2',
-                '-y', temp_audio.name
+                '-f', 'wav', '-y', output_path
             ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
             
-            return temp_audio.name
+            return output_path
         except:
             return None
     
+    @staticmethod
+    def extract_cached(video_path, cache, key=None):
+        """Extrae el audio directamente a la caché; no repite ffmpeg si ya existe"""
+        key = key or cache.key_for(video_path)
+        if not key:
+            return AudioExtractor.extract(video_path)
+        cached = cache.get(key, AUDIO_CACHE_NAME)
+        if cached:
+            return cached
+        try:
+            with cache.writer(key, AUDIO_CACHE_NAME) as tmp_path:
+                if AudioExtractor.extract(video_path, tmp_path) is None:
+                    raise OSError(f"ffmpeg no pudo extraer el audio de {video_path}")
+        except OSError:
+            return None
+        return cache.path_for(key, AUDIO_CACHE_NAME)
+    
+    @staticmethod
+    def stream(media_path, start=0.0):
+        """Empieza a leer el audio por tubería sin escribir ningún archivo"""
+        try:
+            audio_stream = AudioStream(media_path, start=start)
+            audio_stream.start()
+            return audio_stream
+        except OSError:
+            return None
+    
     @staticmethod
     def cleanup(audio_path):
         """Elimina archivo de audio temporal"""
@@ -38,16 +194,27 @@ class AudioExtractor:
                 pass
 
 class AudioPlayer:
-    """Clase para reproducir audio con pygame"""
+    """Reproduce audio con el motor PCM por callback; sin él, con pygame.mixer.music"""
     
-    def __init__(self):
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=2048)
+    def __init__(self, use_engine=True):
+        from AudioEngine import AudioEngine
+        self.engine = AudioEngine.shared() if use_engine else None
+        if self.engine is None:
+            pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=2048)
         self.audio_file = None
         self.volume = 50
+        self.start_pos = 0
     
-    def load(self, audio_path):
-        """Carga un archivo de audio"""
+    def load(self, audio_path, stream=None):
+        """Carga un archivo de audio (con el motor, también el audio de un video)"""
         self.audio_file = audio_path
+        if self.audio_file and self.engine:
+            self.engine.set_volume(self.volume)
+            self.engine.load(self.audio_file, stream)
+            return True
+        if stream is not None:
+            # pygame.mixer.music lee el archivo por su cuenta
+            stream.close()
         if self.audio_file:
             try:
                 pygame.mixer.music.load(self.audio_file)
@@ -61,30 +228,247 @@ class AudioPlayer:
         """Reproduce audio desde una posición específica"""
         if not self.audio_file:
             return
+        if self.engine:
+            # Reanudar o buscar dentro del audio ya decodificado es inmediato
+            self.engine.play(start_pos)
+            self.start_pos = start_pos
+            return
         try:
             if start_pos > 0:
                 pygame.mixer.music.play(start=start_pos)
             else:
                 pygame.mixer.music.play()
+            self.start_pos = start_pos
         except:
             try:
                 pygame.mixer.music.play()
+                self.start_pos = 0
             except:
                 pass
     
+    def get_position(self):
+        """Posición de salida en segundos, o None si no está sonando"""
+        if not self.audio_file:
+            return None
+        if self.engine:
+            if not self.engine.playing or self.engine.finished:
+                return None
+            return self.engine.position()
+        pos_ms = pygame.mixer.music.get_pos()
+        if pos_ms < 0:
+            return None
+        return self.start_pos + pos_ms / 1000.0
+    
+    @property
+    def finished(self):
+        """Ha sonado todo el archivo"""
+        if self.engine:
+            return self.engine.finished
+        return not pygame.mixer.music.get_busy()
+    
     def pause(self):
-        pygame.mixer.music.pause()
+        if self.engine:
+            self.engine.pause()
+        else:
+            pygame.mixer.music.pause()
     
     def stop(self):
-        pygame.mixer.music.stop()
+        # Con el motor, parar conserva el anillo: el siguiente play busca dentro de él
+        if self.engine:
+            self.engine.pause()
+        else:
+            pygame.mixer.music.stop()
     
     def set_volume(self, volume):
         self.volume = volume
-        pygame.mixer.music.set_volume(volume / 100.0)
+        if self.engine:
+            self.engine.set_volume(volume)
+        else:
+            pygame.mixer.music.set_volume(volume / 100.0)
     
     def cleanup(self):
         AudioExtractor.cleanup(self.audio_file)
-        pygame.mixer.quit()
+        if not self.engine:
+            pygame.mixer.quit()
+
+class StreamingAudioPlayer:
+    """Reproduce el audio de un video directamente desde la tubería de ffmpeg"""
+    
+    def __init__(self, prebuffer_ms=300):
+        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=CHANNELS, buffer=2048)
+        pygame.mixer.set_reserved(1)
+        self.channel = pygame.mixer.Channel(0)
+        self.prebuffer_ms = prebuffer_ms
+        self.media_path = None
+        self.stream = None
+        self.volume = 50
+        self.is_paused = False
+        self._feeding = False
+        self._feeder = None
+        # Posición: bloques ya reproducidos más el tiempo dentro del bloque actual
+        self._position_lock = threading.Lock()
+        self._base_position = 0.0
+        self._played_bytes = 0
+        self._current_bytes = 0
+        self._current_started = None
+        self._queued_bytes = 0
+        self._paused_at = None
+    
+    def load(self, media_path, stream=None):
+        """Prepara el stream para que la reproducción arranque sin esperar"""
+        self.stop()
+        self.media_path = media_path
+        self.stream = stream or AudioExtractor.stream(media_path)
+        return self.stream is not None
+    
+    def play(self, start_pos=0):
+        """Reproduce desde una posición, reanudando si estaba en pausa"""
+        if not self.media_path:
+            return
+        if self.is_paused:
+            with self._position_lock:
+                if self._current_started is not None and self._paused_at is not None:
+                    self._current_started += time.monotonic() - self._paused_at
+                self._paused_at = None
+            self.is_paused = False
+            self.channel.unpause()
+            return
+        
+        self._stop_feeder()
+        if not self._can_reuse_stream(start_pos):
+            self._close_stream()
+            self.stream = AudioExtractor.stream(self.media_path, start=start_pos)
+        if self.stream is None:
+            return
+        
+        self.stream.wait_ready(self.prebuffer_ms, timeout=2.0)
+        self._reset_position(self.stream.start_position)
+        self.channel.set_volume(self.volume / 100.0)
+        self._feeding = True
+        self._feeder = threading.Thread(target=self._feed, args=(self.stream,), daemon=True)
+        self._feeder.start()
+    
+    def _can_reuse_stream(self, start_pos):
+        # El stream precargado solo sirve si nadie ha consumido aún sus bloques
+        return (
+            self.stream is not None
+            and self.stream.blocks_served == 0
+            and abs(self.stream.start_position - start_pos) < 0.05
+        )
+    
+    def _reset_position(self, position):
+        with self._position_lock:
+            self._base_position = position
+            self._played_bytes = 0
+            self._current_bytes = 0
+            self._current_started = None
+            self._queued_bytes = 0
+            self._paused_at = None
+    
+    def _advance_block(self, next_bytes):
+        # El bloque en cola (o el recién lanzado) empieza a sonar ahora
+        with self._position_lock:
+            if self._current_started is not None:
+                self._played_bytes += self._current_bytes
+            self._current_bytes = next_bytes
+            self._current_started = time.monotonic() if next_bytes else None
+    
+    def _feed(self, audio_stream):
+        while self._feeding:
+            if self.channel.get_queue() is not None:
+                time.sleep(0.01)
+                continue
+            if self._queued_bytes:
+                self._advance_block(self._queued_bytes)
+                self._queued_bytes = 0
+            elif self._current_started is not None and not self.channel.get_busy():
+                # Underrun: el bloque actual terminó sin relevo
+                self._advance_block(0)
+            
+            block = audio_stream.read_block(timeout=0.2)
+            if block is None:
+                if audio_stream.exhausted:
+                    break
+                continue
+            sound = pygame.mixer.Sound(buffer=block)
+            if self.channel.get_busy():
+                self.channel.queue(sound)
+                self._queued_bytes = len(block)
+            else:
+                self.channel.play(sound)
+                self._advance_block(len(block))
+    
+    def get_position(self):
+        """Posición de salida según las muestras realmente entregadas al mezclador"""
+        with self._position_lock:
+            if self._current_started is None:
+                if self._played_bytes == 0:
+                    return None
+                return self._base_position + self._played_bytes / (FRAME_BYTES * SAMPLE_RATE)
+            now = self._paused_at or time.monotonic()
+            current_seconds = self._current_bytes / (FRAME_BYTES * SAMPLE_RATE)
+            in_block = min(max(0.0, now - self._current_started), current_seconds)
+            return self._base_position + self._played_bytes / (FRAME_BYTES * SAMPLE_RATE) + in_block
+    
+    def _stop_feeder(self):
+        self._feeding = False
+        if self._feeder:
+            self._feeder.join(timeout=1)
+            self._feeder = None
+    
+    def _close_stream(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+    
+    def pause(self):
+        if self.stream:
+            with self._position_lock:
+                self._paused_at = time.monotonic()
+            self.is_paused = True
+            self.channel.pause()
+    
+    def stop(self):
+        self.is_paused = False
+        self._stop_feeder()
+        self._reset_position(0.0)
+        self.channel.stop()
+        self._close_stream()
+    
+    def set_volume(self, volume):
+        self.volume = volume
+        self.channel.set_volume(volume / 100.0)
+    
+    def cleanup(self):
+        self.stop()
+        self.media_path = None
+
+class AudioExtractionThread(QThread):
+    """Extrae el WAV completo en segundo plano cuando algún consumidor lo necesita"""
+    audio_ready = pyqtSignal(str)
+    
+    def __init__(self, media_path, cache=None, cache_key=None):
+        super().__init__()
+        self.media_path = media_path
+        self.cache = cache
+        self.cache_key = cache_key
+        self.cancelled = False
+    
+    def run(self):
+        if self.cache is not None:
+            # El resultado queda en la caché y sirve para futuras aperturas
+            audio_path = AudioExtractor.extract_cached(self.media_path, self.cache, self.cache_key)
+        else:
+            audio_path = AudioExtractor.extract(self.media_path)
+        if self.cancelled:
+            if self.cache is None:
+                AudioExtractor.cleanup(audio_path)
+            return
+        if audio_path:
+            self.audio_ready.emit(audio_path)
+    
+    def cancel(self):
+        self.cancelled = True
 
 class VideoThread(QThread):
     change_pixmap_signal = pyqtSignal(QPixmap)
@@ -96,6 +480,7 @@ class VideoThread(QThread):
         self.is_running = True
     
     def run(self):
+        import cv2
         while self.is_running:
             ret, frame = self.cap.read()
             if not ret:
@@ -123,7 +508,7 @@ class VideoPlayer:
         self.is_playing = False
         self.volume = 50
         self.video_thread = None
-        self.audio_player = AudioPlayer()
+        self.audio_player = StreamingAudioPlayer()
         
     def set_video_output(self, widget):
         self.video_widget = widget
@@ -138,12 +523,12 @@ class VideoPlayer:
         self.audio_player.cleanup()
         
         # Cargar video
-        self.cap = cv2.VideoCapture(path)
-        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        from DecodeBackend import open_backend
+        self.cap = open_backend(path)
+        self.fps = self.cap.fps
         
-        # Extraer y cargar audio
-        audio_file = AudioExtractor.extract(path)
-        self.audio_player.load(audio_file)
+        # Preparar el audio por tubería, sin WAV intermedio
+        self.audio_player.load(path)
     
     def play(self):
         if not self.cap:
@@ -179,7 +564,7 @@ class VideoPlayer:
             self.video_thread = None
         self.audio_player.stop()
         if self.cap:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self.cap.set_position(0)
     
     def set_volume(self, volume):
         if volume < 0 or volume > 100:
@@ -190,14 +575,12 @@ class VideoPlayer:
     def get_duration(self):
         if not self.cap:
             return 0
-        frame_count = self.cap.get(cv2.CAP_PROP_FRAME_COUNT)
-        return frame_count / self.fps if self.fps > 0 else 0
+        return self.cap.frame_count / self.fps if self.fps > 0 else 0
     
     def get_current_position(self):
         if not self.cap:
             return 0
-        current_frame = self.cap.get(cv2.CAP_PROP_POS_FRAMES)
-        return current_frame / self.fps if self.fps > 0 else 0
+        return self.cap.position / self.fps if self.fps > 0 else 0
     
     def seek(self, seconds):
         if not self.cap:
@@ -209,7 +592,7 @@ class VideoPlayer:
         self.audio_player.stop()
         
         frame_number = int(seconds * self.fps)
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        self.cap.set_position(frame_number)
         
         if was_playing:
             self.play()
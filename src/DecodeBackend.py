@@ -0,0 +1,220 @@
+import os
+import subprocess
+import cv2
+import numpy as np
+from MediaInfo import MediaInfo
+
+# Interfaz común de los backends: fps, width, height, frame_count, position,
+# output_size, frame_shape, skip_nonref, isOpened(), read(buffer=None), grab(),
+# set_position(frame), set_output_size(size), set_skip_nonref(enabled), release()
+
+DECODER_ENV = 'REPRODUCTOR_DECODER'
+# Alturas a las que se decodifica al reducir: pocos cubos evitan reconfigurar en cada resize
+SIZE_BUCKETS = (360, 540, 720, 1080, 1440)
+
+def size_bucket(src_width, src_height, target_width, target_height):
+    """Tamaño de decodificación que cubre el área de pintado, o None para el original"""
+    if min(src_width, src_height, target_width, target_height) <= 0:
+        return None
+    needed = src_height * min(target_width / src_width, target_height / src_height)
+    height = next((h for h in SIZE_BUCKETS if h >= needed), None)
+    if height is None or height >= src_height:
+        return None
+    width = int(round(src_width * height / src_height / 2)) * 2
+    return width, height
+
+class OpenCVBackend:
+    """Decodificación con cv2.VideoCapture"""
+    name = 'opencv'
+    # Los seeks de OpenCV necesitan el índice de keyframes para ser rápidos
+    accurate_seek = False
+    # VideoCapture no expone las opciones de descarte del decodificador
+    supports_skip_nonref = False
+
+    def __init__(self, path, info=None):
+        self.cap = cv2.VideoCapture(path)
+        # El tamaño es el que entrega el decodificador; fps y duración, los del sondeo
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if info and info.fps:
+            self.fps = info.fps
+            self.frame_count = info.frame_count
+        else:
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+            self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.output_size = None
+        self.skip_nonref = False
+        self._scratch = None
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    @property
+    def frame_shape(self):
+        width, height = self.output_size or (self.width, self.height)
+        return height, width, 3
+
+    def set_output_size(self, size):
+        # OpenCV no escala al decodificar: se reduce justo después, en el mismo hilo
+        self.output_size = size
+
+    def set_skip_nonref(self, enabled):
+        pass
+
+    @property
+    def position(self):
+        return int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+
+    def set_position(self, frame):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame)
+
+    def read(self, buffer=None):
+        if self.output_size is None:
+            if buffer is not None:
+                return self.cap.read(buffer)
+            return self.cap.read()
+
+        ret, self._scratch = self.cap.read(self._scratch)
+        if not ret:
+            return False, None
+        if buffer is None or buffer.shape != self.frame_shape:
+            buffer = np.empty(self.frame_shape, np.uint8)
+        cv2.resize(self._scratch, self.output_size, dst=buffer, interpolation=cv2.INTER_AREA)
+        return True, buffer
+
+    def grab(self):
+        return self.cap.grab()
+
+    def release(self):
+        self.cap.release()
+
+class FFmpegPipeBackend:
+    """Decodificación con ffmpeg por tubería, con hilos de frame y de slice"""
+    name = 'ffmpeg'
+    # ffmpeg busca el keyframe y descarta hasta el frame pedido por sí mismo
+    accurate_seek = True
+    supports_skip_nonref = True
+
+    def __init__(self, path, info=None, threads=0):
+        self.path = path
+        # 0 deja que ffmpeg use un hilo por núcleo
+        self.threads = threads
+        info = info or MediaInfo.probe(path)
+        self._opened = bool(info and info.has_video and info.width and info.height)
+        self.fps = (info.fps if info else None) or 30.0
+        self.width = info.width if info else 0
+        self.height = info.height if info else 0
+        self.frame_count = int(round(info.duration * self.fps)) if info else 0
+        self.output_size = None
+        self.skip_nonref = False
+        self._proc = None
+        self._position = 0
+        self._scratch = None
+
+    def isOpened(self):
+        return self._opened
+
+    @property
+    def frame_shape(self):
+        width, height = self.output_size or (self.width, self.height)
+        return height, width, 3
+
+    @property
+    def frame_bytes(self):
+        height, width, channels = self.frame_shape
+        return width * height * channels
+
+    def set_output_size(self, size):
+        if size != self.output_size:
+            # El escalado va en la misma pasada que la conversión de píxeles de ffmpeg;
+            # la tubería se relanza en la posición actual
+            self._close_pipe()
+            self.output_size = size
+
+    def set_skip_nonref(self, enabled):
+        if enabled != self.skip_nonref:
+            self._close_pipe()
+            self.skip_nonref = enabled
+
+    @property
+    def position(self):
+        return self._position
+
+    def set_position(self, frame):
+        # El proceso se relanza con -ss en la siguiente lectura
+        self._close_pipe()
+        self._position = max(0, int(frame))
+
+    def _open_pipe(self):
+        command = [
+            'ffmpeg', '-v', 'error', '-nostdin',
+            '-threads', str(self.threads), '-thread_type', 'frame+slice',
+        ]
+        if self.skip_nonref:
+            # El decodificador no reconstruye los frames de los que no depende ningún otro
+            command += ['-skip_frame', 'noref']
+        if self._position:
+            command += ['-ss', f"{self._position / self.fps:.6f}"]
+        command += ['-i', self.path, '-map', '0:v:0', '-an', '-sn']
+        # Al descartar, los huecos se rellenan repitiendo el frame anterior: un frame
+        # de la tubería sigue siendo 1/fps y las posiciones no se desplazan
+        command += ['-vsync', 'cfr' if self.skip_nonref else '0']
+        if self.output_size:
+            command += ['-vf', 'scale={}:{}:flags=bilinear'.format(*self.output_size)]
+        command += ['-f', 'rawvideo', '-pix_fmt', 'bgr24', '-']
+        self._proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                      bufsize=self.frame_bytes * 2)
+
+    def _close_pipe(self):
+        if self._proc:
+            self._proc.kill()
+            self._proc.stdout.close()
+            self._proc.wait()
+            self._proc = None
+
+    def read(self, buffer=None):
+        if not self._opened:
+            return False, None
+        if self._proc is None:
+            self._open_pipe()
+
+        shape = self.frame_shape
+        if buffer is None or buffer.shape != shape or not buffer.flags['C_CONTIGUOUS']:
+            buffer = np.empty(shape, np.uint8)
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < len(view):
+            n = self._proc.stdout.readinto(view[filled:])
+            if not n:
+                return False, None
+            filled += n
+        self._position += 1
+        return True, buffer
+
+    def grab(self):
+        if self._scratch is None or self._scratch.shape != self.frame_shape:
+            self._scratch = np.empty(self.frame_shape, np.uint8)
+        ret, _ = self.read(self._scratch)
+        return ret
+
+    def release(self):
+        self._close_pipe()
+        self._opened = False
+
+BACKENDS = {
+    OpenCVBackend.name: OpenCVBackend,
+    FFmpegPipeBackend.name: FFmpegPipeBackend,
+}
+
+def open_backend(path, name=None, info=None):
+    """Abre el video con el backend pedido, el de la variable de entorno o OpenCV"""
+    name = name or os.environ.get(DECODER_ENV, OpenCVBackend.name)
+    backend_class = BACKENDS.get(name)
+    if backend_class is None:
+        print(f"Backend de decodificación desconocido: {name}; se usa OpenCV")
+        backend_class = OpenCVBackend
+    backend = backend_class(path, info)
+    if not backend.isOpened() and backend_class is not OpenCVBackend:
+        print(f"El backend {name} no pudo abrir {path}; se usa OpenCV")
+        backend = OpenCVBackend(path, info)
+    return backend
@@ -0,0 +1,292 @@
+import threading
+import time
+import numpy as np
+from PyQt5.QtCore import QThread
+from Telemetry import Telemetry
+
+# Presupuesto de memoria del anillo: limita la precarga en fuentes 4K
+DEFAULT_RING_BYTES = 256 * 1024 ** 2
+MIN_RING_FRAMES = 3
+MAX_RING_FRAMES = 16
+# Retraso, en frames, a partir del cual el decodificador salta hasta el reloj
+CATCH_UP_FRAMES = 2
+# Con seek preciso, a partir de este retraso se reposiciona en vez de avanzar con grab()
+SEEK_CATCH_UP_SECONDS = 1.0
+# Margen del destino de ese seek: lo que tarda en relanzarse el decodificador
+SEEK_LEAD_SECONDS = 0.2
+# Tope de frames saltados con grab() antes de entregar uno aunque vaya tarde
+MAX_GRAB_SECONDS = 2.0
+
+class FrameRing:
+    """Anillo de buffers de frame preasignados entre decodificador y presentador"""
+
+    def __init__(self, capacity, shape=None):
+        self.capacity = capacity
+        self.buffers = [np.empty(shape, np.uint8) if shape else None for _ in range(capacity)]
+        self.pts = [0.0] * capacity
+        self.eof = False
+        self._read = 0
+        self._count = 0
+        self._closed = False
+        self._starved = False
+        self._cond = threading.Condition()
+        self._reset_metrics()
+
+    @staticmethod
+    def capacity_for(cap, budget_bytes=DEFAULT_RING_BYTES):
+        """Frames que caben en el presupuesto según la resolución de la fuente"""
+        width, height = cap.width, cap.height
+        if width <= 0 or height <= 0:
+            return MIN_RING_FRAMES * 2
+        # La capacidad se calcula a resolución completa: el tamaño de salida puede crecer
+        frame_bytes = width * height * 3
+        return max(MIN_RING_FRAMES, min(MAX_RING_FRAMES, budget_bytes // frame_bytes))
+
+    @classmethod
+    def for_capture(cls, cap, budget_bytes=DEFAULT_RING_BYTES):
+        """Dimensiona el anillo según la resolución de la fuente"""
+        shape = cap.frame_shape if cap.width > 0 and cap.height > 0 else None
+        return cls(cls.capacity_for(cap, budget_bytes), shape)
+
+    def grow(self, capacity):
+        """Amplía el anillo conservando los frames pendientes; los huecos nuevos se asignan al usarse"""
+        with self._cond:
+            if capacity <= self.capacity:
+                return
+            order = [(self._read + i) % self.capacity for i in range(self.capacity)]
+            extra = capacity - self.capacity
+            self.buffers = [self.buffers[i] for i in order] + [None] * extra
+            self.pts = [self.pts[i] for i in order] + [0.0] * extra
+            self._read = 0
+            self.capacity = capacity
+            self._cond.notify_all()
+
+    def _reset_metrics(self):
+        self.underruns = 0
+        self.dropped = 0
+        self.decoded = 0
+        self.presented = 0
+        self.max_depth = 0
+        self.decode_ms = 0.0
+
+    @property
+    def depth(self):
+        return self._count
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def begin_write(self, timeout=None):
+        """Índice del siguiente buffer libre o None si el anillo sigue lleno"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._count < self.capacity or self._closed, timeout)
+            if self._closed or self._count >= self.capacity:
+                return None
+            return (self._read + self._count) % self.capacity
+
+    def end_write(self, pts, decode_ms=0.0):
+        with self._cond:
+            slot = (self._read + self._count) % self.capacity
+            self.pts[slot] = pts
+            self._count += 1
+            self.decoded += 1
+            self.max_depth = max(self.max_depth, self._count)
+            # Media móvil del coste de decodificación
+            self.decode_ms = decode_ms if self.decoded == 1 else self.decode_ms * 0.9 + decode_ms * 0.1
+            self._starved = False
+            self._cond.notify_all()
+
+    def finish(self):
+        """El decodificador llegó al final del archivo"""
+        with self._cond:
+            self.eof = True
+            self._cond.notify_all()
+
+    def peek(self, timeout=None):
+        """(índice, pts) del frame más antiguo sin retirarlo del anillo"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._count > 0 or self.eof or self._closed, timeout)
+            if self._count == 0:
+                if not self.eof and not self._closed and not self._starved:
+                    # Un único underrun por cada vez que el anillo se vacía
+                    self._starved = True
+                    self.underruns += 1
+                return None
+            return self._read, self.pts[self._read]
+
+    def release(self, presented=True):
+        """Devuelve al decodificador el buffer más antiguo"""
+        with self._cond:
+            if self._count == 0:
+                return
+            self._read = (self._read + 1) % self.capacity
+            self._count -= 1
+            if presented:
+                self.presented += 1
+            else:
+                self.dropped += 1
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reset(self):
+        """Vacía el anillo (tras un seek) conservando los buffers"""
+        with self._cond:
+            self._read = 0
+            self._count = 0
+            self._closed = False
+            self._starved = False
+            self.eof = False
+            self._cond.notify_all()
+
+    def stats(self):
+        return {
+            'depth': self._count,
+            'capacity': self.capacity,
+            'max_depth': self.max_depth,
+            'underruns': self.underruns,
+            'dropped': self.dropped,
+            'decoded': self.decoded,
+            'presented': self.presented,
+            'decode_ms': round(self.decode_ms, 3),
+        }
+
+class FrameDecoder(QThread):
+    """Decodifica por adelantado hacia el anillo de frames"""
+
+    def __init__(self, cap, ring, fps, start_index=None, output_size=None, clock=None, qos=None,
+                 limit=None):
+        super().__init__()
+        self.cap = cap
+        self.ring = ring
+        self.fps = fps
+        # Tamaño de decodificación pedido desde la GUI; se aplica entre frames
+        self.output_size = output_size
+        # Con el reloj, lo que ya llegaría tarde se salta con grab() sin recuperarlo
+        self.clock = clock
+        # Política de calidad de servicio: descarte de frames no referencia y tasa
+        self.qos = qos
+        # Frames a decodificar antes de terminar (precarga del siguiente archivo)
+        self.limit = limit
+        self.telemetry = Telemetry.shared()
+        self.is_running = True
+        if start_index is None:
+            start_index = cap.position
+        self.start_index = start_index
+
+    def _skip(self, count):
+        """Avanza count frames sin convertirlos ni copiarlos; False al final del archivo"""
+        for _ in range(count):
+            if not self.is_running or not self.cap.grab():
+                return False
+        return True
+
+    def _clock_frame(self, lead=0.0):
+        """Frame que toca decodificar ahora, contando con lo que tarda en llegar al anillo"""
+        # El primer frame incluye el arranque del backend: no cuenta más de lo que se tolera
+        decode = min(self.ring.decode_ms / 1000, CATCH_UP_FRAMES / self.fps)
+        return int((self.clock.position() + decode + lead) * self.fps) + 1
+
+    def _seek_to_clock(self):
+        """Relanza la decodificación en el reloj; con seek preciso es más barato que avanzar"""
+        target = self._clock_frame(SEEK_LEAD_SECONDS)
+        self.cap.set_position(target)
+        self.telemetry.increment('catch_up_seeks')
+        return target
+
+    def _catch_up(self, index):
+        """Salta hasta el reloj si la decodificación va retrasada; (índice, fin del archivo)"""
+        if self.clock is None or not self.clock.is_running:
+            return index, False
+        # El retraso se mide contra el reloj; el margen solo fija hasta dónde saltar
+        if self.clock.position() * self.fps - index <= CATCH_UP_FRAMES:
+            return index, False
+        start = index
+        gap = self._clock_frame() - index
+        limit = index + int(MAX_GRAB_SECONDS * self.fps)
+        while gap > 0:
+            if self.cap.accurate_seek and gap > SEEK_CATCH_UP_SECONDS * self.fps:
+                index = self._seek_to_clock()
+                break
+            if index >= limit:
+                break
+            # grab() avanza sin recuperar ni convertir el frame
+            if not self._skip(1):
+                return index, True
+            index += 1
+            # El reloj sigue avanzando mientras tanto: si grab() no gana terreno,
+            # con seek preciso se salta directamente
+            previous, gap = gap, self._clock_frame() - index
+            if gap >= previous and self.cap.accurate_seek:
+                index = self._seek_to_clock()
+                break
+        skipped = index - start
+        self.telemetry.increment('frames_grab_skipped', skipped)
+        if self.qos:
+            self.qos.on_late(skipped)
+        return index, False
+
+    def run(self):
+        index = self.start_index
+        decoded = 0
+        while self.is_running:
+            if self.limit is not None and decoded >= self.limit:
+                break
+            slot = self.ring.begin_write(timeout=0.1)
+            if slot is None:
+                if self.ring.closed:
+                    break
+                continue
+
+            index, ended = self._catch_up(index)
+            if ended:
+                if self.is_running:
+                    self.ring.finish()
+                break
+
+            started = time.perf_counter()
+            if self.output_size != self.cap.output_size:
+                self.cap.set_output_size(self.output_size)
+            step = 1
+            if self.qos:
+                step = self.qos.frame_step
+                if self.qos.skip_nonref != self.cap.skip_nonref:
+                    self.cap.set_skip_nonref(self.qos.skip_nonref)
+            buffer = self.ring.buffers[slot]
+            if buffer is not None and buffer.shape != self.cap.frame_shape:
+                # Cambio de tamaño: cada hueco se reasigna al reutilizarse
+                buffer = self.ring.buffers[slot] = np.empty(self.cap.frame_shape, np.uint8)
+            if buffer is not None:
+                ret, frame = self.cap.read(buffer)
+            else:
+                ret, frame = self.cap.read()
+            if not ret:
+                self.ring.finish()
+                break
+            if frame is not buffer:
+                # El backend no pudo escribir en el buffer: se adopta el suyo
+                self.ring.buffers[slot] = frame
+
+            decode_ms = (time.perf_counter() - started) * 1000
+            self.telemetry.record('decode_ms', decode_ms)
+            self.ring.end_write(index / self.fps, decode_ms)
+            index += 1
+            decoded += 1
+            if step > 1:
+                # Tasa reducida: los intermedios no se recuperan ni se presentan
+                ended = not self._skip(step - 1)
+                index += step - 1
+                self.telemetry.increment('frames_rate_skipped', step - 1)
+                if ended:
+                    if self.is_running:
+                        self.ring.finish()
+                    break
+
+    def stop(self):
+        self.is_running = False
+        self.ring.close()
+        self.wait()
@@ -0,0 +1,79 @@
+import threading
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage
+
+POOL_SIZE = 3
+
+class FrameConverter:
+    """Escala y convierte frames BGR al tamaño del widget reutilizando buffers"""
+
+    def __init__(self, pool_size=POOL_SIZE):
+        self.pool_size = pool_size
+        self.target_size = None
+        # Menor que 1 cuando la calidad de servicio reduce la resolución de conversión
+        self.scale = 1.0
+        self.skipped = 0
+        self._pool = []
+        self._pool_shape = None
+        self._next = 0
+        self._scaled = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def set_target_size(self, width, height):
+        """Tamaño del área de pintado; se lee desde el hilo de video"""
+        if width > 0 and height > 0:
+            self.target_size = (width, height)
+
+    def output_size(self, src_width, src_height):
+        """Tamaño de salida que encaja en el destino conservando la proporción"""
+        if not self.target_size:
+            return src_width, src_height
+        target_width, target_height = self.target_size
+        scale = min(target_width / src_width, target_height / src_height) * self.scale
+        return max(1, int(src_width * scale)), max(1, int(src_height * scale))
+
+    def acquire(self):
+        """Reserva un hueco para un frame; False si la GUI va retrasada"""
+        with self._lock:
+            # Uno de los buffers es siempre el que está en pantalla
+            if self._in_flight >= self.pool_size - 1:
+                self.skipped += 1
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        """La GUI ya ha recibido el frame"""
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+
+    def _buffers_for(self, width, height):
+        shape = (height, width, 3)
+        if self._pool_shape != shape:
+            # Solo se reasigna al cambiar el tamaño de salida
+            self._pool = [np.empty(shape, np.uint8) for _ in range(self.pool_size)]
+            self._scaled = np.empty(shape, np.uint8)
+            self._pool_shape = shape
+        out = self._pool[self._next]
+        self._next = (self._next + 1) % self.pool_size
+        return out
+
+    def convert(self, frame):
+        """Devuelve un QImage RGB listo para pintar, sin copias intermedias"""
+        src_height, src_width = frame.shape[:2]
+        width, height = self.output_size(src_width, src_height)
+        out = self._buffers_for(width, height)
+
+        if (width, height) != (src_width, src_height):
+            interpolation = cv2.INTER_AREA if width < src_width else cv2.INTER_LINEAR
+            cv2.resize(frame, (width, height), dst=self._scaled, interpolation=interpolation)
+            cv2.cvtColor(self._scaled, cv2.COLOR_BGR2RGB, dst=out)
+        else:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+
+        image = QImage(out.data, width, height, 3 * width, QImage.Format_RGB888)
+        # El QImage no copia los píxeles: se mantiene vivo el array que los contiene
+        image.ndarray = out
+        return image
@@ -0,0 +1,170 @@
+import bisect
+import json
+import subprocess
+import threading
+from PyQt5.QtCore import QThread, pyqtSignal
+
+KEYFRAME_CACHE_NAME = 'keyframes.json'
+
+class KeyframeIndex:
+    """Índice de keyframes del stream de video, persistido en la caché"""
+
+    def __init__(self, times):
+        self.times = sorted(times)
+
+    @staticmethod
+    def probe(media_path):
+        """Lee los paquetes del stream con ffprobe, sin decodificar"""
+        try:
+            result = subprocess.run([
+                'ffprobe', '-v', 'error',
+                '-select_streams', 'v:0',
+                '-show_entries', 'packet=pts_time,flags',
+                '-of', 'csv=p=0',
+                media_path
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True)
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+        all_times = []
+        keyframes = []
+        for line in result.stdout.splitlines():
+            pts, flags = None, ''
+            for field in line.split(','):
+                try:
+                    pts = float(field)
+                except ValueError:
+                    flags += field
+            if pts is None:
+                continue
+            all_times.append(pts)
+            if 'K' in flags:
+                keyframes.append(pts)
+        if not keyframes:
+            return None
+
+        # Tiempos relativos al primer paquete, como las posiciones del reproductor
+        origin = min(all_times)
+        return KeyframeIndex([t - origin for t in keyframes])
+
+    @classmethod
+    def load(cls, cache, key):
+        path = cache.get(key, KEYFRAME_CACHE_NAME)
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f)['keyframes'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, cache, key):
+        data = json.dumps({'keyframes': self.times}).encode('utf-8')
+        cache.put_bytes(key, KEYFRAME_CACHE_NAME, data)
+
+    def keyframe_before(self, seconds):
+        """Keyframe más cercano anterior o igual a la posición"""
+        i = bisect.bisect_right(self.times, seconds + 1e-6)
+        return self.times[i - 1] if i > 0 else None
+
+    def seek(self, cap, seconds, fps):
+        """Salta al keyframe previo y decodifica solo los frames necesarios"""
+        target_frame = int(round(seconds * fps))
+        keyframe = self.keyframe_before(seconds)
+        if keyframe is None:
+            cap.set_position(target_frame)
+            return target_frame
+
+        keyframe_frame = int(round(keyframe * fps))
+        current = cap.position
+        # Dentro del mismo GOP y hacia delante no hace falta buscar
+        if not (keyframe_frame <= current <= target_frame):
+            cap.set_position(keyframe_frame)
+            current = keyframe_frame
+
+        # grab() avanza sin recuperar ni convertir la imagen
+        while current < target_frame and cap.grab():
+            current += 1
+        return current
+
+class KeyframeIndexThread(QThread):
+    """Construye el índice de keyframes en segundo plano y lo guarda en la caché"""
+    index_ready = pyqtSignal(object)
+
+    def __init__(self, media_path, cache, cache_key):
+        super().__init__()
+        self.media_path = media_path
+        self.cache = cache
+        self.cache_key = cache_key
+
+    def run(self):
+        index = KeyframeIndex.probe(self.media_path)
+        if index is None:
+            return
+        if self.cache_key:
+            try:
+                index.save(self.cache, self.cache_key)
+            except OSError:
+                pass
+        self.index_ready.emit(index)
+
+class SeekWorker(QThread):
+    """Ejecuta los seeks fuera del hilo de GUI quedándose solo con el último pedido"""
+    seek_finished = pyqtSignal(float)
+
+    def __init__(self, cap, fps):
+        super().__init__()
+        self.cap = cap
+        self.fps = fps
+        self.index = None
+        self.is_running = True
+        self.position_frame = None
+        self._target = None
+        self._busy = False
+        self._cond = threading.Condition()
+
+    def request(self, seconds):
+        with self._cond:
+            self._target = seconds
+            self._cond.notify_all()
+
+    def pending(self):
+        with self._cond:
+            return self._busy or self._target is not None
+
+    def wait_idle(self, discard=True):
+        """Espera a que termine el seek en curso, descartando los pendientes"""
+        with self._cond:
+            if discard:
+                self._target = None
+            self._cond.wait_for(lambda: not self._busy and self._target is None)
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._target is not None or not self.is_running)
+                if not self.is_running:
+                    return
+                target = self._target
+                self._target = None
+                self._busy = True
+
+            if self.index and not self.cap.accurate_seek:
+                self.position_frame = self.index.seek(self.cap, target, self.fps)
+            else:
+                self.position_frame = int(round(target * self.fps))
+                self.cap.set_position(self.position_frame)
+
+            with self._cond:
+                self._busy = False
+                latest = self._target is None
+                self._cond.notify_all()
+            if latest:
+                self.seek_finished.emit(target)
+
+    def stop(self):
+        with self._cond:
+            self.is_running = False
+            self._target = None
+            self._cond.notify_all()
+        self.wait()
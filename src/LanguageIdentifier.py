@@ -0,0 +1,157 @@
+import math
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from langdetect import detect_langs
+from langdetect.lang_detect_exception import LangDetectException
+
+# Fragmentos de voz repartidos por el archivo sobre los que se vota
+SAMPLE_COUNT = 3
+# Idiomas que se comparan fragmento a fragmento tras la pasada de detección
+TOP_GUESSES = 2
+
+class LanguageIdentifier:
+    """Identifica el idioma de un archivo votando sobre varios fragmentos en paralelo"""
+
+    def __init__(self, recognize, candidates, max_workers=4, max_requests=None):
+        # recognize(audio_data, idioma) -> texto o None
+        self.recognize = recognize
+        # Idiomas completos ('es-ES', ...) en orden de preferencia
+        self.candidates = list(candidates)
+        self.max_workers = max(1, max_workers)
+        # None: el tope se calcula en identify() según candidatos y muestras
+        self.max_requests = max_requests
+        # Probabilidad acumulada que langdetect da a cada idioma, sin mirar con cuál se reconoció
+        self.scores = defaultdict(float)
+        # Fragmentos ganados por cada idioma en la confirmación
+        self.votes = defaultdict(float)
+        self.requests = 0
+        self._texts = {}
+        self._probabilities = {}
+
+    @staticmethod
+    def pick_samples(segments, count=SAMPLE_COUNT, exclude=()):
+        """Índice del fragmento más largo en cada uno de count tramos iguales del archivo"""
+        available = [i for i in range(len(segments)) if i not in exclude]
+        if not available:
+            return []
+        first, last = segments[available[0]][0], segments[available[-1]][1]
+        span = max(1, last - first) / count
+        picks = []
+        for k in range(count):
+            window = [i for i in available if first + k * span <= segments[i][0] < first + (k + 1) * span]
+            if window:
+                picks.append(max(window, key=lambda i: segments[i][1] - segments[i][0]))
+        return picks
+
+    @staticmethod
+    def max_requests_for(candidate_count, sample_count=SAMPLE_COUNT):
+        """Tope de peticiones: la detección prueba cada candidato una vez y se confirman los primeros"""
+        if not candidate_count or not sample_count:
+            return 0
+        rounds = math.ceil(candidate_count / sample_count)
+        return sample_count * (rounds + TOP_GUESSES)
+
+    def _detect(self, text):
+        """{candidato: probabilidad} con que langdetect ve el texto escrito en cada idioma"""
+        try:
+            found = detect_langs(text)
+        except LangDetectException:
+            return {}
+        probabilities = {}
+        for guess in found:
+            # langdetect usa 'zh-cn'; los candidatos, 'zh-CN'
+            code = guess.lang.split('-')[0]
+            candidate = next((c for c in self.candidates if c.split('-')[0].lower() == code), None)
+            if candidate:
+                probabilities[candidate] = probabilities.get(candidate, 0.0) + guess.prob
+        return probabilities
+
+    def _agreement(self, language, index):
+        """Probabilidad de que el texto reconocido forzando el idioma esté escrito en él"""
+        return self._probabilities.get((language, index), {}).get(language, 0.0)
+
+    def _run(self, pool, samples, tasks, decided=lambda: False):
+        """Reconoce (idioma, índice) en paralelo hasta agotar las tareas, el tope o decidir"""
+        tasks = [task for task in dict.fromkeys(tasks) if task not in self._texts]
+        tasks = tasks[:max(0, self.max_requests - self.requests)]
+        running = {}
+        while (tasks or running) and not decided():
+            while tasks and len(running) < self.max_workers:
+                language, index = task = tasks.pop(0)
+                running[pool.submit(self.recognize, samples[index], language)] = task
+                self.requests += 1
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                task = running.pop(future)
+                text = future.result()
+                self._texts[task] = text
+                if text:
+                    self._probabilities[task] = self._detect(text)
+                    for language, probability in self._probabilities[task].items():
+                        self.scores[language] += probability
+        # Lo que sigue en marcha termina, pero ya no cuenta
+        for future in running:
+            future.cancel()
+
+    def _sample_winner(self, index, guesses):
+        """Idioma que gana el fragmento; None si falta algún idioma por probar o nadie convence"""
+        if not guesses or any((language, index) not in self._texts for language in guesses):
+            return None
+        best = max(guesses, key=lambda language: self._agreement(language, index))
+        # Más de la mitad: langdetect ve en el texto el mismo idioma con que se reconoció
+        return best if self._agreement(best, index) > 0.5 else None
+
+    def _tally(self, indices, guesses):
+        self.votes.clear()
+        for index in indices:
+            winner = self._sample_winner(index, guesses)
+            if winner:
+                self.votes[winner] += 1
+        return self.votes
+
+    def identify(self, samples):
+        """(idioma, {índice: texto}) a partir de {índice: audio}; (None, {}) si nada se entiende"""
+        if not samples or not self.candidates:
+            return None, {}
+        indices = list(samples)
+        quorum = len(indices) // 2 + 1
+        order = {language: i for i, language in enumerate(self.candidates)}
+
+        if self.max_requests is None:
+            self.max_requests = self.max_requests_for(len(self.candidates), len(indices))
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Detección: cada fragmento con un idioma distinto. Un reconocedor forzado a un
+            # idioma tiende a escribir en él, así que aquí solo cuenta lo que langdetect lee.
+            # Cada ronda sigue donde acabó la anterior: todos los candidatos se prueban una vez
+            for first in range(0, len(self.candidates), len(indices)):
+                tasks = [(self.candidates[(first + k) % len(self.candidates)], index)
+                         for k, index in enumerate(indices)]
+                self._run(pool, samples, tasks)
+                if self.scores or self.requests >= self.max_requests:
+                    break
+
+            # Confirmación: los mejores candidatos se comparan sobre los mismos fragmentos
+            guesses = sorted(self.scores, key=lambda language: (-self.scores[language], order[language]))
+            guesses = guesses[:TOP_GUESSES]
+            tasks = [(language, index) for index in indices for language in guesses]
+            self._run(pool, samples, tasks,
+                      decided=lambda: max(self._tally(indices, guesses).values(), default=0) >= quorum)
+
+        self._tally(indices, guesses)
+        if self.votes:
+            winner = max(self.votes, key=lambda language: (self.votes[language], self.scores[language]))
+        else:
+            # Nada confirmado: mejor un idioma en el que el reconocedor entendió algo que uno
+            # que solo langdetect cree ver en el texto
+            understood = defaultdict(int)
+            for (language, _), text in self._texts.items():
+                if text:
+                    understood[language] += 1
+            if not understood:
+                return None, {}
+            winner = max(understood, key=lambda language: (understood[language], self.scores[language],
+                                                            -order[language]))
+        texts = {index: self._texts[(winner, index)] for index in indices
+                 if self._agreement(winner, index) > 0.5}
+        return winner, texts
@@ -0,0 +1,183 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+DEFAULT_HASH_BYTES = 64 * 1024
+# Cada cuánto se vuelve a medir la caché: otros procesos (el CLI) escriben en ella
+RESCAN_SECONDS = 300.0
+
+def default_cache_dir():
+    """Directorio de caché del usuario según la plataforma"""
+    override = os.environ.get('REPRODUCTOR_CACHE_DIR')
+    if override:
+        return override
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ReproductorAudioVisual')
+
+class MediaCache:
+    """Caché persistente de artefactos derivados de archivos multimedia"""
+
+    def __init__(self, root=None, max_bytes=None, hash_bytes=DEFAULT_HASH_BYTES):
+        self.root = root or default_cache_dir()
+        if max_bytes is None:
+            max_mb = os.environ.get('REPRODUCTOR_CACHE_MAX_MB')
+            max_bytes = int(max_mb) * 1024 ** 2 if max_mb else DEFAULT_MAX_BYTES
+        self.max_bytes = max_bytes
+        self.hash_bytes = hash_bytes
+        self._pinned = set()
+        self._lock = threading.Lock()
+        # Tamaño estimado: se mantiene con cada escritura para no recorrer el árbol en todas
+        self._total = None
+        self._scanned_at = 0.0
+
+    @staticmethod
+    def fingerprint(path, hash_bytes=0):
+        """Huella del archivo: ruta, tamaño, mtime y opcionalmente un hash parcial"""
+        stat = os.stat(path)
+        digest = hashlib.sha1()
+        digest.update(os.path.abspath(path).encode('utf-8', 'surrogateescape'))
+        digest.update(f"|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        if hash_bytes > 0:
+            # Principio y final del archivo: detecta reescrituras que conservan tamaño y fecha
+            with open(path, 'rb') as f:
+                digest.update(f.read(hash_bytes))
+                if stat.st_size > hash_bytes:
+                    f.seek(max(hash_bytes, stat.st_size - hash_bytes))
+                    digest.update(f.read(hash_bytes))
+        return digest.hexdigest()
+
+    def key_for(self, media_path):
+        try:
+            return self.fingerprint(media_path, self.hash_bytes)
+        except OSError:
+            return None
+
+    def entry_dir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def path_for(self, key, name):
+        return os.path.join(self.entry_dir(key), name)
+
+    def get(self, key, name):
+        """Ruta del artefacto si está en caché; marca el acceso para el LRU"""
+        if not key:
+            return None
+        path = self.path_for(key, name)
+        if not os.path.isfile(path):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return path
+
+    @contextmanager
+    def writer(self, key, name):
+        """Entrega una ruta temporal que se publica de forma atómica al salir sin errores"""
+        entry = self.entry_dir(key)
+        os.makedirs(entry, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=entry, prefix=f".{name}.", suffix='.tmp')
+        os.close(fd)
+        path = self.path_for(key, name)
+        try:
+            yield tmp_path
+            added = os.path.getsize(tmp_path)
+            if os.path.exists(path):
+                added -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+        self.account(key, added)
+
+    def put_bytes(self, key, name, data):
+        with self.writer(key, name) as tmp_path:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+        return self.path_for(key, name)
+
+    def put_file(self, key, name, src_path):
+        with self.writer(key, name) as tmp_path:
+            shutil.copyfile(src_path, tmp_path)
+        return self.path_for(key, name)
+
+    def account(self, key, added):
+        """Suma bytes escritos a la estimación; solo se recorre la caché si puede pasarse"""
+        with self._lock:
+            stale = self._total is None or time.monotonic() - self._scanned_at > RESCAN_SECONDS
+            if not stale:
+                self._total += added
+                if self._total <= self.max_bytes:
+                    return
+        self.evict(keep=key)
+
+    def pin(self, key):
+        """Protege una entrada en uso frente al desalojo"""
+        if key:
+            self._pinned.add(key)
+
+    def unpin(self, key):
+        self._pinned.discard(key)
+
+    def _entries(self):
+        files = []
+        if not os.path.isdir(self.root):
+            return files
+        for dirpath, _, filenames in os.walk(self.root):
+            # Los archivos en la raíz (p. ej. bases de datos globales) no se desalojan
+            if os.path.samefile(dirpath, self.root):
+                continue
+            for filename in filenames:
+                if filename.endswith('.tmp'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def total_bytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep=None):
+        """Elimina los artefactos usados hace más tiempo hasta respetar el presupuesto"""
+        with self._lock:
+            files = self._entries()
+            total = sum(size for _, size, _ in files)
+            protected = set(self._pinned)
+            if keep:
+                protected.add(keep)
+
+            for _, size, path in sorted(files):
+                if total <= self.max_bytes:
+                    break
+                entry = os.path.dirname(path)
+                if os.path.basename(entry) in protected:
+                    continue
+                try:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    continue
+                try:
+                    os.rmdir(entry)
+                except OSError:
+                    pass
+            self._total = total
+            self._scanned_at = time.monotonic()
+            return total
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root, ignore_errors=True)
+        self._total = None
@@ -0,0 +1,179 @@
+import json
+import re
+import subprocess
+
+MEDIA_INFO_CACHE_NAME = 'mediainfo.json'
+
+CHANNEL_LAYOUTS = {1: 'mono', 2: 'stereo', 6: '5.1', 8: '7.1'}
+
+def _parse_rate(value):
+    """'30000/1001' o '25' a fps; None si no es válido"""
+    try:
+        if '/' in value:
+            num, den = value.split('/')
+            return float(num) / float(den) if float(den) else None
+        return float(value) or None
+    except (TypeError, ValueError):
+        return None
+
+class MediaInfo:
+    """Metadatos de un archivo multimedia obtenidos una sola vez al cargarlo"""
+
+    # Resultados ya sondeados en esta sesión, por clave de la caché
+    _session = {}
+
+    def __init__(self, data):
+        self.data = data
+        self.duration = data.get('duration') or 0.0
+        self.format_name = data.get('format_name')
+        self.streams = data.get('streams', [])
+        video = self.video_stream or {}
+        audio = self.audio_stream or {}
+        self.width = video.get('width', 0)
+        self.height = video.get('height', 0)
+        self.fps = video.get('fps')
+        self.video_codec = video.get('codec')
+        self.sample_rate = audio.get('sample_rate')
+        self.channels = audio.get('channels')
+        self.channel_layout = audio.get('channel_layout')
+        self.audio_codec = audio.get('codec')
+
+    @property
+    def video_stream(self):
+        return next((s for s in self.streams if s.get('type') == 'video'), None)
+
+    @property
+    def audio_stream(self):
+        return next((s for s in self.streams if s.get('type') == 'audio'), None)
+
+    @property
+    def has_video(self):
+        return self.video_stream is not None
+
+    @property
+    def has_audio(self):
+        return self.audio_stream is not None
+
+    @property
+    def frame_count(self):
+        if not self.fps:
+            return 0
+        return int(round(self.duration * self.fps))
+
+    @classmethod
+    def probe(cls, media_path):
+        """Sondea con ffprobe; si no está instalado, con la cabecera que imprime ffmpeg"""
+        data = cls._probe_ffprobe(media_path) or cls._probe_ffmpeg(media_path)
+        return cls(data) if data else None
+
+    @staticmethod
+    def _probe_ffprobe(media_path):
+        try:
+            result = subprocess.run([
+                'ffprobe', '-v', 'error', '-of', 'json',
+                '-show_format', '-show_streams', media_path
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True, text=True)
+            raw = json.loads(result.stdout)
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            return None
+
+        streams = []
+        for stream in raw.get('streams', []):
+            kind = stream.get('codec_type')
+            if kind == 'video' and stream.get('disposition', {}).get('attached_pic'):
+                # Carátulas de MP3/FLAC: no son video reproducible
+                continue
+            entry = {'type': kind, 'codec': stream.get('codec_name')}
+            if kind == 'video':
+                entry['width'] = stream.get('width', 0)
+                entry['height'] = stream.get('height', 0)
+                entry['fps'] = (_parse_rate(stream.get('avg_frame_rate'))
+                                or _parse_rate(stream.get('r_frame_rate')))
+            elif kind == 'audio':
+                entry['sample_rate'] = int(stream.get('sample_rate', 0)) or None
+                entry['channels'] = stream.get('channels')
+                entry['channel_layout'] = (stream.get('channel_layout')
+                                           or CHANNEL_LAYOUTS.get(stream.get('channels')))
+            streams.append(entry)
+
+        fmt = raw.get('format', {})
+        try:
+            duration = float(fmt.get('duration', 0))
+        except ValueError:
+            duration = 0.0
+        return {'duration': duration, 'format_name': fmt.get('format_name'), 'streams': streams}
+
+    @staticmethod
+    def _probe_ffmpeg(media_path):
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-hide_banner', '-i', media_path],
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors='replace'
+            )
+        except OSError:
+            return None
+
+        streams = []
+        for line in re.findall(r'Stream #\d+:\d+.*', result.stderr):
+            match = re.search(r'(Video|Audio): (\w+)(.*)', line)
+            if not match:
+                continue
+            kind, codec, rest = match.group(1).lower(), match.group(2), match.group(3)
+            entry = {'type': kind, 'codec': codec}
+            if kind == 'video':
+                if 'attached pic' in line:
+                    continue
+                size = re.search(r'\b(\d{2,5})x(\d{2,5})\b', rest)
+                entry['width'] = int(size.group(1)) if size else 0
+                entry['height'] = int(size.group(2)) if size else 0
+                rate = re.search(r'([\d.]+) (?:fps|tbr)', rest)
+                entry['fps'] = float(rate.group(1)) if rate and float(rate.group(1)) > 0 else None
+            else:
+                rate = re.search(r'(\d+) Hz', rest)
+                entry['sample_rate'] = int(rate.group(1)) if rate else None
+                layout = re.search(r'Hz, ([^,]+)', rest)
+                entry['channel_layout'] = layout.group(1).strip() if layout else None
+                channels = {v: k for k, v in CHANNEL_LAYOUTS.items()}.get(entry['channel_layout'])
+                entry['channels'] = channels
+            streams.append(entry)
+        if not streams:
+            return None
+
+        duration = 0.0
+        match = re.search(r'Duration: (\d+):(\d+):([\d.]+)', result.stderr)
+        if match:
+            h, m, s = match.groups()
+            duration = int(h) * 3600 + int(m) * 60 + float(s)
+        fmt = re.search(r'Input #0, ([^,]+(?:,[^,\s]+)*), from', result.stderr)
+        return {'duration': duration, 'format_name': fmt.group(1) if fmt else None, 'streams': streams}
+
+    @classmethod
+    def load(cls, cache, key):
+        path = cache.get(key, MEDIA_INFO_CACHE_NAME)
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def save(self, cache, key):
+        cache.put_bytes(key, MEDIA_INFO_CACHE_NAME, json.dumps(self.data).encode('utf-8'))
+
+    @classmethod
+    def for_file(cls, media_path, cache=None, key=None):
+        """Metadatos de la sesión, de la caché en disco o de un sondeo nuevo"""
+        if key and key in cls._session:
+            return cls._session[key]
+        info = cls.load(cache, key) if cache and key else None
+        if info is None:
+            info = cls.probe(media_path)
+            if info and cache and key:
+                try:
+                    info.save(cache, key)
+                except OSError:
+                    pass
+        if info and key:
+            cls._session[key] = info
+        return info
@@ -0,0 +1,136 @@
+import threading
+import time
+
+# Estrategias en orden de escalada; cada nivel mantiene las anteriores
+NORMAL = 0
+# El decodificador descarta los frames que no sirven de referencia a otros
+SKIP_NONREF = 1
+# Se convierte a menor resolución y se amplía al pintar
+LOWER_RESOLUTION = 2
+# Se decodifica y presenta uno de cada dos frames
+REDUCE_RATE = 3
+LEVEL_NAMES = ('normal', 'skip_nonref', 'lower_resolution', 'reduce_rate')
+
+LOWER_RESOLUTION_SCALE = 0.5
+REDUCED_RATE_STEP = 2
+
+# Ventanas de un segundo; con menos frames no se decide nada (arranque, pausas)
+WINDOW = 1.0
+MIN_WINDOW_FRAMES = 5
+# Fracción de frames que llegan tarde para escalar y para volver atrás
+ESCALATE_RATIO = 0.10
+RECOVER_RATIO = 0.02
+# Histéresis: se escala tras 2 ventanas malas y se relaja tras 5 buenas. Si hay que
+# volver a escalar poco después de relajar, la siguiente relajación espera el doble
+ESCALATE_WINDOWS = 2
+RECOVER_WINDOWS = 5
+MAX_RECOVER_WINDOWS = 60
+RELAPSE_SECONDS = 10.0
+
+class QoSPolicy:
+    """Degrada la reproducción por escalones cuando el video no llega a tiempo"""
+
+    def __init__(self, supports_skip_nonref=False, window=WINDOW, clock=time.monotonic):
+        # Sin descarte en el decodificador (OpenCV) se pasa directamente al siguiente
+        self.levels = [NORMAL, LOWER_RESOLUTION, REDUCE_RATE]
+        if supports_skip_nonref:
+            self.levels.insert(1, SKIP_NONREF)
+        self.window = window
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._index = 0
+            self.escalations = 0
+            self.recoveries = 0
+            self.late_ratio = 0.0
+            self._bad = 0
+            self._good = 0
+            self._recover_windows = RECOVER_WINDOWS
+            self._recovered_at = None
+            self._start_window(self._clock())
+
+    def _start_window(self, now):
+        self._window_start = now
+        self._presented = 0
+        self._late = 0
+
+    @property
+    def level(self):
+        return self.levels[self._index]
+
+    @property
+    def strategy(self):
+        return LEVEL_NAMES[self.level]
+
+    @property
+    def skip_nonref(self):
+        return self.level >= SKIP_NONREF and SKIP_NONREF in self.levels
+
+    @property
+    def output_scale(self):
+        return LOWER_RESOLUTION_SCALE if self.level >= LOWER_RESOLUTION else 1.0
+
+    @property
+    def frame_step(self):
+        return REDUCED_RATE_STEP if self.level >= REDUCE_RATE else 1
+
+    def on_presented(self):
+        self._record(presented=1)
+
+    def on_late(self, n=1):
+        """Frames descartados, saltados por la GUI o saltados por el decodificador"""
+        self._record(late=n)
+
+    def _record(self, presented=0, late=0):
+        with self._lock:
+            self._presented += presented
+            self._late += late
+            now = self._clock()
+            if now - self._window_start >= self.window:
+                self._evaluate(now)
+                self._start_window(now)
+
+    def _evaluate(self, now):
+        total = self._presented + self._late
+        if total < MIN_WINDOW_FRAMES:
+            return
+        self.late_ratio = self._late / total
+        if self.late_ratio >= ESCALATE_RATIO:
+            self._good = 0
+            self._bad += 1
+            if self._bad >= ESCALATE_WINDOWS and self._index < len(self.levels) - 1:
+                if self._recovered_at is not None and now - self._recovered_at < RELAPSE_SECONDS:
+                    self._recover_windows = min(MAX_RECOVER_WINDOWS, self._recover_windows * 2)
+                self._change(1)
+        elif self.late_ratio <= RECOVER_RATIO:
+            self._bad = 0
+            self._good += 1
+            if self._good >= self._recover_windows and self._index > 0:
+                self._recovered_at = now
+                self._change(-1)
+        else:
+            # Zona intermedia: ni se escala ni se relaja
+            self._bad = 0
+            self._good = 0
+
+    def _change(self, step):
+        self._index += step
+        self._bad = 0
+        self._good = 0
+        if step > 0:
+            self.escalations += 1
+        else:
+            self.recoveries += 1
+        print(f"QoS: {self.strategy} ({self.late_ratio:.0%} de frames tarde)")
+
+    def stats(self):
+        return {
+            'qos_strategy': self.strategy,
+            'qos_level': self._index,
+            'qos_escalations': self.escalations,
+            'qos_recoveries': self.recoveries,
+            'qos_late_ratio': round(self.late_ratio, 3),
+        }
@@ -0,0 +1,49 @@
+class Playlist:
+    """Lista de reproducción: archivos en orden y el que se está reproduciendo"""
+
+    def __init__(self, paths=()):
+        self.items = list(paths)
+        self.index = 0 if self.items else -1
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def current(self):
+        return self.items[self.index] if 0 <= self.index < len(self.items) else None
+
+    def add(self, paths):
+        """Añade al final; si la lista estaba vacía, el primero pasa a ser el actual"""
+        self.items.extend(paths)
+        if self.index < 0 and self.items:
+            self.index = 0
+
+    def clear(self):
+        self.items = []
+        self.index = -1
+
+    def peek_next(self):
+        """Archivo siguiente sin avanzar (el que se precarga), o None al final"""
+        if self.index + 1 < len(self.items):
+            return self.items[self.index + 1]
+        return None
+
+    def advance(self):
+        """Pasa al siguiente y lo devuelve; None si ya es el último"""
+        if self.peek_next() is None:
+            return None
+        self.index += 1
+        return self.current
+
+    def back(self):
+        """Vuelve al anterior y lo devuelve; None si ya es el primero"""
+        if self.index <= 0:
+            return None
+        self.index -= 1
+        return self.current
+
+    def select(self, index):
+        if not 0 <= index < len(self.items):
+            raise IndexError(f"La lista tiene {len(self.items)} elementos")
+        self.index = index
+        return self.current
@@ -0,0 +1,155 @@
+import os
+import time
+from PyQt5.QtCore import QThread
+from KeyframeIndex import KeyframeIndex
+from MediaInfo import MediaInfo
+from Telemetry import Telemetry
+from Transcript import Transcript
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.ogg', '.flac', '.m4a')
+# Memoria que puede retener lo precargado: frames decodificados más PCM en espera
+PRELOAD_BUDGET_BYTES = 64 * 1024 ** 2
+# Como mucho medio segundo de video y dos de audio: basta para arrancar sin esperar
+PRELOAD_SECONDS = 0.5
+PRELOAD_AUDIO_MS = 2000
+
+class PreloadedMedia:
+    """Lo que el reproductor necesita para empezar un archivo sin esperas"""
+
+    def __init__(self, path):
+        self.path = path
+        self.key = None
+        self.info = None
+        self.transcript = None
+        self.audio_only = False
+        self.cap = None
+        self.ring = None
+        self.decode_size = None
+        self.frames = 0
+        self.keyframe_index = None
+        # Archivo del que sale el audio (el original o el WAV de la caché) y su stream
+        self.audio_source = None
+        self.audio_stream = None
+
+    def take_audio_stream(self, source):
+        """Stream precargado si es del archivo que se va a reproducir; si no, se cierra"""
+        stream, self.audio_stream = self.audio_stream, None
+        if stream is not None and source != self.audio_source:
+            stream.close()
+            return None
+        return stream
+
+    def memory_bytes(self):
+        frames = 0
+        if self.ring and self.frames:
+            height, width, channels = self.cap.frame_shape
+            frames = self.frames * width * height * channels
+        from AudioExtractor import bytes_for_ms
+        audio = bytes_for_ms(PRELOAD_AUDIO_MS) if self.audio_stream else 0
+        return frames + audio
+
+    def release(self):
+        """Libera la captura y el stream si finalmente no se reproduce"""
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+        self.ring = None
+        if self.audio_stream:
+            self.audio_stream.close()
+            self.audio_stream = None
+
+class MediaPreloader(QThread):
+    """Prepara en segundo plano el siguiente archivo de la lista de reproducción"""
+
+    def __init__(self, path, cache, decode_backend=None, output_size=None, decode_downscale=True,
+                 budget_bytes=PRELOAD_BUDGET_BYTES):
+        super().__init__()
+        self.path = path
+        self.cache = cache
+        self.decode_backend = decode_backend
+        # Tamaño del área de pintado: se decodifica ya en el cubo que usará el reproductor
+        self.output_size = output_size
+        self.decode_downscale = decode_downscale
+        self.budget_bytes = budget_bytes
+        self.media = PreloadedMedia(path)
+        self.ready = False
+        self.cancelled = False
+
+    @property
+    def result(self):
+        """Lo precargado si terminó bien, o None"""
+        return self.media if self.ready else None
+
+    def run(self):
+        started = time.perf_counter()
+        media = self.media
+        try:
+            self._prepare(media)
+        except Exception as e:
+            print(f"Error precargando {self.path}: {e}")
+            media.release()
+            return
+        if self.cancelled:
+            media.release()
+            return
+        self.ready = True
+        print(f"Precargado {os.path.basename(self.path)}: {media.frames} frames y audio "
+              f"({media.memory_bytes() / 1024 ** 2:.1f} MB) en "
+              f"{(time.perf_counter() - started) * 1000:.0f} ms")
+
+    def _prepare(self, media):
+        media.key = self.cache.key_for(self.path)
+        self.cache.pin(media.key)
+        media.info = MediaInfo.for_file(self.path, self.cache, media.key)
+        media.transcript = Transcript.load(self.cache, media.key)
+        if media.info:
+            media.audio_only = not media.info.has_video
+        else:
+            media.audio_only = os.path.splitext(self.path)[1].lower() in AUDIO_EXTENSIONS
+        if self.cancelled:
+            return
+
+        # El mismo archivo de audio que elegirá el reproductor al cargarlo
+        from AudioExtractor import AudioStream, AUDIO_CACHE_NAME, bytes_for_ms
+        budget = self.budget_bytes
+        if media.audio_only:
+            media.audio_source = self.path
+        elif not media.info or media.info.has_audio:
+            media.audio_source = self.cache.get(media.key, AUDIO_CACHE_NAME) or self.path
+        if media.audio_source:
+            stream = AudioStream(media.audio_source, max_buffer_ms=PRELOAD_AUDIO_MS)
+            try:
+                stream.start()
+                media.audio_stream = stream
+                budget -= bytes_for_ms(PRELOAD_AUDIO_MS)
+            except OSError:
+                pass
+        if media.audio_only or self.cancelled:
+            return
+
+        from DecodeBackend import open_backend, size_bucket
+        from FrameBuffer import FrameDecoder, FrameRing
+        cap = open_backend(self.path, self.decode_backend, media.info)
+        if not cap.isOpened():
+            cap.release()
+            return
+        media.cap = cap
+        if self.decode_downscale and self.output_size:
+            media.decode_size = size_bucket(cap.width, cap.height, *self.output_size)
+        cap.set_output_size(media.decode_size)
+        height, width, channels = cap.frame_shape
+        limit = min(FrameRing.capacity_for(cap), max(1, int(cap.fps * PRELOAD_SECONDS)),
+                    max(1, budget // (width * height * channels)))
+        # Solo los buffers que se van a llenar, ya al tamaño de decodificación; el
+        # reproductor amplía el anillo al adoptarlo
+        media.ring = FrameRing(limit, cap.frame_shape)
+        decoder = FrameDecoder(cap, media.ring, cap.fps, start_index=0,
+                               output_size=media.decode_size, limit=limit)
+        # Sus tiempos no se mezclan con los del archivo que suena
+        decoder.telemetry = Telemetry()
+        decoder.run()
+        media.frames = media.ring.depth
+        media.keyframe_index = KeyframeIndex.load(self.cache, media.key)
+
+    def cancel(self):
+        self.cancelled = True
@@ -0,0 +1,77 @@
+import random
+import threading
+import time
+import speech_recognition as sr
+
+class GoogleRecognizer:
+    """Reconocedor de voz de Google (backend por defecto)"""
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+        self.recognizer.energy_threshold = 300
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = 0.5
+
+    def recognize(self, audio_data, language):
+        """Texto reconocido o None si no se entiende nada; sr.RequestError si falla el servicio"""
+        try:
+            return self.recognizer.recognize_google(audio_data, language=language, show_all=False)
+        except sr.UnknownValueError:
+            return None
+
+class FakeRecognizer:
+    """Reconocedor local para pruebas y benchmarks, con latencia inyectada"""
+
+    def __init__(self, latency=0.0, jitter=0.0, language='es-ES', text_for=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.language = language
+        self.text_for = text_for
+        self.calls = 0
+        self.max_concurrent = 0
+        self._active = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def recognize(self, audio_data, language):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+            self._active += 1
+            self.max_concurrent = max(self.max_concurrent, self._active)
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        try:
+            time.sleep(delay)
+            # Solo "entiende" el idioma configurado, como haría el servicio real
+            if language != self.language:
+                return None
+            if self.text_for:
+                return self.text_for(audio_data)
+            return f"fragmento {call}"
+        finally:
+            with self._lock:
+                self._active -= 1
+
+class RateLimiter:
+    """Limita las peticiones por segundo al reconocedor (token bucket)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
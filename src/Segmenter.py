@@ -0,0 +1,77 @@
+import numpy as np
+
+# Frames por bloque al calcular energía: acota la memoria temporal en float32
+ENERGY_BLOCK_FRAMES = 65536
+# Por debajo de este nivel nunca hay voz, aunque todo el archivo sea silencio
+SILENCE_FLOOR_DB = -70
+
+class Segmenter:
+    """Segmenta audio por energía RMS en una pasada vectorizada con NumPy"""
+
+    def __init__(self, frame_ms=10, silence_offset_db=16, min_silence_ms=300,
+                 keep_silence_ms=150, max_chunk_ms=5000, chunk_ms=3000, min_chunk_ms=300):
+        self.frame_ms = frame_ms
+        self.silence_offset_db = silence_offset_db
+        self.min_silence_ms = min_silence_ms
+        self.keep_silence_ms = keep_silence_ms
+        self.max_chunk_ms = max_chunk_ms
+        self.chunk_ms = chunk_ms
+        self.min_chunk_ms = min_chunk_ms
+
+    def frame_levels(self, samples, sample_rate, channels=1):
+        """Nivel en dBFS de cada frame y nivel medio de todo el audio"""
+        frame_len = max(1, int(sample_rate * self.frame_ms / 1000)) * channels
+        n_frames = len(samples) // frame_len
+        if n_frames == 0:
+            return np.empty(0, np.float32), -np.inf
+
+        frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+        energy = np.empty(n_frames, np.float64)
+        for start in range(0, n_frames, ENERGY_BLOCK_FRAMES):
+            block = frames[start:start + ENERGY_BLOCK_FRAMES].astype(np.float32)
+            energy[start:start + len(block)] = np.einsum('ij,ij->i', block, block)
+
+        full_scale = float(2 ** 15) ** 2
+        mean_power = energy / frame_len / full_scale
+        levels = 10 * np.log10(np.maximum(mean_power, 1e-12))
+        overall = 10 * np.log10(max(mean_power.mean(), 1e-12))
+        return levels, overall
+
+    def segment(self, samples, sample_rate, channels=1):
+        """Lista de (inicio_ms, fin_ms) absolutos de los fragmentos con voz"""
+        levels, overall = self.frame_levels(samples, sample_rate, channels)
+        if len(levels) == 0:
+            return []
+
+        voiced = levels > max(overall - self.silence_offset_db, SILENCE_FLOOR_DB)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], voiced.view(np.int8), [0]))))
+        starts, ends = edges[::2], edges[1::2]
+        if len(starts) == 0:
+            return []
+
+        # Solo los silencios largos separan fragmentos; los cortos se fusionan
+        min_silence = self.min_silence_ms // self.frame_ms
+        breaks = (starts[1:] - ends[:-1]) >= min_silence
+        seg_starts = np.concatenate((starts[:1], starts[1:][breaks]))
+        seg_ends = np.concatenate((ends[:-1][breaks], ends[-1:]))
+
+        keep = self.keep_silence_ms // self.frame_ms
+        seg_starts = np.maximum(seg_starts - keep, 0) * self.frame_ms
+        seg_ends = np.minimum(seg_ends + keep, len(levels)) * self.frame_ms
+
+        segments = []
+        for start, end in zip(seg_starts.tolist(), seg_ends.tolist()):
+            if end - start > self.max_chunk_ms:
+                # Voz continua sin pausas: troceado fijo como hacía el modo "fixed"
+                for piece in range(start, end, self.chunk_ms):
+                    segments.append((piece, min(piece + self.chunk_ms, end)))
+            else:
+                segments.append((start, end))
+        return [(s, e) for s, e in segments if e - s >= self.min_chunk_ms]
+
+    def segment_audio(self, audio):
+        """Segmenta un AudioSegment de pydub sin copiar sus muestras"""
+        if audio.sample_width != 2:
+            audio = audio.set_sample_width(2)
+        samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+        return self.segment(samples, audio.frame_rate, audio.channels)
@@ -1,135 +1,55 @@
-import speech_recognition as sr
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
-import os
 from PyQt5.QtCore import QThread, pyqtSignal
-from langdetect import detect
-from deep_translator import GoogleTranslator
+from Transcriber import Transcriber
 
 class SubtitleGenerator(QThread):
+    """Ejecuta un Transcriber en segundo plano y entrega sus resultados como señales"""
     subtitle_ready = pyqtSignal(str, float, float, str)
     generation_finished = pyqtSignal()
     generation_progress = pyqtSignal(int)
-    
-    def __init__(self, audio_path):
+    # Región (inicio, fin) en segundos ya transcrita, incluido el silencio previo
+    chunk_done = pyqtSignal(float, float)
+    language_detected = pyqtSignal(str)
+    # Cortes [(inicio_ms, fin_ms)] de la primera segmentación, para guardarlos con la cobertura
+    segments_ready = pyqtSignal(object)
+
+    def __init__(self, audio_path, recognizer=None, max_workers=4, requests_per_second=None,
+                 covered=None, language=None, focus=0.0, segments=None):
         super().__init__()
         self.audio_path = audio_path
-        self.recognizer = sr.Recognizer()
-        self.detected_language = None
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.5
-        
-        self.language_map = {
-            'es': 'es-ES',
-            'en': 'en-US',
-            'fr': 'fr-FR',
-            'de': 'de-DE',
-            'it': 'it-IT',
-            'pt': 'pt-PT',
-            'ja': 'ja-JP',
-            'zh': 'zh-CN',
-            'ko': 'ko-KR',
-            'ru': 'ru-RU'
-        }
-    
-    def detect_language_from_text(self, text):
-        try:
-            lang = detect(text)
-            return lang
-        except:
-            return 'es'
-    
+        self.transcriber = Transcriber(
+            audio_path, recognizer=recognizer, max_workers=max_workers,
+            requests_per_second=requests_per_second, covered=covered, language=language,
+            focus=focus, segments=segments, on_subtitle=self.subtitle_ready.emit,
+            on_chunk_done=self.chunk_done.emit, on_language=self.language_detected.emit,
+            on_segments=self.segments_ready.emit, on_progress=self.generation_progress.emit
+        )
+
+    @property
+    def detected_language(self):
+        return self.transcriber.detected_language
+
+    @property
+    def completed(self):
+        return self.transcriber.completed
+
+    @property
+    def is_running(self):
+        return self.transcriber.is_running
+
+    def set_focus(self, position):
+        """Prioriza los fragmentos desde esta posición (p. ej. tras un seek)"""
+        self.transcriber.set_focus(position)
+
     def run(self):
         try:
-            audio = AudioSegment.from_file(self.audio_path)
-            
-            chunks_silence = split_on_silence(
-                audio,
-                min_silence_len=300,
-                silence_thresh=audio.dBFS - 16,
-                keep_silence=150
-            )
-            
-            chunk_length_ms = 3000
-            chunks_fixed = []
-            for i in range(0, len(audio), chunk_length_ms):
-                chunk = audio[i:i + chunk_length_ms]
-                if len(chunk) > 500:
-                    chunks_fixed.append(chunk)
-            
-            if len(chunks_silence) > len(audio) / 5000:
-                chunks = chunks_silence
-                method = "silence"
-            else:
-                chunks = chunks_fixed
-                method = "fixed"
-            
-            print(f"Método: {method}, {len(chunks)} chunks")
-            
-            total_chunks = len(chunks)
-            current_time = 0
-            first_detection = True
-            
-            for i, chunk in enumerate(chunks):
-                chunk_file = f"temp_chunk_{i}.wav"
-                chunk.export(chunk_file, format="wav")
-                
-                with sr.AudioFile(chunk_file) as source:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
-                    audio_data = self.recognizer.record(source)
-                    
-                    text = None
-                    
-                    if first_detection and self.detected_language is None:
-                        languages_to_try = ['es-ES', 'en-US', 'fr-FR', 'de-DE', 'it-IT']
-                        
-                        for lang in languages_to_try:
-                            try:
-                                text = self.recognizer.recognize_google(audio_data, language=lang)
-                                if text:
-                                    detected_lang = self.detect_language_from_text(text)
-                                    self.detected_language = self.language_map.get(detected_lang, lang)
-                                    print(f"Idioma detectado: {self.detected_language}")
-                                    first_detection = False
-                                    break
-                            except:
-                                continue
-                    else:
-                        try:
-                            text = self.recognizer.recognize_google(
-                                audio_data,
-                                language=self.detected_language or 'es-ES',
-                                show_all=False
-                            )
-                        except sr.UnknownValueError:
-                            pass
-                        except sr.RequestError as e:
-                            print(f"Error: {e}")
-                    
-                    if text:
-                        duration = len(chunk) / 1000.0
-                        start_time = max(0, current_time - 0.2)
-                        end_time = start_time + duration
-                        
-                        lang_code = self.detected_language.split('-')[0] if self.detected_language else 'es'
-                        self.subtitle_ready.emit(text, start_time, end_time, lang_code)
-                        print(f"[{start_time:.2f}s] [{lang_code}] {text}")
-                    
-                    current_time += len(chunk) / 1000.0
-                
-                if os.path.exists(chunk_file):
-                    os.remove(chunk_file)
-                
-                if total_chunks > 0:
-                    progress = int((i + 1) / total_chunks * 100)
-                    self.generation_progress.emit(progress)
-            
-            self.generation_finished.emit()
-            print("Generación completada")
-                    
+            if self.transcriber.run():
+                self.generation_finished.emit()
         except Exception as e:
             print(f"Error: {e}")
             import traceback
             traceback.print_exc()
-            self.generation_finished.emit()
\ No newline at end of file
+            self.generation_finished.emit()
+
+    def cancel(self):
+        """Detiene la generación tras el fragmento en curso"""
+        self.transcriber.cancel()
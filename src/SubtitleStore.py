@@ -0,0 +1,82 @@
+from array import array
+from bisect import bisect_right
+
+class SubtitleStore:
+    """Subtítulos ordenados por inicio, con búsqueda binaria y cursor de reproducción"""
+
+    def __init__(self, lead=0.1):
+        # Margen con el que un subtítulo aparece antes de su inicio
+        self.lead = lead
+        self.starts = array('d')
+        self.ends = array('d')
+        self.originals = []
+        self.translations = []
+        self.languages = []
+        self._cursor = -1
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        for i in range(len(self.starts)):
+            yield self.get(i)
+
+    def clear(self):
+        del self.starts[:]
+        del self.ends[:]
+        self.originals.clear()
+        self.translations.clear()
+        self.languages.clear()
+        self._cursor = -1
+
+    def add(self, original, translated, start, end, language):
+        """Inserta en orden aunque los subtítulos lleguen desordenados"""
+        i = bisect_right(self.starts, start)
+        # Lo habitual es llegar en orden: insertar al final no mueve nada
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.originals.insert(i, original)
+        self.translations.insert(i, translated)
+        self.languages.insert(i, language)
+        if i <= self._cursor:
+            self._cursor += 1
+        return i
+
+    def get(self, i):
+        return (self.originals[i], self.translations[i], self.starts[i], self.ends[i], self.languages[i])
+
+    def index_of(self, start, original):
+        """Índice del subtítulo con ese inicio y texto, o -1"""
+        i = bisect_right(self.starts, start) - 1
+        while i >= 0 and self.starts[i] == start:
+            if self.originals[i] == original:
+                return i
+            i -= 1
+        return -1
+
+    def set_translation(self, i, text):
+        self.translations[i] = text
+
+    def _covers(self, i, position):
+        """El subtítulo i es el último que ha empezado en esta posición"""
+        n = len(self.starts)
+        return (0 <= i < n and self.starts[i] - self.lead <= position
+                and (i + 1 == n or position < self.starts[i + 1] - self.lead))
+
+    def find(self, position):
+        """Índice del subtítulo visible en la posición, o -1"""
+        if not self.starts:
+            return -1
+
+        # Reproducción normal: el cursor sigue valiendo o avanza uno
+        if self._covers(self._cursor, position):
+            i = self._cursor
+        elif self._covers(self._cursor + 1, position):
+            i = self._cursor + 1
+        else:
+            i = bisect_right(self.starts, position + self.lead) - 1
+        self._cursor = i
+
+        if i >= 0 and position <= self.ends[i]:
+            return i
+        return -1
@@ -0,0 +1,111 @@
+import threading
+import time
+
+# Por debajo de este error el reloj se corrige poco a poco; por encima, salta
+RESYNC_THRESHOLD = 0.08
+SLEW_FACTOR = 0.1
+
+class MasterClock:
+    """Reloj maestro de reproducción: manda el audio y el tiempo de pared interpola"""
+
+    def __init__(self, clock=time.monotonic):
+        self.source = None
+        self.is_running = False
+        self._clock = clock
+        self._base_position = 0.0
+        self._base_time = clock()
+        self._lock = threading.Lock()
+
+    def set_source(self, source):
+        """source() devuelve la posición real del audio en segundos, o None"""
+        with self._lock:
+            self.source = source
+
+    def start(self, position):
+        with self._lock:
+            self._base_position = position
+            self._base_time = self._clock()
+            self.is_running = True
+
+    def pause(self):
+        position = self.position()
+        with self._lock:
+            self._base_position = position
+            self.is_running = False
+
+    def reset(self, position=0.0):
+        with self._lock:
+            self._base_position = position
+            self._base_time = self._clock()
+            self.is_running = False
+
+    def position(self):
+        with self._lock:
+            if not self.is_running:
+                return self._base_position
+
+            now = self._clock()
+            interpolated = self._base_position + (now - self._base_time)
+            audio_position = self.source() if self.source else None
+            if audio_position is None:
+                return interpolated
+
+            # El audio avanza a saltos de buffer: se interpola entre lecturas
+            error = audio_position - interpolated
+            if abs(error) > RESYNC_THRESHOLD:
+                interpolated = audio_position
+            else:
+                interpolated += error * SLEW_FACTOR
+            self._base_position = interpolated
+            self._base_time = now
+            return interpolated
+
+class AVSync:
+    """Política de sincronización de video contra el reloj maestro"""
+
+    PRESENT = 'present'
+    WAIT = 'wait'
+    DROP = 'drop'
+
+    def __init__(self, clock, fps):
+        self.clock = clock
+        self.frame_duration = 1.0 / fps
+        # Tolerancias: medio frame por delante, dos frames por detrás
+        self.wait_threshold = self.frame_duration / 2
+        self.drop_threshold = self.frame_duration * 2
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.last_drift = 0.0
+        self.mean_drift = 0.0
+        self.max_drift = 0.0
+        self.presented = 0
+        self.dropped = 0
+        self.waits = 0
+
+    def decide(self, pts):
+        """Acción para el frame con timestamp pts y tiempo a esperar si procede"""
+        drift = pts - self.clock.position()
+        if drift > self.wait_threshold:
+            # Video adelantado: se mantiene en pantalla el frame anterior
+            self.waits += 1
+            return self.WAIT, min(drift, self.frame_duration)
+        if drift < -self.drop_threshold:
+            self.dropped += 1
+            return self.DROP, 0.0
+
+        self.presented += 1
+        self.last_drift = drift
+        self.mean_drift = drift if self.presented == 1 else self.mean_drift * 0.95 + drift * 0.05
+        self.max_drift = max(self.max_drift, abs(drift))
+        return self.PRESENT, 0.0
+
+    def stats(self):
+        return {
+            'drift_ms': round(self.last_drift * 1000, 2),
+            'mean_drift_ms': round(self.mean_drift * 1000, 2),
+            'max_drift_ms': round(self.max_drift * 1000, 2),
+            'sync_presented': self.presented,
+            'sync_dropped': self.dropped,
+            'sync_waits': self.waits,
+        }
@@ -0,0 +1,170 @@
+import json
+import math
+import os
+import threading
+import time
+
+# Ruta del archivo JSONL al que se vuelca la telemetría periódicamente
+TELEMETRY_ENV = 'REPRODUCTOR_TELEMETRY'
+DUMP_INTERVAL = 5.0
+
+# Cubos logarítmicos de 4 por octava desde 10 µs: el último (~10 s) acumula el resto
+MIN_VALUE = 0.01
+BUCKETS_PER_OCTAVE = 4
+BUCKET_COUNT = 80
+
+class Histogram:
+    """Histograma de tiempos en ms con cubos fijos: registrar no reserva memoria"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (BUCKET_COUNT + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value):
+        if value <= MIN_VALUE:
+            i = 0
+        else:
+            i = min(BUCKET_COUNT, int(math.log2(value / MIN_VALUE) * BUCKETS_PER_OCTAVE) + 1)
+        # Sin cerrojo: con varios hilos escribiendo solo se pierde alguna muestra suelta
+        self.counts[i] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p):
+        """Límite superior del cubo que contiene el percentil p (0-100)"""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                if i == BUCKET_COUNT:
+                    return self.max
+                return min(self.max, MIN_VALUE * 2 ** (i / BUCKETS_PER_OCTAVE))
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'mean': round(self.total / self.count, 3) if self.count else 0.0,
+            'p50': round(self.percentile(50), 3),
+            'p95': round(self.percentile(95), 3),
+            'p99': round(self.percentile(99), 3),
+            'max': round(self.max, 3),
+        }
+
+class Telemetry:
+    """Histogramas, contadores e indicadores de la reproducción por nombre"""
+
+    _shared = None
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls):
+        """Telemetría única del proceso, compartida por todos los hilos"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def record(self, name, value):
+        self.histogram(name).record(value)
+
+    def increment(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def reset(self):
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.reset()
+            self.counters.clear()
+            self.gauges.clear()
+
+    def snapshot(self):
+        with self._lock:
+            histograms = list(self.histograms.items())
+        return {
+            'histograms': {name: h.snapshot() for name, h in histograms},
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+        }
+
+class TelemetryDump:
+    """Vuelca la telemetría como una línea JSON cada intervalo, para análisis offline"""
+
+    def __init__(self, telemetry, path, interval=DUMP_INTERVAL, extra=None):
+        self.telemetry = telemetry
+        self.path = path
+        self.interval = interval
+        # extra() añade datos del momento, p. ej. las estadísticas del reproductor
+        self.extra = extra
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @classmethod
+    def from_env(cls, telemetry, extra=None):
+        """Volcado activado con la variable de entorno, o None"""
+        path = os.environ.get(TELEMETRY_ENV)
+        if not path:
+            return None
+        dump = cls(telemetry, path, extra=extra)
+        dump.start()
+        return dump
+
+    def start(self):
+        self._thread.start()
+
+    def write(self):
+        line = {'time': round(time.time(), 3),
+                'uptime': round(time.time() - self.telemetry.started, 3)}
+        line.update(self.telemetry.snapshot())
+        if self.extra:
+            try:
+                line['playback'] = self.extra()
+            except Exception as e:
+                line['playback'] = {'error': str(e)}
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(line) + '\n')
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"No se pudo escribir la telemetría: {e}")
+                return
+
+    def stop(self):
+        """Detiene el volcado escribiendo una última línea"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        try:
+            self.write()
+        except OSError:
+            pass
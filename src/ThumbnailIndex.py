@@ -0,0 +1,263 @@
+import json
+import math
+import os
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import numpy as np
+from PyQt5.QtCore import QThread
+
+# Tira de sprites (miniaturas RGB una tras otra) y sus metadatos en la caché
+THUMBNAIL_CACHE_NAME = 'thumbnails.rgb'
+THUMBNAIL_META_NAME = 'thumbnails.json'
+# Una miniatura cada 5 s; en archivos largos el intervalo crece para no pasar del máximo,
+# así la tira ocupa como mucho MAX_THUMBNAILS * 160 * 90 * 3 bytes (unos 25 MB)
+THUMBNAIL_INTERVAL = 5.0
+MAX_THUMBNAILS = 600
+THUMBNAIL_BOX = (160, 90)
+# Cada worker es un ffmpeg de un hilo: el índice no compite con la reproducción
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_TIMEOUT = 10.0
+# Posiciones pedidas al pasar el ratón que se recuerdan (las más recientes primero)
+MAX_REQUESTS = 8
+
+def thumbnail_size(width, height, box=THUMBNAIL_BOX):
+    """Tamaño par que cabe en la caja conservando la proporción"""
+    scale = min(box[0] / width, box[1] / height)
+    return max(2, int(width * scale) // 2 * 2), max(2, int(height * scale) // 2 * 2)
+
+def decode_thumbnail(media_path, seconds, size):
+    """Decodifica solo el keyframe anterior a la posición, ya reducido y en RGB"""
+    width, height = size
+    try:
+        result = subprocess.run([
+            'ffmpeg', '-v', 'error', '-threads', '1',
+            # Solo keyframes y sin descartar los anteriores a -ss: sale el keyframe previo
+            '-skip_frame', 'nokey', '-noaccurate_seek',
+            '-ss', f"{seconds:.3f}", '-i', media_path,
+            '-map', '0:v:0', '-frames:v', '1',
+            '-vf', f"scale={width}:{height}",
+            '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1'
+        ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=THUMBNAIL_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    frame_bytes = width * height * 3
+    if len(result.stdout) < frame_bytes:
+        return None
+    return np.frombuffer(result.stdout, np.uint8, frame_bytes).reshape(height, width, 3)
+
+def sweep_order(count):
+    """De grueso a fino: primero unas pocas repartidas por todo el archivo, luego las intermedias"""
+    order = []
+    seen = set()
+    step = 1 << max(0, count.bit_length() - 1)
+    while step >= 1:
+        for slot in range(0, count, step):
+            if slot not in seen:
+                seen.add(slot)
+                order.append(slot)
+        step //= 2
+    return order
+
+class ThumbnailIndex:
+    """Miniaturas a intervalo fijo en una tira de sprites proyectada en memoria"""
+
+    def __init__(self, sheet, interval, filled=None, failed=None):
+        # sheet: memmap de forma (miniaturas, alto, ancho, 3); solo se cargan las páginas que se leen
+        self.sheet = sheet
+        self.interval = interval
+        self.filled = np.zeros(len(sheet), bool) if filled is None else filled
+        # Posiciones que ffmpeg no pudo decodificar: no se reintentan en cada apertura
+        self.failed = np.zeros(len(sheet), bool) if failed is None else failed
+
+    @property
+    def count(self):
+        return len(self.sheet)
+
+    @property
+    def size(self):
+        return self.sheet.shape[2], self.sheet.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.sheet.nbytes
+
+    @classmethod
+    def open(cls, cache, key, duration, width, height, interval=THUMBNAIL_INTERVAL,
+             max_thumbnails=MAX_THUMBNAILS):
+        """Abre la tira de la caché o crea una vacía si no existe o no coincide"""
+        interval = max(interval, duration / max_thumbnails)
+        # La última queda antes del final: un seek al final exacto no devuelve ningún frame
+        count = max(1, min(max_thumbnails, int(math.ceil(duration / interval))))
+        thumb_width, thumb_height = thumbnail_size(width, height)
+        meta = {'interval': interval, 'count': count, 'width': thumb_width, 'height': thumb_height}
+        shape = (count, thumb_height, thumb_width, 3)
+
+        path = cache.path_for(key, THUMBNAIL_CACHE_NAME)
+        filled = np.zeros(count, bool)
+        failed = np.zeros(count, bool)
+        stored = cls._load_meta(cache, key)
+        mode = 'w+'
+        if (stored and all(stored.get(name) == value for name, value in meta.items())
+                and cache.get(key, THUMBNAIL_CACHE_NAME)
+                and os.path.getsize(path) == int(np.prod(shape))):
+            mode = 'r+'
+            filled[[slot for slot in stored.get('filled', []) if 0 <= slot < count]] = True
+            failed[[slot for slot in stored.get('failed', []) if 0 <= slot < count]] = True
+        else:
+            os.makedirs(cache.entry_dir(key), exist_ok=True)
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+        sheet = np.memmap(path, np.uint8, mode, shape=shape)
+        if mode == 'w+':
+            # Se escribe fuera de cache.writer(): se suma a mano al tamaño de la caché
+            cache.account(key, sheet.nbytes - replaced)
+        return cls(sheet, interval, filled, failed)
+
+    @staticmethod
+    def _load_meta(cache, key):
+        path = cache.get(key, THUMBNAIL_META_NAME)
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, cache, key):
+        """Vuelca la tira y guarda qué miniaturas están rellenas"""
+        self.sheet.flush()
+        width, height = self.size
+        data = json.dumps({
+            'interval': self.interval,
+            'count': self.count,
+            'width': width,
+            'height': height,
+            'filled': np.flatnonzero(self.filled).tolist(),
+            'failed': np.flatnonzero(self.failed).tolist(),
+        }).encode('utf-8')
+        cache.put_bytes(key, THUMBNAIL_META_NAME, data)
+
+    def slot_for(self, seconds):
+        """Miniatura más cercana a la posición"""
+        return min(self.count - 1, max(0, int(round(seconds / self.interval))))
+
+    def time_for(self, slot):
+        return slot * self.interval
+
+    def get(self, seconds):
+        """Miniatura ya indexada para la posición (vista sobre la tira), o None"""
+        slot = self.slot_for(seconds)
+        return self.sheet[slot] if self.filled[slot] else None
+
+    def store(self, slot, image):
+        self.sheet[slot] = image
+        # Se marca después de copiar: quien lee nunca ve una miniatura a medias
+        self.filled[slot] = True
+
+    def missing(self):
+        """Miniaturas que quedan por intentar"""
+        return np.flatnonzero(~(self.filled | self.failed)).tolist()
+
+class ThumbnailBuilder(QThread):
+    """Rellena el índice de miniaturas con un pool de decodificadores en segundo plano"""
+
+    def __init__(self, media_path, index, cache=None, cache_key=None, keyframe_index=None,
+                 workers=THUMBNAIL_WORKERS):
+        super().__init__()
+        self.media_path = media_path
+        self.index = index
+        self.cache = cache
+        self.cache_key = cache_key
+        self.workers = workers
+        self.is_running = True
+        self.decodes = 0
+        self.failed = 0
+        self._requested = deque(maxlen=MAX_REQUESTS)
+        self._lock = threading.Lock()
+        self._order = sweep_order(index.count)
+        self._cursor = 0
+        self._attempted = set()
+        self.set_keyframe_index(keyframe_index)
+
+    def set_keyframe_index(self, keyframe_index):
+        """Con el índice de keyframes, las miniaturas del mismo GOP salen de una sola decodificación"""
+        with self._lock:
+            self._seek_times = {}
+            for slot in range(self.index.count):
+                seconds = self.index.time_for(slot)
+                keyframe = keyframe_index.keyframe_before(seconds) if keyframe_index else None
+                self._seek_times.setdefault(keyframe if keyframe is not None else seconds, []).append(slot)
+            self._slot_times = {slot: seconds for seconds, slots in self._seek_times.items()
+                                for slot in slots}
+
+    def request(self, seconds):
+        """Zona sin indexar bajo el ratón: pasa delante del barrido junto a sus vecinas"""
+        slot = self.index.slot_for(seconds)
+        with self._lock:
+            for neighbour in (slot + 1, slot - 1, slot):
+                if 0 <= neighbour < self.index.count:
+                    self._requested.append(neighbour)
+
+    def _next_job(self):
+        """Siguiente posición a decodificar y las miniaturas que rellena"""
+        with self._lock:
+            while self._requested:
+                job = self._job_for(self._requested.pop())
+                if job:
+                    return job
+            while self._cursor < len(self._order):
+                job = self._job_for(self._order[self._cursor])
+                self._cursor += 1
+                if job:
+                    return job
+        return None
+
+    def _job_for(self, slot):
+        if self.index.filled[slot] or self.index.failed[slot]:
+            return None
+        seconds = self._slot_times[slot]
+        if seconds in self._attempted:
+            return None
+        self._attempted.add(seconds)
+        return seconds, self._seek_times[seconds]
+
+    def run(self):
+        size = self.index.size
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running = {}
+            while self.is_running:
+                while len(running) < self.workers:
+                    job = self._next_job()
+                    if job is None:
+                        break
+                    running[pool.submit(decode_thumbnail, self.media_path, job[0], size)] = job
+                if not running:
+                    break
+                # Espera corta: una petición del ratón no aguarda a que acabe el lote
+                done, _ = wait(running, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    _, slots = running.pop(future)
+                    image = future.result()
+                    if image is None:
+                        self.failed += 1
+                        self.index.failed[slots] = True
+                        continue
+                    self.decodes += 1
+                    for slot in slots:
+                        self.index.store(slot, image)
+            pool.shutdown(wait=True, cancel_futures=True)
+        self._save()
+
+    def _save(self):
+        if not self.cache or not self.cache_key:
+            return
+        try:
+            self.index.save(self.cache, self.cache_key)
+        except OSError:
+            pass
+
+    def stop(self):
+        self.is_running = False
+        self.wait()
@@ -0,0 +1,245 @@
+import subprocess
+import threading
+import time
+import speech_recognition as sr
+from bisect import bisect_right
+from collections import deque
+from pydub import AudioSegment
+from concurrent.futures import Future, ThreadPoolExecutor
+from LanguageIdentifier import LanguageIdentifier
+from Recognizers import GoogleRecognizer, RateLimiter
+from Segmenter import Segmenter
+from Telemetry import Telemetry
+
+# Formato que pide el reconocedor: extraer así evita cargar el audio original en memoria
+RECOGNITION_SAMPLE_RATE = 16000
+
+def extract_for_recognition(media_path, output_path, sample_rate=RECOGNITION_SAMPLE_RATE):
+    """Audio del archivo como WAV mono de 16 kHz; False si ffmpeg falla"""
+    try:
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-nostdin', '-y', '-i', media_path,
+            '-vn', '-sn', '-ac', '1', '-ar', str(sample_rate), '-acodec', 'pcm_s16le',
+            '-f', 'wav', output_path
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+class Transcriber:
+    """Transcripción de un archivo de audio por fragmentos, sin Qt: informa por callbacks"""
+
+    def __init__(self, audio_path, recognizer=None, max_workers=4, requests_per_second=None,
+                 covered=None, language=None, focus=0.0, segments=None, on_subtitle=None,
+                 on_chunk_done=None, on_language=None, on_segments=None, on_progress=None):
+        self.audio_path = audio_path
+        # Backend intercambiable: Google por defecto, FakeRecognizer en pruebas
+        self.backend = recognizer or GoogleRecognizer()
+        self.max_workers = max(1, max_workers)
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.segmenter = Segmenter()
+        # Reanudación de una transcripción interrumpida con el idioma ya detectado
+        self.covered = list(covered or [])
+        self.detected_language = language
+        # Cortes de una transcripción anterior: la cobertura se refiere a ellos
+        self.segments = [tuple(segment) for segment in segments] if segments is not None else None
+        # on_subtitle(texto, inicio, fin, idioma), on_chunk_done(inicio, fin),
+        # on_language(idioma), on_segments([(inicio_ms, fin_ms)]), on_progress(porcentaje)
+        self.on_subtitle = on_subtitle
+        self.on_chunk_done = on_chunk_done
+        self.on_language = on_language
+        self.on_segments = on_segments
+        self.on_progress = on_progress
+        # Posición de reproducción alrededor de la cual se transcribe primero
+        self._focus = focus
+        self._focus_lock = threading.Lock()
+        self._cursor = 0
+        self.is_running = True
+        self.completed = False
+        self.total_chunks = 0
+        self.done_chunks = 0
+        self.duration = 0.0
+        self.telemetry = Telemetry.shared()
+
+        self.language_map = {
+            'es': 'es-ES',
+            'en': 'en-US',
+            'fr': 'fr-FR',
+            'de': 'de-DE',
+            'it': 'it-IT',
+            'pt': 'pt-PT',
+            'ja': 'ja-JP',
+            'zh': 'zh-CN',
+            'ko': 'ko-KR',
+            'ru': 'ru-RU'
+        }
+
+    def _prepare_chunk(self, chunk):
+        """Entrega el fragmento al reconocedor como PCM mono en memoria"""
+        mono = chunk.set_channels(1)
+        return sr.AudioData(mono.raw_data, mono.frame_rate, mono.sample_width)
+
+    def _recognize(self, audio_data, language):
+        self.rate_limiter.acquire()
+        started = time.perf_counter()
+        try:
+            return self.backend.recognize(audio_data, language)
+        except sr.RequestError as e:
+            self.telemetry.increment('recognize_errors')
+            print(f"Error: {e}")
+            return None
+        finally:
+            self.telemetry.record('recognize_ms', (time.perf_counter() - started) * 1000)
+
+    def _identify_language(self, chunks, segments, scheduled):
+        """Vota el idioma sobre fragmentos repartidos por el archivo; {índice: texto} reutilizable"""
+        done = {i for i, flag in enumerate(scheduled) if flag}
+        indices = LanguageIdentifier.pick_samples(segments, exclude=done)
+        identifier = LanguageIdentifier(self._recognize, self.language_map.values(),
+                                        max_workers=self.max_workers)
+        language, texts = identifier.identify({i: self._prepare_chunk(chunks[i]) for i in indices})
+        self.telemetry.set_gauge('language_id_requests', identifier.requests)
+        if language is None:
+            return {}
+        self.detected_language = language
+        if self.on_language:
+            self.on_language(language)
+        votes = ", ".join(f"{lang} {score:g}" for lang, score in
+                          sorted(identifier.votes.items(), key=lambda item: -item[1]))
+        print(f"Idioma detectado: {language} ({votes}; {identifier.requests} peticiones)")
+        return texts
+
+    def _emit_subtitle(self, text, chunk, offset):
+        start_time = offset
+        end_time = offset + len(chunk) / 1000.0
+
+        lang_code = self.detected_language.split('-')[0] if self.detected_language else 'es'
+        if self.on_subtitle:
+            self.on_subtitle(text, start_time, end_time, lang_code)
+        print(f"[{start_time:.2f}s] [{lang_code}] {text}")
+
+    def _emit_progress(self, region):
+        self.done_chunks += 1
+        if self.on_chunk_done:
+            self.on_chunk_done(*region)
+        self.telemetry.increment('subtitle_chunks')
+        if self.total_chunks > 0 and self.on_progress:
+            self.on_progress(int(self.done_chunks / self.total_chunks * 100))
+
+    def set_focus(self, position):
+        """Prioriza los fragmentos desde esta posición (p. ej. tras un seek)"""
+        with self._focus_lock:
+            self._focus = position
+
+    def _is_covered(self, region):
+        return any(start <= region[0] + 1e-3 and region[1] <= end + 1e-3
+                   for start, end in self.covered)
+
+    def _apply_focus(self, ends):
+        """Mueve el cursor al fragmento que contiene el foco si ha cambiado"""
+        with self._focus_lock:
+            focus, self._focus = self._focus, None
+        if focus is None:
+            return False
+        self._cursor = bisect_right(ends, focus)
+        return True
+
+    def _next_chunk(self, scheduled):
+        """Siguiente fragmento pendiente desde el foco; después, el resto del archivo"""
+        n = len(scheduled)
+        for _ in range(2):
+            while self._cursor < n and scheduled[self._cursor]:
+                self._cursor += 1
+            if self._cursor < n:
+                scheduled[self._cursor] = 1
+                return self._cursor
+            # Fin del archivo: se rellena lo anterior al foco
+            self._cursor = 0
+        return None
+
+    def run(self):
+        """Transcribe lo pendiente; True si se completó y False si se canceló"""
+        audio = AudioSegment.from_file(self.audio_path)
+        self.duration = len(audio) / 1000.0
+
+        # Una sola segmentación por energía con offsets absolutos en el archivo. La energía
+        # depende del formato extraído (16 kHz mono en la CLI, el original en el reproductor):
+        # si ya hay cortes guardados se reutilizan para que la cobertura coincida con ellos
+        if self.segments is None:
+            self.segments = self.segmenter.segment_audio(audio)
+            if self.on_segments:
+                self.on_segments(list(self.segments))
+        segments = [(start, min(end, len(audio))) for start, end in self.segments if start < len(audio)]
+        chunks = [audio[start:end] for start, end in segments]
+        offsets = [start / 1000.0 for start, _ in segments]
+        ends = [end / 1000.0 for _, end in segments]
+        print(f"Segmentación: {len(chunks)} chunks")
+
+        self.total_chunks = len(chunks)
+        # Cada fragmento cubre también el silencio anterior; el último, hasta el final
+        regions = [(ends[k - 1] if k else 0.0, ends[k]) for k in range(self.total_chunks)]
+        if regions:
+            regions[-1] = (regions[-1][0], max(ends[-1], self.duration))
+
+        # Mismos cortes que la cobertura guardada: se saltan los fragmentos ya transcritos
+        scheduled = bytearray(self._is_covered(region) for region in regions)
+        self.done_chunks = sum(scheduled)
+        if self.done_chunks:
+            print(f"Reanudando transcripción ({self.done_chunks}/{self.total_chunks} chunks hechos)")
+
+        # Sin idioma conocido se vota sobre varios fragmentos; su texto en el idioma
+        # ganador ya es el subtítulo y no se vuelven a reconocer
+        known = {}
+        if self.detected_language is None and self.is_running:
+            known = self._identify_language(chunks, segments, scheduled)
+
+        # El resto se reconoce en paralelo por prioridad desde el foco,
+        # emitiendo en el orden en que se programó cada fragmento
+        language = self.detected_language or 'es-ES'
+        window = self.max_workers * 2
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while self.is_running:
+                if self._apply_focus(ends):
+                    # Lo que aún no ha empezado vuelve a la cola para atender antes el foco
+                    kept = deque()
+                    for index, future in in_flight:
+                        if future.cancel():
+                            scheduled[index] = 0
+                        else:
+                            kept.append((index, future))
+                    in_flight = kept
+                while len(in_flight) < window:
+                    index = self._next_chunk(scheduled)
+                    if index is None:
+                        break
+                    if index in known:
+                        # Se emite en su turno para conservar el orden desde el foco
+                        future = Future()
+                        future.set_result(known.pop(index))
+                    else:
+                        audio_data = self._prepare_chunk(chunks[index])
+                        future = pool.submit(self._recognize, audio_data, language)
+                    in_flight.append((index, future))
+                if not in_flight:
+                    break
+
+                index, future = in_flight.popleft()
+                text = future.result()
+                if text:
+                    self._emit_subtitle(text, chunks[index], offsets[index])
+                self._emit_progress(regions[index])
+
+            for _, future in in_flight:
+                future.cancel()
+
+        if not self.is_running:
+            print("Generación cancelada")
+            return False
+        self.completed = True
+        print("Generación completada")
+        return True
+
+    def cancel(self):
+        """Detiene la generación tras el fragmento en curso"""
+        self.is_running = False
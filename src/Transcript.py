@@ -0,0 +1,139 @@
+import json
+import re
+
+TRANSCRIPT_CACHE_NAME = 'transcript.json'
+
+TIMING_RE = re.compile(
+    r'((?:\d+:)?\d{1,2}:\d{2}[,.]\d{3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[,.]\d{3})'
+)
+
+def format_timestamp(seconds, separator=','):
+    millis = int(round(seconds * 1000))
+    s, ms = divmod(millis, 1000)
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}{separator}{ms:03d}"
+
+def parse_timestamp(value):
+    parts = value.replace(',', '.').split(':')
+    seconds = float(parts[-1])
+    for i, part in enumerate(reversed(parts[:-1])):
+        seconds += int(part) * 60 ** (i + 1)
+    return seconds
+
+class Transcript:
+    """Transcripción persistente de un archivo: subtítulos, idioma, traducciones y progreso"""
+
+    def __init__(self):
+        self.language = None
+        self.cues = []
+        self.translations = {}
+        # Regiones (inicio, fin) ya transcritas, ordenadas y sin solapes
+        self.coverage = []
+        # Fragmentos (inicio_ms, fin_ms) de la primera segmentación: el reproductor y la CLI
+        # extraen el audio de forma distinta y deben reanudar sobre los mismos cortes
+        self.segments = None
+        self.finished = False
+
+    def add(self, text, start, end, language):
+        self.cues.append((start, end, text, language))
+
+    def mark_covered(self, start, end):
+        merged = []
+        for region in self.coverage:
+            if region[1] < start - 1e-3 or region[0] > end + 1e-3:
+                merged.append(region)
+            else:
+                start, end = min(start, region[0]), max(end, region[1])
+        merged.append((start, end))
+        self.coverage = sorted(merged)
+
+    def covered_seconds(self):
+        return sum(end - start for start, end in self.coverage)
+
+    def set_translations(self, target, mapping):
+        self.translations[target] = dict(mapping)
+
+    @classmethod
+    def load(cls, cache, key):
+        path = cache.get(key, TRANSCRIPT_CACHE_NAME)
+        if not path:
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        transcript = cls()
+        transcript.language = data.get('language')
+        transcript.cues = [tuple(cue) for cue in data.get('cues', [])]
+        transcript.translations = data.get('translations', {})
+        transcript.coverage = [tuple(region) for region in data.get('coverage', [])]
+        segments = data.get('segments')
+        transcript.segments = [tuple(segment) for segment in segments] if segments is not None else None
+        transcript.finished = data.get('finished', False)
+        return transcript
+
+    def save(self, cache, key):
+        data = {
+            'language': self.language,
+            'cues': sorted(self.cues),
+            'translations': self.translations,
+            'coverage': self.coverage,
+            'segments': self.segments,
+            'finished': self.finished,
+        }
+        cache.put_bytes(key, TRANSCRIPT_CACHE_NAME, json.dumps(data, ensure_ascii=False).encode('utf-8'))
+
+    def to_srt(self):
+        blocks = []
+        for n, (start, end, text, _) in enumerate(sorted(self.cues), 1):
+            blocks.append(f"{n}\n{format_timestamp(start)} --> {format_timestamp(end)}\n{text}\n")
+        return "\n".join(blocks)
+
+    def to_vtt(self):
+        blocks = ["WEBVTT\n"]
+        for start, end, text, _ in sorted(self.cues):
+            blocks.append(f"{format_timestamp(start, '.')} --> {format_timestamp(end, '.')}\n{text}\n")
+        return "\n".join(blocks)
+
+    def to_json(self):
+        cues = [{'start': round(start, 3), 'end': round(end, 3), 'text': text, 'language': lang}
+                for start, end, text, lang in sorted(self.cues)]
+        return json.dumps({'language': self.language, 'cues': cues}, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def parse(cls, content, language=None):
+        """Lee subtítulos SRT o WebVTT"""
+        transcript = cls()
+        transcript.language = language
+        # Sin idioma conocido el traductor detecta el origen
+        lang_code = language.split('-')[0] if language else 'auto'
+        for block in re.split(r'\n\s*\n', content.replace('\r\n', '\n').strip()):
+            lines = block.split('\n')
+            for i, line in enumerate(lines):
+                match = TIMING_RE.search(line)
+                if match:
+                    text = "\n".join(l.strip() for l in lines[i + 1:] if l.strip())
+                    if text:
+                        transcript.add(text, parse_timestamp(match.group(1)),
+                                       parse_timestamp(match.group(2)), lang_code)
+                    break
+        transcript.finished = True
+        return transcript
+
+    def export(self, path):
+        extension = path.lower().rsplit('.', 1)[-1]
+        if extension == 'vtt':
+            content = self.to_vtt()
+        elif extension == 'json':
+            content = self.to_json()
+        else:
+            content = self.to_srt()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    @classmethod
+    def import_file(cls, path, language=None):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            return cls.parse(f.read(), language)
@@ -0,0 +1,170 @@
+import os
+import sqlite3
+import threading
+import time
+from PyQt5.QtCore import QThread, pyqtSignal
+
+# Límite de caracteres por petición del traductor de Google
+MAX_BATCH_CHARS = 4500
+BATCH_WINDOW = 0.1
+
+class GoogleTranslatorBackend:
+    """Traductor de Google con una sesión por par de idiomas y peticiones agrupadas"""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def _session(self, source, target):
+        from deep_translator import GoogleTranslator
+        key = (source, target)
+        if key not in self._sessions:
+            self._sessions[key] = GoogleTranslator(source=source, target=target)
+        return self._sessions[key]
+
+    def translate_batch(self, texts, source, target):
+        translator = self._session(source, target)
+        # Una sola petición con los textos separados por líneas
+        joined = translator.translate("\n".join(texts))
+        parts = joined.split("\n") if joined else []
+        if len(parts) == len(texts):
+            return [part.strip() for part in parts]
+        # El servicio fusionó o partió líneas: se traduce uno a uno
+        return [translator.translate(text) for text in texts]
+
+class FakeTranslator:
+    """Traductor local para pruebas: marca el texto con el idioma destino"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self.texts = 0
+
+    def translate_batch(self, texts, source, target):
+        self.requests += 1
+        self.texts += len(texts)
+        time.sleep(self.latency)
+        return [f"[{target}] {text}" for text in texts]
+
+class TranslationCache:
+    """Traducciones persistentes indexadas por (texto, origen, destino)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = None
+
+    def _connect(self):
+        # sqlite exige usar la conexión en el hilo que la creó: se abre en el worker
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "text TEXT, source TEXT, target TEXT, translation TEXT, "
+                "PRIMARY KEY (text, source, target))"
+            )
+        return self._conn
+
+    def get_many(self, texts, source, target):
+        conn = self._connect()
+        found = {}
+        for text in texts:
+            row = conn.execute(
+                "SELECT translation FROM translations WHERE text=? AND source=? AND target=?",
+                (text, source, target)
+            ).fetchone()
+            if row:
+                found[text] = row[0]
+        return found
+
+    def put_many(self, items, source, target):
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)",
+            [(text, source, target, translation) for text, translation in items]
+        )
+        conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+class TranslationWorker(QThread):
+    """Traduce subtítulos en segundo plano, por lotes y pasando por la caché"""
+    translated = pyqtSignal(float, str, str, str)
+
+    def __init__(self, cache_path, backend=None, batch_size=25):
+        super().__init__()
+        self.cache = TranslationCache(cache_path)
+        self.backend = backend or GoogleTranslatorBackend()
+        self.batch_size = batch_size
+        self.is_running = True
+        self._queue = []
+        self._cond = threading.Condition()
+
+    def request(self, start, text, source, target):
+        with self._cond:
+            self._queue.append((start, text, source, target))
+            self._cond.notify_all()
+        if not self.isRunning():
+            self.start()
+
+    def cancel_pending(self):
+        with self._cond:
+            self._queue.clear()
+
+    def _next_batch(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or not self.is_running)
+            if not self.is_running:
+                return None
+            # Se espera un instante para agrupar los subtítulos que llegan seguidos
+            self._cond.wait_for(lambda: len(self._queue) >= self.batch_size or not self.is_running,
+                                BATCH_WINDOW)
+            batch = self._queue[:self.batch_size]
+            del self._queue[:self.batch_size]
+            return batch
+
+    def run(self):
+        try:
+            while self.is_running:
+                batch = self._next_batch()
+                if not batch:
+                    continue
+                groups = {}
+                for start, text, source, target in batch:
+                    groups.setdefault((source, target), []).append((start, text))
+                for (source, target), items in groups.items():
+                    self._translate_group(items, source, target)
+        finally:
+            self.cache.close()
+
+    def _translate_group(self, items, source, target):
+        texts = list(dict.fromkeys(text for _, text in items))
+        results = self.cache.get_many(texts, source, target)
+        missing = [text for text in texts if text not in results]
+
+        chunk = []
+        for text in missing + [None]:
+            if text is not None and sum(len(t) + 1 for t in chunk) + len(text) < MAX_BATCH_CHARS:
+                chunk.append(text)
+                continue
+            if chunk:
+                try:
+                    translations = self.backend.translate_batch(chunk, source, target)
+                    results.update(zip(chunk, translations))
+                    self.cache.put_many(zip(chunk, translations), source, target)
+                except Exception as e:
+                    print(f"Error traduciendo: {e}")
+                    # Como antes: ante un error se muestra el texto original
+                    results.update((t, t) for t in chunk)
+            chunk = [text] if text is not None else []
+
+        for start, text in items:
+            self.translated.emit(start, text, target, results.get(text, text))
+
+    def stop(self):
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+        self.wait()
@@ -1,22 +1,73 @@
-from PyQt5.QtWidgets import QWidget, QHBoxLayout, QPushButton, QSlider, QLabel, QStyle
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QPushButton, QSlider, QLabel, QStyle
+from PyQt5.QtCore import Qt, QPoint, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
 
 class ProgressSlider(QSlider):
+    # Posición (ms) bajo el ratón para la vista previa
+    hovered = pyqtSignal(int)
+
     def __init__(self, orientation, parent=None):
         super().__init__(orientation, parent)
         self.setMouseTracking(True)
+        self.hover_value = None
+        # Sin miniatura todavía: se vuelve a consultar mientras el ratón siga encima
+        self.preview_pending = False
+        self.init_preview()
+    
+    def init_preview(self):
+        self.preview = QWidget(self, Qt.WindowType.ToolTip)
+        self.preview.setStyleSheet("background-color: #000000;")
+        layout = QVBoxLayout()
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(2)
+        self.preview_image = QLabel()
+        self.preview_image.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.preview_image)
+        self.preview_time = QLabel()
+        self.preview_time.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.preview_time.setStyleSheet("color: white; font-size: 12px;")
+        layout.addWidget(self.preview_time)
+        self.preview.setLayout(layout)
+    
+    def value_at(self, x):
+        return QStyle.sliderValueFromPosition(self.minimum(), self.maximum(), x, self.width())
     
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
-            value = QStyle.sliderValueFromPosition(
-                self.minimum(),
-                self.maximum(),
-                event.pos().x(),
-                self.width()
-            )
+            value = self.value_at(event.pos().x())
             self.setValue(value)
             self.sliderMoved.emit(value)
         super().mousePressEvent(event)
+    
+    def mouseMoveEvent(self, event):
+        if self.maximum() > self.minimum():
+            self.hover_value = self.value_at(event.pos().x())
+            self.hovered.emit(self.hover_value)
+        super().mouseMoveEvent(event)
+    
+    def leaveEvent(self, event):
+        self.hover_value = None
+        self.preview_pending = False
+        self.preview.hide()
+        super().leaveEvent(event)
+    
+    def show_preview(self, image, text):
+        """Miniatura (o solo el tiempo si aún no está indexada) sobre la posición del ratón"""
+        if self.hover_value is None:
+            return
+        self.preview_pending = image is None
+        if image is None:
+            self.preview_image.clear()
+            self.preview_image.hide()
+        else:
+            self.preview_image.setPixmap(QPixmap.fromImage(image))
+            self.preview_image.show()
+        self.preview_time.setText(text)
+        self.preview.adjustSize()
+        x = QStyle.sliderPositionFromValue(self.minimum(), self.maximum(), self.hover_value, self.width())
+        corner = self.mapToGlobal(QPoint(x - self.preview.width() // 2, -self.preview.height() - 6))
+        self.preview.move(corner)
+        self.preview.show()
 
 class Controls(QWidget):
     play_pause_clicked = pyqtSignal()
@@ -24,6 +75,8 @@ class Controls(QWidget):
     volume_changed = pyqtSignal(int)
     position_changed = pyqtSignal(int)
     open_file_clicked = pyqtSignal()
+    previous_clicked = pyqtSignal()
+    next_clicked = pyqtSignal()
     subtitles_toggled = pyqtSignal()
     translation_toggled = pyqtSignal()
 
@@ -56,6 +109,17 @@ class Controls(QWidget):
         self.stop_btn.clicked.connect(self.stop_clicked.emit)
         layout.addWidget(self.stop_btn)
 
+        # Playlist buttons
+        self.previous_btn = QPushButton("Prev")
+        self.previous_btn.setMinimumSize(60, 40)
+        self.previous_btn.clicked.connect(self.previous_clicked.emit)
+        layout.addWidget(self.previous_btn)
+
+        self.next_btn = QPushButton("Next")
+        self.next_btn.setMinimumSize(60, 40)
+        self.next_btn.clicked.connect(self.next_clicked.emit)
+        layout.addWidget(self.next_btn)
+
         # Subtitles button
         self.subtitles_btn = QPushButton("Subtitles")
         self.subtitles_btn.setMinimumSize(50, 40)
@@ -75,6 +139,7 @@ class Controls(QWidget):
         # Progress slider
         self.progress_slider = ProgressSlider(Qt.Orientation.Horizontal)
         self.progress_slider.sliderMoved.connect(self.position_changed.emit)
+        self.progress_slider.hovered.connect(self.update_preview)
         layout.addWidget(self.progress_slider)
 
         # Time label
@@ -151,6 +216,24 @@ class Controls(QWidget):
             }
         """)
 
+    def update_preview(self, value):
+        """Vista previa de la posición bajo el ratón, leída del índice de miniaturas"""
+        image = None
+        thumbnail = self.player.get_thumbnail(value / 1000) if self.player else None
+        if thumbnail is not None:
+            height, width, _ = thumbnail.shape
+            # Copia pequeña de la tira proyectada en memoria: no se decodifica nada. El
+            # QImage no copia los píxeles; data vive hasta que show_preview crea el pixmap
+            data = bytes(thumbnail)
+            image = QImage(data, width, height, 3 * width, QImage.Format_RGB888)
+        self.progress_slider.show_preview(image, self.format_time(value))
+
+    def refresh_preview(self):
+        """Muestra la miniatura en cuanto el índice la rellena"""
+        slider = self.progress_slider
+        if slider.hover_value is not None and slider.preview_pending:
+            self.update_preview(slider.hover_value)
+
     def update_progress(self, position):
         self.progress_slider.setValue(position)
 
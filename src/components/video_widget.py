@@ -1,3 +1,8 @@
+from PyQt5.QtWidgets import QLabel
+import time
+from PyQt5.QtCore import QRect
+from PyQt5.QtGui import QPainter
+
 class VideoWidget:
     def __init__(self):
         self.video_path = None
@@ -11,4 +16,41 @@ class VideoWidget:
             # Logic to render the video on the UI
             pass
         else:
-            raise ValueError("No video loaded. Please load a video first.")
\ No newline at end of file
+            raise ValueError("No video loaded. Please load a video first.")
+
+class VideoSurface(QLabel):
+    """Área de video que pinta directamente los frames ya escalados por el hilo de video"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frame = None
+        # Telemetría del reproductor: se asigna al conectarlo con set_video_output
+        self.telemetry = None
+
+    def set_frame(self, image):
+        self.frame = image
+        self.update()
+
+    def clear_frame(self):
+        self.frame = None
+        self.update()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.frame is None:
+            return
+        started = time.perf_counter()
+        painter = QPainter(self)
+        scale = min(self.width() / self.frame.width(), self.height() / self.frame.height())
+        if scale > 1.01:
+            # Frame convertido a menor resolución por la calidad de servicio: se amplía aquí
+            width, height = int(self.frame.width() * scale), int(self.frame.height() * scale)
+            target = QRect((self.width() - width) // 2, (self.height() - height) // 2, width, height)
+            painter.drawImage(target, self.frame)
+        else:
+            x = (self.width() - self.frame.width()) // 2
+            y = (self.height() - self.frame.height()) // 2
+            painter.drawImage(x, y, self.frame)
+        painter.end()
+        if self.telemetry:
+            self.telemetry.record('paint_ms', (time.perf_counter() - started) * 1000)
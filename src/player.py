@@ -1,190 +1,658 @@
-import cv2
-import numpy as np
-import pygame
-import subprocess
 import os
-import tempfile
+import sys
 import time
 from PyQt5.QtCore import QThread, pyqtSignal
-from PyQt5.QtGui import QImage, QPixmap
-from SubtitleGenerator import SubtitleGenerator
-from deep_translator import GoogleTranslator
+from SyncClock import MasterClock, AVSync
+from PlaybackQoS import QoSPolicy
+from Playlist import Playlist
+from Preloader import MediaPreloader, AUDIO_EXTENSIONS
+from KeyframeIndex import KeyframeIndex, KeyframeIndexThread, SeekWorker
+from MediaCache import MediaCache
+from MediaInfo import MediaInfo
+from SubtitleStore import SubtitleStore
+from Telemetry import Telemetry, TelemetryDump
+from Transcript import Transcript
+from Translator import TranslationWorker
+
+# Decodificación (cv2, numpy), audio (pygame) y transcripción (speech_recognition,
+# pydub, langdetect) se importan la primera vez que se usan: la ventana no los espera
 
 class VideoThread(QThread):
-    change_pixmap_signal = pyqtSignal(QPixmap)
+    """Presenta los frames del anillo según el reloj maestro de sincronización"""
+    frame_ready = pyqtSignal(object)
+    # Se presentó el último frame del archivo
+    playback_finished = pyqtSignal()
     
-    def __init__(self, cap, fps, start_time):
+    def __init__(self, ring, fps, sync, converter, qos=None):
         super().__init__()
-        self.cap = cap
+        self.ring = ring
         self.fps = fps
+        self.sync = sync
+        self.converter = converter
+        self.qos = qos
+        self.telemetry = Telemetry.shared()
         self.is_running = True
-        self.start_time = start_time
     
     def run(self):
         frame_duration = 1.0 / self.fps
+        telemetry = self.telemetry
+        qos = self.qos
         
         while self.is_running:
-            ret, frame = self.cap.read()
-            if not ret:
-                break
-            
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = frame.shape
-            bytes_per_line = ch * w
+            item = self.ring.peek(timeout=frame_duration)
+            if item is None:
+                if self.ring.eof:
+                    self.playback_finished.emit()
+                    break
+                continue
             
-            q_img = QImage(frame.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(q_img)
-            self.change_pixmap_signal.emit(pixmap)
+            slot, pts = item
+            action, delay = self.sync.decide(pts)
             
-            elapsed = time.time() - self.start_time
-            expected_frame = int(elapsed * self.fps)
-            current_frame = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+            if action == AVSync.DROP:
+                # Frame atrasado: se descarta sin convertirlo
+                self.ring.release(presented=False)
+                telemetry.increment('frames_dropped')
+                if qos:
+                    qos.on_late()
+                continue
+            if action == AVSync.WAIT:
+                time.sleep(delay)
+                continue
             
-            if current_frame < expected_frame - 2:
+            if not self.converter.acquire():
+                # La GUI no ha pintado los anteriores: se salta sin convertir
+                self.ring.release(presented=False)
+                telemetry.increment('frames_skipped_gui')
+                if qos:
+                    qos.on_late()
                 continue
-            elif current_frame > expected_frame + 2:
-                time.sleep(frame_duration)
-            else:
-                time.sleep(frame_duration)
+            
+            drift_ms = self.sync.last_drift * 1000
+            telemetry.record('av_drift_ms', abs(drift_ms))
+            if drift_ms < -frame_duration * 500:
+                # Presentado, pero más de medio frame tarde
+                telemetry.increment('frames_late')
+            
+            # Escalado y conversión al tamaño del widget en este hilo
+            started = time.perf_counter()
+            if qos:
+                self.converter.scale = qos.output_scale
+            image = self.converter.convert(self.ring.buffers[slot])
+            self.ring.release()
+            image.emitted_at = time.perf_counter()
+            telemetry.record('convert_ms', (image.emitted_at - started) * 1000)
+            telemetry.increment('frames_presented')
+            if qos:
+                qos.on_presented()
+            self.frame_ready.emit(image)
     
     def stop(self):
         self.is_running = False
         self.wait()
 
 class VideoPlayer:
-    def __init__(self):
+    def __init__(self, decode_backend=None):
+        # Backend de decodificación: 'opencv', 'ffmpeg' o el de REPRODUCTOR_DECODER
+        self.decode_backend = decode_backend
         self.cap = None
         self.is_playing = False
         self.volume = 50
         self.video_thread = None
+        self.frame_ring = None
+        # El anillo llega con los primeros frames del precargador: play() no lo vacía
+        self._ring_primed = False
+        self.frame_decoder = None
+        self.frame_converter = None
+        self.output_size = None
+        # Con fuentes mayores que la ventana se decodifica ya reducido
+        self.decode_downscale = True
+        self.decode_size = None
+        self.keyframe_index = None
+        self.keyframe_thread = None
+        self.seek_worker = None
+        # Miniaturas de la barra de progreso: se sirven de la tira en caché sin decodificar
+        self.thumbnails = None
+        self.thumbnail_builder = None
+        self.audio_player = None
         self.audio_file = None
+        self.current_path = None
+        self.media_cache = MediaCache()
+        self.media_key = None
+        self.media_info = None
+        self.extraction_thread = None
         self.is_audio_only = False
-        self.subtitles = []
+        self.subtitles = SubtitleStore()
         self.subtitle_generator = None
+        self._retired_generators = []
+        self.transcript = None
+        self._transcript_saved_at = 0.0
+        self.translation_worker = TranslationWorker(
+            os.path.join(self.media_cache.root, 'translations.sqlite')
+        )
+        self.translation_worker.translated.connect(self._on_translated)
         self.subtitles_enabled = True
-        self.play_start_time = 0
         self.pause_position = 0
+        self.clock = MasterClock()
+        self.av_sync = None
+        # Degradación escalonada si la máquina no llega a decodificar y pintar a tiempo
+        self.qos = None
+        # Lista de reproducción: mientras suena un archivo se prepara el siguiente
+        self.playlist = Playlist()
+        self.preloader = None
         self.translation_enabled = False
         self.translation_target = 'es'
         self.detected_language = None
-        
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=2048)
+        # El mezclador de pygame se inicia al cargar el primer archivo con audio
+        self.telemetry = Telemetry.shared()
+        self.telemetry_dump = TelemetryDump.from_env(self.telemetry, extra=self.get_playback_stats)
     
     def set_video_output(self, widget):
         self.video_widget = widget
+        widget.telemetry = self.telemetry
+        self.set_output_size(widget.width(), widget.height())
     
-    def _extract_audio(self, video_path):
+    def set_output_size(self, width, height):
+        """El hilo de video entrega los frames ya escalados a este tamaño"""
+        if width > 0 and height > 0:
+            self.output_size = (width, height)
+        if self.frame_converter:
+            self.frame_converter.set_target_size(width, height)
+        if self.cap:
+            self._update_decode_size()
+    
+    def _ensure_frame_converter(self):
+        if self.frame_converter is None:
+            from FrameConverter import FrameConverter
+            self.frame_converter = FrameConverter()
+            if self.output_size:
+                self.frame_converter.set_target_size(*self.output_size)
+        return self.frame_converter
+    
+    def _update_decode_size(self):
+        """Renegocia el tamaño de decodificación si cambia de cubo"""
+        from DecodeBackend import size_bucket
+        size = None
+        if self.decode_downscale and self.output_size:
+            size = size_bucket(self.cap.width, self.cap.height, *self.output_size)
+        if size == self.decode_size:
+            return
+        self.decode_size = size
+        if self.frame_decoder:
+            self.frame_decoder.output_size = size
+    
+    def _release_video(self):
+        if self.seek_worker:
+            self.seek_worker.stop()
+            self.seek_worker = None
+        if self.keyframe_thread:
+            try:
+                self.keyframe_thread.index_ready.disconnect()
+            except (TypeError, RuntimeError):
+                pass
+            self.keyframe_thread = None
+        self.keyframe_index = None
+        if self.thumbnail_builder:
+            self.thumbnail_builder.stop()
+            self.thumbnail_builder = None
+        self.thumbnails = None
+        if self.cap:
+            self.cap.release()
+    
+    def _start_seek_support(self, path, keyframe_index=None):
+        self.seek_worker = SeekWorker(self.cap, self.fps)
+        self.seek_worker.seek_finished.connect(self._on_seek_finished)
+        self.seek_worker.start()
+        
+        self.keyframe_index = keyframe_index or KeyframeIndex.load(self.media_cache, self.media_key)
+        if self.keyframe_index:
+            self.seek_worker.index = self.keyframe_index
+        else:
+            # El índice se construye una vez por archivo y queda en la caché
+            self.keyframe_thread = KeyframeIndexThread(path, self.media_cache, self.media_key)
+            self.keyframe_thread.index_ready.connect(self._on_keyframe_index)
+            self.keyframe_thread.start()
+    
+    def _on_keyframe_index(self, index):
+        self.keyframe_thread = None
+        self.keyframe_index = index
+        if self.seek_worker:
+            self.seek_worker.index = index
+        if self.thumbnail_builder:
+            self.thumbnail_builder.set_keyframe_index(index)
+    
+    def _start_thumbnails(self, path):
+        """Abre la tira de miniaturas del archivo y rellena en segundo plano lo que falte"""
+        duration = self.get_duration()
+        if not self.media_key or duration <= 0:
+            return
+        # numpy solo se carga al abrir un video, no al arrancar
+        from ThumbnailIndex import ThumbnailIndex, ThumbnailBuilder
         try:
-            temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_audio.close()
-            
-            subprocess.run([
-                'ffmpeg', '-i', video_path,
-                '-vn', '-acodec', 'pcm_s16le', 
-                '-ar', '44100', '-ac', '2',
-                '-y', temp_audio.name
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-            
-            return temp_audio.name
-        except:
+            self.thumbnails = ThumbnailIndex.open(
+                self.media_cache, self.media_key, duration, self.cap.width, self.cap.height
+            )
+        except (OSError, ValueError) as e:
+            print(f"Miniaturas no disponibles: {e}")
+            return
+        if self.thumbnails.missing():
+            self.thumbnail_builder = ThumbnailBuilder(
+                path, self.thumbnails, self.media_cache, self.media_key, self.keyframe_index
+            )
+            self.thumbnail_builder.start()
+    
+    def get_thumbnail(self, seconds):
+        """Miniatura RGB para la vista previa de la barra, o None si aún no está indexada"""
+        if not self.thumbnails:
             return None
+        image = self.thumbnails.get(seconds)
+        if image is None and self.thumbnail_builder and self.thumbnail_builder.isRunning():
+            # Se decodifica bajo demanda antes que el resto del barrido
+            self.thumbnail_builder.request(seconds)
+        return image
+    
+    def _stop_generator(self):
+        if self.subtitle_generator:
+            self.subtitle_generator.cancel()
+            for signal in (self.subtitle_generator.subtitle_ready, self.subtitle_generator.chunk_done,
+                           self.subtitle_generator.language_detected,
+                           self.subtitle_generator.segments_ready,
+                           self.subtitle_generator.generation_finished):
+                try:
+                    signal.disconnect()
+                except (TypeError, RuntimeError):
+                    pass
+            # Se conserva la referencia hasta que el hilo termine el fragmento en curso
+            self._retired_generators = [g for g in self._retired_generators if g.isRunning()]
+            self._retired_generators.append(self.subtitle_generator)
+            self.subtitle_generator = None
+    
+    def _release_subtitles(self):
+        self._stop_generator()
+        # Lo transcrito hasta ahora queda guardado para reanudar en la próxima apertura
+        self._save_transcript()
+        self.transcript = None
+    
+    def _load_transcript(self, transcript=None):
+        """Recupera la transcripción guardada: los subtítulos aparecen al instante"""
+        self.transcript = transcript or Transcript.load(self.media_cache, self.media_key) or Transcript()
+        if not self.transcript.cues:
+            return
+        cached = self.transcript.translations.get(self.translation_target, {})
+        for start, end, text, language in self.transcript.cues:
+            self._add_cue(text, start, end, language, cached.get(text))
+        print(f"Transcripción cargada: {len(self.transcript.cues)} subtítulos")
+    
+    def _save_transcript(self):
+        if not self.transcript or not self.media_key:
+            return
+        target = self.translation_target
+        self.transcript.set_translations(target, {
+            original: translation
+            for original, translation, language in zip(
+                self.subtitles.originals, self.subtitles.translations, self.subtitles.languages)
+            if translation and language != target
+        })
+        try:
+            self.transcript.save(self.media_cache, self.media_key)
+        except OSError as e:
+            print(f"Error guardando transcripción: {e}")
+        self._transcript_saved_at = time.monotonic()
+    
+    def _release_audio(self):
+        if self.extraction_thread:
+            self.extraction_thread.cancel()
+            self.extraction_thread = None
+        
+        if self.audio_player:
+            self.audio_player.stop()
+            self.audio_player = None
+        
+        # El audio extraído pertenece a la caché; solo se borra el temporal de respaldo
+        if self.audio_file and not self.is_audio_only and not self.media_key:
+            from AudioExtractor import AudioExtractor
+            AudioExtractor.cleanup(self.audio_file)
+        self.audio_file = None
+        
+        if self.media_key:
+            self.media_cache.unpin(self.media_key)
+            self.media_key = None
 
     def load_video(self, path):
+        # Lo que el precargador ya preparó para este archivo no se vuelve a hacer
+        preloaded = self._take_preloaded(path)
+        # También con solo audio: el reloj y la posición no pasan al siguiente archivo
+        self._halt()
         if self.cap:
-            self.stop()
-            self.cap.release()
+            self._release_video()
         
-        if self.audio_file and os.path.exists(self.audio_file):
-            try:
-                if not self.is_audio_only:
-                    os.unlink(self.audio_file)
-            except:
-                pass
+        self._release_subtitles()
+        self._release_audio()
         
-        self.subtitles = []
+        self.subtitles.clear()
+        self.translation_worker.cancel_pending()
+        # Los histogramas del overlay y del volcado son por archivo
+        self.telemetry.reset()
         self.pause_position = 0
         self.detected_language = None
+        self.current_path = path
+        
+        if preloaded:
+            self.media_key = preloaded.key
+            self.media_info = preloaded.info
+        else:
+            self.media_key = self.media_cache.key_for(path)
+            # Único sondeo del archivo: duración, streams, fps y formato de audio
+            self.media_info = MediaInfo.for_file(path, self.media_cache, self.media_key)
+        self.media_cache.pin(self.media_key)
+        self._load_transcript(preloaded.transcript if preloaded else None)
         
-        file_ext = os.path.splitext(path)[1].lower()
-        if file_ext in ['.mp3', '.wav', '.ogg', '.flac', '.m4a']:
+        if preloaded:
+            audio_only = preloaded.audio_only
+        elif self.media_info:
+            audio_only = not self.media_info.has_video
+        else:
+            audio_only = os.path.splitext(path)[1].lower() in AUDIO_EXTENSIONS
+        
+        from AudioExtractor import AudioPlayer, StreamingAudioPlayer, AUDIO_CACHE_NAME
+        if audio_only:
             self.is_audio_only = True
             self.cap = None
             self.audio_file = path
+            self.audio_player = AudioPlayer()
+            stream = preloaded.take_audio_stream(path) if preloaded else None
             
-            try:
-                pygame.mixer.music.load(self.audio_file)
-                pygame.mixer.music.set_volume(self.volume / 100.0)
+            if self.audio_player.load(self.audio_file, stream):
+                self.audio_player.set_volume(self.volume)
                 self.generate_subtitles()
                 # NO iniciar reproducción automáticamente
-            except Exception as e:
-                print(f"Error cargando audio: {e}")
+            else:
+                print(f"Error cargando audio: {path}")
         else:
             self.is_audio_only = False
-            self.cap = cv2.VideoCapture(path)
-            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+            from DecodeBackend import open_backend
+            from FrameBuffer import FrameRing
+            self._ensure_frame_converter()
+            if preloaded and preloaded.cap:
+                # Captura abierta y primeros frames ya decodificados en el anillo
+                self.cap = preloaded.cap
+                self.frame_ring = preloaded.ring
+                self.frame_ring.grow(FrameRing.capacity_for(self.cap))
+                self._ring_primed = preloaded.frames > 0
+            else:
+                self.cap = open_backend(path, self.decode_backend, self.media_info)
+                self.frame_ring = None
+            self.fps = self.cap.fps
+            self.decode_size = self.cap.output_size
+            self._update_decode_size()
+            self.cap.set_output_size(self.decode_size)
+            if self.frame_ring is None:
+                self.frame_ring = FrameRing.for_capture(self.cap)
+            self.av_sync = AVSync(self.clock, self.fps)
+            self.qos = QoSPolicy(self.cap.supports_skip_nonref)
             
-            self.audio_file = self._extract_audio(path)
-            if self.audio_file:
-                try:
-                    pygame.mixer.music.load(self.audio_file)
-                    pygame.mixer.music.set_volume(self.volume / 100.0)
-                    self.generate_subtitles()
-                    # NO iniciar reproducción automáticamente
-                except:
-                    pass
-
-
+            self._start_seek_support(path, preloaded.keyframe_index if preloaded else None)
+            self._start_thumbnails(path)
+            cached_audio = self.media_cache.get(self.media_key, AUDIO_CACHE_NAME)
+            
+            if self.media_info and not self.media_info.has_audio:
+                # Video mudo: el reloj maestro usa el tiempo de pared
+                self.audio_player = None
+                loaded = False
+            elif cached_audio:
+                # Audio extraído en una apertura anterior: no se ejecuta ffmpeg
+                self.audio_file = cached_audio
+                self.audio_player = AudioPlayer()
+                stream = preloaded.take_audio_stream(cached_audio) if preloaded else None
+                loaded = self.audio_player.load(cached_audio, stream)
+            else:
+                # El audio se lee por tubería: la reproducción no espera a ffmpeg
+                self.audio_player = AudioPlayer()
+                if not self.audio_player.engine:
+                    self.audio_player = StreamingAudioPlayer()
+                stream = preloaded.take_audio_stream(path) if preloaded else None
+                loaded = self.audio_player.load(path, stream)
+            
+            if loaded:
+                self.audio_player.set_volume(self.volume)
+                self.generate_subtitles()
+                # NO iniciar reproducción automáticamente
+        if preloaded:
+            # El stream que no se ha usado (p. ej. video mudo) se cierra aquí
+            preloaded.take_audio_stream(None)
+    
+    def set_playlist(self, paths, index=0):
+        """Sustituye la lista de reproducción y carga el archivo indicado"""
+        self._cancel_preload()
+        self.playlist = Playlist(paths)
+        if self.playlist.current is None:
+            return False
+        self.load_video(self.playlist.select(index))
+        return True
+    
+    def play_next(self):
+        """Pasa al siguiente de la lista; sigue reproduciendo si ya sonaba"""
+        path = self.playlist.advance()
+        if path is None:
+            return False
+        self._switch_to(path)
+        return True
+    
+    def play_previous(self):
+        path = self.playlist.back()
+        if path is None:
+            return False
+        self._switch_to(path)
+        return True
+    
+    def _switch_to(self, path):
+        was_playing = self.is_playing
+        self.load_video(path)
+        if was_playing:
+            self.play()
+    
+    def _on_playback_finished(self):
+        # Sin hueco entre archivos: el siguiente ya está abierto y con frames y audio listos
+        if self.is_playing and self.playlist.peek_next() is not None:
+            self.play_next()
+    
+    def check_playback_finished(self):
+        """Avanza la lista al terminar un archivo de solo audio; True si ha cambiado"""
+        if (self.is_audio_only and self.is_playing and self.audio_player
+                and self.audio_player.finished and self.playlist.peek_next() is not None):
+            self.play_next()
+            return True
+        return False
+    
+    def _preload_next(self):
+        """Prepara en segundo plano el siguiente archivo de la lista"""
+        path = self.playlist.peek_next()
+        if path is None or (self.preloader and self.preloader.path == path):
+            return
+        self._cancel_preload()
+        self.preloader = MediaPreloader(path, self.media_cache, self.decode_backend,
+                                        self.output_size, self.decode_downscale)
+        self.preloader.start()
+    
+    def _take_preloaded(self, path):
+        """Lo precargado para path, esperando a que termine; None si era otro archivo"""
+        preloader, self.preloader = self.preloader, None
+        if preloader is None:
+            return None
+        if preloader.path != path:
+            self._discard_preloader(preloader)
+            return None
+        preloader.wait()
+        return preloader.result
+    
+    def _cancel_preload(self):
+        preloader, self.preloader = self.preloader, None
+        if preloader:
+            self._discard_preloader(preloader)
+    
+    def _discard_preloader(self, preloader):
+        preloader.cancel()
+        preloader.wait()
+        preloader.media.release()
+        if preloader.media.key and preloader.media.key != self.media_key:
+            self.media_cache.unpin(preloader.media.key)
     
     def generate_subtitles(self):
-        if self.audio_file and self.subtitles_enabled:
-            self.subtitles = []
-            self.subtitle_generator = SubtitleGenerator(self.audio_file)
+        if not self.subtitles_enabled:
+            return
+        if self.transcript and self.transcript.finished:
+            # Transcripción completa de una apertura anterior o importada
+            return
+        
+        if self.audio_file:
+            transcript = self.transcript or Transcript()
+            from SubtitleGenerator import SubtitleGenerator
+            # Se transcribe primero alrededor de la posición actual
+            self.subtitle_generator = SubtitleGenerator(
+                self.audio_file, covered=transcript.coverage, language=transcript.language,
+                focus=self.get_current_position(), segments=transcript.segments
+            )
             self.subtitle_generator.subtitle_ready.connect(self.add_subtitle)
+            self.subtitle_generator.chunk_done.connect(self._on_chunk_done)
+            self.subtitle_generator.language_detected.connect(self._on_language_detected)
+            self.subtitle_generator.segments_ready.connect(self._on_segments_ready)
+            self.subtitle_generator.generation_finished.connect(self._on_generation_finished)
             self.subtitle_generator.start()
+        elif self.current_path and not self.is_audio_only:
+            from AudioExtractor import AudioExtractionThread
+            # El WAV completo solo se escribe porque los subtítulos lo necesitan
+            self.extraction_thread = AudioExtractionThread(
+                self.current_path, self.media_cache, self.media_key
+            )
+            self.extraction_thread.audio_ready.connect(self._on_audio_extracted)
+            self.extraction_thread.start()
+    
+    def _on_audio_extracted(self, audio_path):
+        self.extraction_thread = None
+        self.audio_file = audio_path
+        self.generate_subtitles()
+    
+    def _on_chunk_done(self, start, end):
+        if not self.transcript:
+            return
+        self.transcript.mark_covered(start, end)
+        # Ventaja de la transcripción sobre la reproducción; negativa si va por detrás
+        self.telemetry.set_gauge('subtitle_lead_s', round(end - self.get_current_position(), 2))
+        duration = self.get_duration()
+        if duration:
+            self.telemetry.set_gauge('transcription_coverage',
+                                     round(min(1.0, self.transcript.covered_seconds() / duration), 3))
+        if time.monotonic() - self._transcript_saved_at > 5.0:
+            self._save_transcript()
+    
+    def _on_language_detected(self, language):
+        if self.transcript:
+            # Se guarda ya: la identificación no se repite aunque se cierre enseguida
+            self.transcript.language = language
+            self._save_transcript()
+
+    def _on_segments_ready(self, segments):
+        if self.transcript:
+            # La CLI reanuda sobre estos cortes aunque segmente otra extracción del audio
+            self.transcript.segments = segments
+            self._save_transcript()
+    
+    def _on_generation_finished(self):
+        if self.transcript and self.subtitle_generator and self.subtitle_generator.completed:
+            self.transcript.finished = True
+            self._save_transcript()
+    
+    def get_transcription_coverage(self):
+        """Regiones (inicio, fin) en segundos con subtítulos ya generados"""
+        if not self.transcript:
+            return []
+        if self.transcript.finished:
+            return [(0.0, self.get_duration())]
+        return list(self.transcript.coverage)
     
     def add_subtitle(self, text, start_time, end_time, language):
         """Añade un subtítulo con traducción"""
+        if self.transcript:
+            self.transcript.add(text, start_time, end_time, language)
+        self._add_cue(text, start_time, end_time, language)
+        print(f"Subtítulo: [{language}] {text}")
+    
+    def _add_cue(self, text, start_time, end_time, language, translation=None):
         if self.detected_language is None:
             self.detected_language = language
         
-        translated_text = ""
-        if language != self.translation_target:
-            try:
-                # Usar deep-translator en lugar de googletrans
-                translator = GoogleTranslator(source=language, target=self.translation_target)
-                translated_text = translator.translate(text)
-            except Exception as e:
-                print(f"Error traduciendo: {e}")
-                translated_text = text
-        else:
-            translated_text = text
-        
-        self.subtitles.append((text, translated_text, start_time, end_time, language))
-        print(f"Subtítulo: [{language}] {text} | [{self.translation_target}] {translated_text}")
+        # La traducción llega después desde el worker; nunca bloquea la GUI
+        translated_text = text if language == self.translation_target else (translation or "")
+        self.subtitles.add(text, translated_text, start_time, end_time, language)
+        if not translated_text:
+            self.translation_worker.request(start_time, text, language, self.translation_target)
+    
+    def export_subtitles(self, path):
+        """Guarda los subtítulos como SRT o WebVTT según la extensión"""
+        transcript = Transcript()
+        for original, translation, start, end, language in self.subtitles:
+            text = translation if self.translation_enabled and translation else original
+            transcript.add(text, start, end, language)
+        transcript.export(path)
+    
+    def import_subtitles(self, path):
+        """Sustituye la transcripción por un archivo SRT o WebVTT"""
+        imported = Transcript.import_file(path, self.transcript.language if self.transcript else None)
+        self._stop_generator()
+        self.translation_worker.cancel_pending()
+        self.subtitles.clear()
+        self.detected_language = None
+        self.transcript = imported
+        for start, end, text, language in imported.cues:
+            self._add_cue(text, start, end, language)
+        self._save_transcript()
+    
+    def _on_translated(self, start_time, text, target, translation):
+        if target != self.translation_target:
+            return
+        i = self.subtitles.index_of(start_time, text)
+        if i >= 0:
+            self.subtitles.set_translation(i, translation)
+    
+    def _retranslate(self):
+        """Pide el nuevo idioma destino; la caché resuelve lo ya traducido"""
+        self.translation_worker.cancel_pending()
+        for i in range(len(self.subtitles)):
+            language = self.subtitles.languages[i]
+            original = self.subtitles.originals[i]
+            if language == self.translation_target:
+                self.subtitles.set_translation(i, original)
+            else:
+                self.subtitles.set_translation(i, "")
+                self.translation_worker.request(
+                    self.subtitles.starts[i], original, language, self.translation_target
+                )
     
     def get_current_subtitle(self):
         if not self.subtitles_enabled:
             return ""
         
-        current_pos = self.get_current_position()
-        
-        for original, translated, start, end, lang in self.subtitles:
-            if (start - 0.1) <= current_pos <= end:
-                if self.translation_enabled and translated:
-                    return translated
-                return original
+        i = self.subtitles.find(self.get_current_position())
+        if i < 0:
+            return ""
         
-        return ""
+        translated = self.subtitles.translations[i]
+        if self.translation_enabled and translated:
+            return translated
+        return self.subtitles.originals[i]
     
     def toggle_translation(self, target_language='es'):
         """Activa/desactiva la traducción"""
         self.translation_enabled = not self.translation_enabled
         
         if self.translation_enabled:
+            previous_target = self.translation_target
             if self.detected_language == target_language:
                 self.translation_target = 'en' if target_language == 'es' else 'es'
             else:
                 self.translation_target = target_language
+            if self.translation_target != previous_target:
+                self._retranslate()
         
         return self.translation_enabled, self.translation_target
     
@@ -197,102 +665,188 @@ class VideoPlayer:
             return
             
         self.is_playing = True
-        self.play_start_time = time.time() - self.pause_position
+        video = not self.is_audio_only and self.cap
         
-        if not self.is_audio_only and self.cap:
+        if video and self.seek_worker.pending():
+            # Se reanudará cuando termine el seek en curso
+            return
+        
+        # El decodificador llena el anillo mientras el audio precarga
+        if video and self.frame_decoder is None:
+            from FrameBuffer import FrameDecoder
+            if not self._ring_primed:
+                self.frame_ring.reset()
+            self._ring_primed = False
+            self.frame_decoder = FrameDecoder(
+                self.cap, self.frame_ring, self.fps, self.seek_worker.position_frame,
+                self.decode_size, clock=self.clock, qos=self.qos
+            )
+            self.seek_worker.position_frame = None
+            self.frame_decoder.start()
+        
+        # El audio es el reloj maestro; sin audio se usa el tiempo de pared
+        if self.audio_player:
+            self.audio_player.play(self.pause_position)
+            self.clock.set_source(self.audio_player.get_position)
+        else:
+            self.clock.set_source(None)
+        self.clock.start(self.pause_position)
+        
+        if video:
             if self.video_thread is None or not self.video_thread.isRunning():
-                self.video_thread = VideoThread(self.cap, self.fps, self.play_start_time)
-                self.video_thread.change_pixmap_signal.connect(self.update_frame)
+                self.video_thread = VideoThread(
+                    self.frame_ring, self.fps, self.av_sync, self.frame_converter, self.qos
+                )
+                self.video_thread.frame_ready.connect(self.update_frame)
+                self.video_thread.playback_finished.connect(self._on_playback_finished)
                 self.video_thread.start()
-        
-        if self.audio_file:
-            try:
-                if self.pause_position > 0:
-                    pygame.mixer.music.play(start=self.pause_position)
-                else:
-                    pygame.mixer.music.play()
-            except:
-                try:
-                    pygame.mixer.music.play()
-                except:
-                    pass
+        self._preload_next()
     
-    def update_frame(self, pixmap):
+    def update_frame(self, image):
+        # Espera en la cola de eventos de la GUI desde que el hilo emitió el frame
+        self.telemetry.record('emit_ms', (time.perf_counter() - image.emitted_at) * 1000)
         if hasattr(self, 'video_widget'):
-            self.video_widget.setPixmap(pixmap.scaled(
-                self.video_widget.size(),
-                aspectRatioMode=1
-            ))
+            self.video_widget.set_frame(image)
+        self.frame_converter.release()
     
     def pause(self):
-        self.is_playing = False
+        # La posición se toma antes de marcar la pausa; si no, siempre vale la anterior
         self.pause_position = self.get_current_position()
+        self.is_playing = False
+        self.clock.pause()
         
         if self.video_thread:
             self.video_thread.stop()
-        pygame.mixer.music.pause()
+        if self.audio_player:
+            self.audio_player.pause()
     
     def stop(self):
+        self._halt()
+        if self.cap:
+            self.seek_worker.wait_idle()
+            self.cap.set_position(0)
+            self.seek_worker.position_frame = 0
+    
+    def _halt(self):
+        """Detiene video, decodificador y audio sin volver al principio"""
         self.is_playing = False
         self.pause_position = 0
+        self.clock.reset(0)
+        self._ring_primed = False
         
         if self.video_thread:
             self.video_thread.stop()
             self.video_thread = None
-        pygame.mixer.music.stop()
-        
-        if self.cap:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self._stop_decoder()
+        if self.audio_player:
+            self.audio_player.stop()
+    
+    def _stop_decoder(self):
+        # En pausa el decodificador sigue vivo con el anillo lleno; aquí se descarta
+        if self.frame_decoder:
+            self.frame_decoder.stop()
+            self.frame_decoder = None
+    
+    def get_playback_stats(self):
+        """Métricas del anillo de frames: profundidad, underruns, descartes"""
+        stats = {}
+        if self.frame_ring:
+            stats.update(self.frame_ring.stats())
+        if self.av_sync:
+            stats.update(self.av_sync.stats())
+        if self.qos:
+            stats.update(self.qos.stats())
+        stats['gui_skipped'] = self.frame_converter.skipped if self.frame_converter else 0
+        stats['decode_size'] = self.decode_size
+        return stats
+    
+    def get_av_drift(self):
+        """Último desfase medido entre video y audio, en segundos"""
+        return self.av_sync.last_drift if self.av_sync else 0.0
     
     def set_volume(self, volume):
         if volume < 0 or volume > 100:
             raise ValueError("Volume must be between 0 and 100")
         self.volume = volume
-        pygame.mixer.music.set_volume(volume / 100.0)
+        if self.audio_player:
+            self.audio_player.set_volume(volume)
     
     def get_duration(self):
-        if self.is_audio_only:
-            try:
-                sound = pygame.mixer.Sound(self.audio_file)
-                return sound.get_length()
-            except:
-                return 0
-        elif self.cap:
-            frame_count = self.cap.get(cv2.CAP_PROP_FRAME_COUNT)
-            return frame_count / self.fps if self.fps > 0 else 0
+        # Sale del sondeo hecho al cargar: no se vuelve a leer el archivo
+        if self.media_info and self.media_info.duration:
+            return self.media_info.duration
+        if self.cap:
+            return self.cap.frame_count / self.fps if self.fps > 0 else 0
         return 0
     
     def get_current_position(self):
         if not self.is_playing:
             return self.pause_position
         
-        return time.time() - self.play_start_time
+        return self.clock.position()
     
     def seek(self, seconds):
         was_playing = self.is_playing
         
         if self.video_thread:
             self.video_thread.stop()
-        pygame.mixer.music.stop()
+        self._stop_decoder()
+        if self.audio_player:
+            self.audio_player.stop()
         
         self.pause_position = seconds
+        self.clock.reset(seconds)
+        self._ring_primed = False
+        if self.subtitle_generator:
+            self.subtitle_generator.set_focus(seconds)
         
         if self.cap:
-            frame_number = int(seconds * self.fps)
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-        
-        if was_playing:
-            self.play_start_time = time.time() - seconds
+            # Durante el scrubbing solo se decodifica la última posición pedida
+            self.seek_worker.request(seconds)
+        elif was_playing:
+            self.play()
+    
+    def _on_seek_finished(self, seconds):
+        if seconds != self.pause_position:
+            return
+        if self.is_playing:
             self.play()
     
+    def close(self):
+        """Detiene la reproducción y guarda la transcripción antes de salir"""
+        if self.cap or self.is_audio_only:
+            self.stop()
+        self._cancel_preload()
+        if self.thumbnail_builder:
+            # Guarda lo ya indexado para la próxima apertura
+            self.thumbnail_builder.stop()
+            self.thumbnail_builder = None
+        self._release_subtitles()
+        if self.telemetry_dump:
+            self.telemetry_dump.stop()
+    
+    def get_telemetry(self):
+        """Histogramas y contadores acumulados junto a las estadísticas del momento"""
+        snapshot = self.telemetry.snapshot()
+        snapshot['playback'] = self.get_playback_stats()
+        return snapshot
+    
     def __del__(self):
         if self.video_thread:
             self.video_thread.stop()
-        if self.cap:
-            self.cap.release()
-        if self.audio_file and os.path.exists(self.audio_file) and not self.is_audio_only:
-            try:
-                os.unlink(self.audio_file)
-            except:
-                pass
-        pygame.mixer.quit()
\ No newline at end of file
+        self._stop_decoder()
+        self._release_video()
+        try:
+            self._cancel_preload()
+            self._release_subtitles()
+            for generator in self._retired_generators:
+                generator.wait()
+            self.translation_worker.stop()
+            self._release_audio()
+        except (NameError, RuntimeError):
+            # pygame.error deriva de RuntimeError. Al cerrar el intérprete el mezclador,
+            # los hilos de Qt y los builtins pueden haberse destruido ya
+            pass
+        pygame = sys.modules.get('pygame')
+        if pygame:
+            pygame.mixer.quit()
\ No newline at end of file
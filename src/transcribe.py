@@ -0,0 +1,300 @@
+# transcribe.py
+
+"""
+Transcripción por lotes sin interfaz gráfica: genera subtítulos SRT, VTT o JSON
+para directorios o patrones glob de archivos multimedia, repartiendo los archivos
+entre varios procesos.
+
+El estado del trabajo se añade línea a línea al archivo de --state: al relanzar
+el mismo comando se saltan los archivos ya terminados. Las transcripciones a medias
+se guardan en la caché del reproductor y se reanudan desde el último fragmento, y
+el reproductor encuentra allí los subtítulos ya generados.
+
+Uso: python src/transcribe.py VIDEOS/ "archivo/**/*.mkv" [--formats srt vtt json]
+                              [--output-dir subs/] [--processes 4] [--workers 4]
+                              [--rate 10] [--language es-ES] [--state estado.jsonl]
+                              [--report informe.json] [--force]
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Manager
+from MediaCache import MediaCache
+from Transcript import Transcript
+
+MEDIA_EXTENSIONS = ('.mp4', '.avi', '.mkv', '.mov', '.webm', '.mp3', '.wav', '.ogg', '.flac', '.m4a')
+DEFAULT_STATE_NAME = 'transcribe_state.jsonl'
+# Cada cuánto se guarda en la caché la transcripción a medias de un archivo
+SAVE_INTERVAL = 10.0
+
+def collect_media(patterns, extensions=MEDIA_EXTENSIONS):
+    """(archivo, raíz) para cada archivo; la raíz conserva la estructura en --output-dir"""
+    found = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            root = pattern
+            candidates = (os.path.join(d, name) for d, _, names in os.walk(pattern) for name in names)
+        elif glob.has_magic(pattern):
+            # La raíz es la parte del patrón anterior al primer comodín
+            root = os.path.dirname(pattern.split('*')[0].split('?')[0].split('[')[0]) or '.'
+            candidates = glob.iglob(pattern, recursive=True)
+        else:
+            root = os.path.dirname(pattern) or '.'
+            candidates = [pattern]
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(extensions):
+                found.setdefault(os.path.abspath(path), os.path.abspath(root))
+    return sorted(found.items())
+
+def output_paths(media_path, root, formats, output_dir=None):
+    """Salidas junto al archivo o bajo output_dir con la misma estructura de directorios"""
+    base = os.path.splitext(media_path)[0]
+    if output_dir:
+        base = os.path.join(os.path.abspath(output_dir), os.path.relpath(base, root))
+    return {fmt: f"{base}.{fmt}" for fmt in formats}
+
+class JobState:
+    """Registro de archivos terminados: una línea JSON por resultado, la última manda"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Línea cortada por una interrupción a mitad de escritura
+                        continue
+                    self.records[record['path']] = record
+        except OSError:
+            pass
+
+    def is_done(self, media_path, key, outputs):
+        record = self.records.get(media_path)
+        return bool(record and record.get('status') == 'done' and record.get('key') == key
+                    and all(os.path.exists(p) for p in outputs.values()))
+
+    def append(self, record):
+        with self._lock:
+            self.records[record['path']] = record
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def make_recognizer(name):
+    if name == 'fake':
+        from Recognizers import FakeRecognizer
+        return FakeRecognizer(latency=0.05)
+    from Recognizers import GoogleRecognizer
+    return GoogleRecognizer()
+
+def transcribe_file(job, options, progress=None):
+    """Transcribe un archivo en un proceso del pool y escribe sus salidas"""
+    from Transcriber import Transcriber, extract_for_recognition
+
+    started = time.perf_counter()
+    path, key = job['path'], job['key']
+    cache = MediaCache()
+    result = {'path': path, 'key': key, 'outputs': job['outputs']}
+
+    transcript = (Transcript.load(cache, key) if key else None) or Transcript()
+    # Ya transcrito (por otra ejecución o por el reproductor) o a medias
+    cached = transcript.finished
+    resumed = bool(transcript.coverage) and not cached
+    audio_seconds = transcript.coverage[-1][1] if transcript.coverage else 0.0
+    chunks = 0
+    if not transcript.finished:
+        tmp_dir = tempfile.mkdtemp(prefix='transcribe_')
+        try:
+            wav_path = os.path.join(tmp_dir, 'audio.wav')
+            if not extract_for_recognition(path, wav_path):
+                return dict(result, status='failed', error='ffmpeg no pudo extraer el audio',
+                            seconds=round(time.perf_counter() - started, 3))
+
+            saved_at = [time.monotonic()]
+
+            def on_chunk_done(start, end):
+                transcript.mark_covered(start, end)
+                if progress is not None:
+                    progress.put((path, transcriber.done_chunks, transcriber.total_chunks))
+                if key and time.monotonic() - saved_at[0] > SAVE_INTERVAL:
+                    transcript.save(cache, key)
+                    saved_at[0] = time.monotonic()
+
+            def on_language(language):
+                transcript.language = language
+                if key:
+                    transcript.save(cache, key)
+
+            def on_segments(segments):
+                # El reproductor segmenta su propia extracción: ambos reanudan sobre estos cortes
+                transcript.segments = segments
+                if key:
+                    transcript.save(cache, key)
+
+            transcriber = Transcriber(
+                wav_path, recognizer=make_recognizer(options['recognizer']),
+                max_workers=options['workers'], requests_per_second=options['rate'],
+                covered=transcript.coverage, language=transcript.language or options['language'],
+                segments=transcript.segments,
+                on_subtitle=lambda text, start, end, lang: transcript.add(text, start, end, lang),
+                on_chunk_done=on_chunk_done, on_language=on_language, on_segments=on_segments
+            )
+            if transcript.language is None:
+                transcript.language = options['language']
+            # Los mensajes por fragmento de varios procesos a la vez no se leerían
+            with open(os.devnull, 'w') as devnull, \
+                    contextlib.redirect_stdout(sys.stdout if options['verbose'] else devnull):
+                transcript.finished = transcriber.run()
+            chunks = transcriber.done_chunks
+            audio_seconds = transcriber.duration
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if key:
+                transcript.save(cache, key)
+
+    for output in job['outputs'].values():
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        transcript.export(output)
+    return dict(result, status='done', language=transcript.language, cues=len(transcript.cues),
+                chunks=chunks, cached=cached, resumed=resumed, audio_seconds=round(audio_seconds, 3),
+                seconds=round(time.perf_counter() - started, 3))
+
+def _print_progress(progress, names, total):
+    """Muestra el avance de cada archivo cada 10 %"""
+    shown = {}
+    while True:
+        item = progress.get()
+        if item is None:
+            return
+        path, done, chunks = item
+        percent = int(done / chunks * 100) if chunks else 100
+        if percent // 10 > shown.get(path, -1):
+            shown[path] = percent // 10
+            print(f"[{names[path]}/{total}] {os.path.basename(path)}: {percent}% ({done}/{chunks} fragmentos)",
+                  flush=True)
+
+def build_report(results, skipped, elapsed, processes):
+    done = [r for r in results if r['status'] == 'done']
+    audio = sum(r.get('audio_seconds', 0.0) for r in done)
+    chunks = sum(r.get('chunks', 0) for r in done)
+    return {
+        'files': len(results) + skipped,
+        'done': len(done),
+        'failed': len(results) - len(done),
+        'skipped': skipped,
+        'cached': sum(1 for r in done if r.get('cached')),
+        'resumed': sum(1 for r in done if r.get('resumed')),
+        'processes': processes,
+        'seconds': round(elapsed, 3),
+        'audio_seconds': round(audio, 3),
+        # Segundos de audio transcritos por segundo de reloj
+        'realtime_factor': round(audio / elapsed, 2) if elapsed else None,
+        'files_per_hour': round(len(done) / elapsed * 3600, 1) if elapsed else None,
+        'chunks_per_second': round(chunks / elapsed, 2) if elapsed else None,
+        'failures': [{'path': r['path'], 'error': r.get('error')} for r in results if r['status'] != 'done'],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcripción por lotes de archivos multimedia")
+    parser.add_argument('inputs', nargs='+', help="archivos, directorios o patrones glob")
+    parser.add_argument('--formats', nargs='+', choices=['srt', 'vtt', 'json'], default=['srt'])
+    parser.add_argument('--output-dir', default=None)
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--workers', type=int, default=4, help="peticiones simultáneas por archivo")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="peticiones por segundo al reconocedor entre todos los procesos")
+    parser.add_argument('--language', default=None, help="idioma conocido, p. ej. es-ES; si no, se detecta")
+    parser.add_argument('--recognizer', choices=['google', 'fake'], default='google')
+    parser.add_argument('--state', default=None)
+    parser.add_argument('--report', default=None)
+    parser.add_argument('--force', action='store_true', help="repite también los archivos terminados")
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    media = collect_media(args.inputs)
+    if not media:
+        print("No se encontraron archivos multimedia")
+        return 1
+    state = JobState(args.state or os.path.join(args.output_dir or '.', DEFAULT_STATE_NAME))
+    cache = MediaCache()
+    processes = max(1, min(args.processes, len(media)))
+    options = {
+        'workers': args.workers,
+        'rate': args.rate / processes if args.rate else None,
+        'language': args.language,
+        'recognizer': args.recognizer,
+        'verbose': args.verbose,
+    }
+
+    jobs, skipped = [], 0
+    for path, root in media:
+        job = {'path': path, 'key': cache.key_for(path),
+               'outputs': output_paths(path, root, args.formats, args.output_dir)}
+        if not args.force and state.is_done(path, job['key'], job['outputs']):
+            skipped += 1
+            continue
+        jobs.append(job)
+    print(f"{len(media)} archivos: {len(jobs)} pendientes, {skipped} ya terminados; {processes} procesos")
+
+    names = {job['path']: i for i, job in enumerate(jobs, 1)}
+    results = []
+    started = time.perf_counter()
+    with Manager() as manager:
+        progress = manager.Queue()
+        printer = threading.Thread(target=_print_progress, args=(progress, names, len(jobs)), daemon=True)
+        printer.start()
+        pool = ProcessPoolExecutor(max_workers=processes)
+        futures = {pool.submit(transcribe_file, job, options, progress): job for job in jobs}
+        try:
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'path': job['path'], 'key': job['key'], 'status': 'failed', 'error': str(e)}
+                results.append(result)
+                state.append(result)
+                if result['status'] == 'done':
+                    print(f"[{names[job['path']]}/{len(jobs)}] {os.path.basename(job['path'])}: "
+                          f"{result['cues']} subtítulos, {result['audio_seconds']:.0f} s de audio "
+                          f"en {result['seconds']:.0f} s", flush=True)
+                else:
+                    print(f"[{names[job['path']]}/{len(jobs)}] {os.path.basename(job['path'])}: "
+                          f"error: {result.get('error')}", flush=True)
+        except KeyboardInterrupt:
+            # Lo terminado ya está en el estado y lo empezado, en la caché
+            print("Interrumpido: al relanzar se continúa donde se quedó")
+            return 130
+        finally:
+            # cancel_futures no existe en Python 3.8: lo pendiente se cancela a mano
+            for future in futures:
+                future.cancel()
+            pool.shutdown(wait=True)
+            try:
+                progress.put(None)
+            except (OSError, EOFError):
+                # El gestor también recibe la interrupción
+                pass
+            printer.join(timeout=1.0)
+
+    report = build_report(results, skipped, time.perf_counter() - started, processes)
+    print(json.dumps({k: v for k, v in report.items() if k != 'failures'}, indent=2))
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if report['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
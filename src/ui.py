@@ -1,12 +1,15 @@
-from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QFileDialog
+from PyQt5.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QLabel, QFileDialog, QShortcut
 from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont
+from PyQt5.QtGui import QFont, QKeySequence
 from components.controls import Controls
+from components.video_widget import VideoSurface
 
 class UserInterface(QMainWindow):
     def __init__(self, player):
         super().__init__()
         self.player = player
+        # Archivo mostrado en los controles: la lista puede cambiarlo sola al terminar uno
+        self.shown_path = None
         self.timer = QTimer()
         self.initUI()
         self.connect_signals()
@@ -27,7 +30,7 @@ class UserInterface(QMainWindow):
         central_widget.setLayout(layout)
         
         # Video widget
-        self.video_widget = QLabel()
+        self.video_widget = VideoSurface()
         self.video_widget.setStyleSheet("background-color: black;")
         self.video_widget.setAlignment(Qt.AlignCenter)
         self.video_widget.setScaledContents(False)
@@ -50,6 +53,19 @@ class UserInterface(QMainWindow):
         self.title_label.setGeometry(0, 0, 800, 600)
         self.title_label.show()
         
+        # Estadísticas de reproducción sobre el video (F3)
+        self.stats_label = QLabel("", self.video_widget)
+        self.stats_label.setFont(QFont("Monospace", 9))
+        self.stats_label.setStyleSheet("""
+            color: #ff8c00;
+            background-color: rgba(0, 0, 0, 160);
+            padding: 6px;
+        """)
+        self.stats_label.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.stats_label.move(8, 8)
+        self.stats_label.hide()
+        QShortcut(QKeySequence(Qt.Key_F3), self, self.toggle_stats_overlay)
+        
         # Subtítulos
         self.subtitle_label = QLabel("")
         self.subtitle_label.setStyleSheet("""
@@ -75,35 +91,32 @@ class UserInterface(QMainWindow):
         self.timer.start(100)
     
     def resizeEvent(self, event):
-        """Ajustar el título al redimensionar la ventana"""
+        """Ajustar el título y el tamaño de salida del video al redimensionar la ventana"""
         super().resizeEvent(event)
+        self.player.set_output_size(self.video_widget.width(), self.video_widget.height())
         if hasattr(self, 'title_label') and self.title_label.isVisible():
             self.title_label.setGeometry(0, 0, self.video_widget.width(), self.video_widget.height())
     
+    def closeEvent(self, event):
+        """Guardar la transcripción en curso al cerrar la ventana"""
+        self.player.close()
+        super().closeEvent(event)
+    
     def connect_signals(self):
         self.controls.play_pause_clicked.connect(self.toggle_play_pause)
         self.controls.stop_clicked.connect(self.stop)
         self.controls.volume_changed.connect(self.player.set_volume)
         self.controls.position_changed.connect(self.seek_position)
         self.controls.open_file_clicked.connect(self.open_video_file)
+        self.controls.previous_clicked.connect(self.play_previous)
+        self.controls.next_clicked.connect(self.play_next)
         self.controls.subtitles_toggled.connect(self.toggle_subtitles)
         self.controls.translation_toggled.connect(self.toggle_translation)
     
     def toggle_play_pause(self):
         if not self.player.cap and not self.player.is_audio_only:
             # Si no hay video cargado, abrir diálogo
-            file_path, _ = QFileDialog.getOpenFileName(
-                self, "Seleccionar Archivo", "",
-                "Multimedia (*.mp4 *.avi *.mkv *.mov *.mp3 *.wav *.ogg *.flac);;Videos (*.mp4 *.avi *.mkv *.mov);;Audio (*.mp3 *.wav *.ogg *.flac);;Todos (*.*)"
-            )
-            if file_path:
-                self.player.load_video(file_path)
-                duration = self.player.get_duration()
-                self.controls.set_duration(int(duration * 1000))
-                # Ocultar el título al cargar video
-                self.title_label.hide()
-                # NO reproducir automáticamente, solo cambiar el texto del botón
-                self.controls.set_play_pause_text("Play")
+            self.open_video_file()
         else:
             if self.player.is_playing:
                 self.player.pause()
@@ -143,7 +156,50 @@ class UserInterface(QMainWindow):
         else:
             self.controls.translation_btn.setText("Traducir")
     
+    def toggle_stats_overlay(self):
+        if self.stats_label.isVisible():
+            self.stats_label.hide()
+        else:
+            self.update_stats_overlay()
+            self.stats_label.show()
+            self.stats_label.raise_()
+    
+    def update_stats_overlay(self):
+        telemetry = self.player.get_telemetry()
+        histograms = telemetry['histograms']
+        counters = telemetry['counters']
+        gauges = telemetry['gauges']
+        playback = telemetry['playback']
+        
+        lines = []
+        for name in ('decode_ms', 'convert_ms', 'emit_ms', 'paint_ms', 'av_drift_ms', 'recognize_ms'):
+            h = histograms.get(name)
+            if h and h['count']:
+                lines.append(f"{name:<13} p50 {h['p50']:7.2f}  p95 {h['p95']:7.2f}  max {h['max']:8.2f}")
+        lines.append("frames        {} ok  {} tarde  {} descartados  {} sin pintar".format(
+            counters.get('frames_presented', 0), counters.get('frames_late', 0),
+            counters.get('frames_dropped', 0), counters.get('frames_skipped_gui', 0)))
+        decode_size = playback.get('decode_size')
+        decode_size = '{}x{}'.format(*decode_size) if decode_size else 'original'
+        lines.append(f"anillo        {playback.get('depth', 0)}/{playback.get('capacity', 0)}"
+                     f"  decode_size {decode_size}")
+        if 'qos_strategy' in playback:
+            lines.append("qos           {}  {} saltados con grab  {} por tasa".format(
+                playback['qos_strategy'], counters.get('frames_grab_skipped', 0),
+                counters.get('frames_rate_skipped', 0)))
+        if 'transcription_coverage' in gauges:
+            lines.append("subtítulos    {:.0%} transcrito  ventaja {:+.1f} s".format(
+                gauges['transcription_coverage'], gauges.get('subtitle_lead_s', 0.0)))
+        self.stats_label.setText("\n".join(lines))
+        self.stats_label.adjustSize()
+    
     def update_ui(self):
+        if self.stats_label.isVisible():
+            self.update_stats_overlay()
+        self.player.check_playback_finished()
+        self.controls.refresh_preview()
+        if self.player.current_path != self.shown_path:
+            self.show_loaded_media()
         if (self.player.cap or self.player.is_audio_only) and self.player.is_playing:
             current = int(self.player.get_current_position() * 1000)
             duration = int(self.player.get_duration() * 1000)
@@ -155,18 +211,39 @@ class UserInterface(QMainWindow):
             self.subtitle_label.setText(subtitle_text)
     
     def open_video_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(
-            self, "Seleccionar Archivo", "",
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "Seleccionar Archivos", "",
             "Multimedia (*.mp4 *.avi *.mkv *.mov *.mp3 *.wav *.ogg *.flac);;Videos (*.mp4 *.avi *.mkv *.mov);;Audio (*.mp3 *.wav *.ogg *.flac);;Todos (*.*)"
         )
-        if file_path:
+        if file_paths:
             if self.player.cap or self.player.is_audio_only:
                 self.player.stop()
             
-            self.player.load_video(file_path)
-            duration = self.player.get_duration()
-            self.controls.set_duration(int(duration * 1000))
-            # Ocultar el título al cargar
-            self.title_label.hide()
+            # Varios archivos forman la lista de reproducción
+            self.player.set_playlist(file_paths)
+            self.show_loaded_media()
             # NO reproducir automáticamente
-            self.controls.set_play_pause_text("Play")
\ No newline at end of file
+            self.controls.set_play_pause_text("Play")
+    
+    def play_next(self):
+        if self.player.play_next():
+            self.show_loaded_media()
+    
+    def play_previous(self):
+        if self.player.play_previous():
+            self.show_loaded_media()
+    
+    def show_loaded_media(self):
+        """Duración, título y subtítulos del archivo que acaba de cargarse"""
+        self.shown_path = self.player.current_path
+        duration = self.player.get_duration()
+        self.controls.set_duration(int(duration * 1000))
+        self.controls.update_progress(0)
+        self.subtitle_label.setText("")
+        # Ocultar el título al cargar
+        self.title_label.hide()
+        playlist = self.player.playlist
+        if len(playlist) > 1:
+            self.setWindowTitle(f"Video Player [{playlist.index + 1}/{len(playlist)}]")
+        else:
+            self.setWindowTitle('Video Player')
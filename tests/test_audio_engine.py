@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+from src.AudioEngine import AudioEngine, PCMRing
+
+class StubDevice:
+    """Dispositivo sin salida: el test llama al callback a mano"""
+
+    def __init__(self, callback):
+        self.callback = callback
+
+    def pause(self, paused):
+        pass
+
+    def close(self):
+        pass
+
+def ramp_frames(start, count):
+    values = np.arange(start, start + count, dtype=np.int16)
+    return np.column_stack([values, values])
+
+class TestPCMRing(unittest.TestCase):
+
+    def test_wraps_and_seeks_inside_retained_audio(self):
+        ring = PCMRing(seconds=1, lookahead=0.5, rate=100)
+        epoch = ring.reset(0)
+        out = np.empty((30, 2), np.int16)
+        for start in range(0, 150, 30):
+            self.assertTrue(ring.write(ramp_frames(start, 30), epoch))
+            self.assertEqual(ring.read_into(out), 30)
+            self.assertEqual(out[0, 0], start)
+        # Capacidad de 100 frames: lo anterior a 50 ya se ha sobrescrito
+        self.assertTrue(ring.seek(60))
+        self.assertFalse(ring.seek(40))
+        ring.read_into(out)
+        self.assertEqual(out[0, 0], 60)
+
+    def test_stale_writer_is_rejected(self):
+        ring = PCMRing(seconds=1, lookahead=0.5, rate=100)
+        epoch = ring.reset(0)
+        ring.reset(500)
+        self.assertFalse(ring.write(ramp_frames(0, 10), epoch))
+        self.assertEqual(ring.buffered(), 0)
+
+class TestAudioEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = AudioEngine(StubDevice)
+        self.engine.media_path = 'stub'
+        epoch = self.engine.ring.reset(0)
+        self.engine.ring.write(np.full((8192, 2), 1000, np.int16), epoch)
+
+    def pull(self, frames=1024):
+        stream = bytearray(frames * 4)
+        self.engine._callback(None, stream)
+        return np.frombuffer(bytes(stream), np.int16).reshape(-1, 2)
+
+    def test_position_counts_consumed_samples(self):
+        self.engine.set_volume(100)
+        self.engine.playing = True
+        for _ in range(3):
+            self.pull()
+        self.assertEqual(self.engine.ring.read_frame, 3072)
+        self.assertLessEqual(self.engine.position(), 3072 / 44100)
+        self.assertGreaterEqual(self.engine.position(), 2048 / 44100)
+
+        self.engine.pause()
+        self.pull()
+        stopped = self.engine.ring.read_frame
+        # Tras la rampa de salida el anillo no avanza
+        self.assertTrue((self.pull() == 0).all())
+        self.assertEqual(self.engine.ring.read_frame, stopped)
+        self.assertEqual(self.engine.position(), stopped / 44100)
+
+    def test_volume_ramps_inside_the_block(self):
+        self.engine.set_volume(100)
+        self.engine.playing = True
+        block = self.pull()
+        self.assertEqual(block[0, 0], 0)
+        self.assertEqual(block[-1, 0], 1000)
+        self.assertTrue((np.diff(block[:, 0].astype(int)) >= 0).all())
+
+        self.engine.set_volume(50)
+        block = self.pull()
+        self.assertEqual(block[-1, 0], 500)
+
+if __name__ == '__main__':
+    unittest.main()
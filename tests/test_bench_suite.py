@@ -0,0 +1,15 @@
+import unittest
+from benchmarks.bench_suite import compare
+
+class TestBenchSuiteCompare(unittest.TestCase):
+
+    def test_direction_depends_on_metric(self):
+        previous = {'clip.decode.opencv.fps': 100.0, 'clip.seek.opencv.mean_ms': 10.0}
+        current = {'clip.decode.opencv.fps': 70.0, 'clip.seek.opencv.mean_ms': 5.0}
+        regressions = compare(current, previous, tolerance=0.25)
+        self.assertEqual([r['metric'] for r in regressions], ['clip.decode.opencv.fps'])
+
+    def test_within_tolerance_and_new_metrics_pass(self):
+        previous = {'clip.seek.opencv.mean_ms': 10.0}
+        current = {'clip.seek.opencv.mean_ms': 12.0, 'clip.audio.extract_ms': 50.0}
+        self.assertEqual(compare(current, previous, tolerance=0.25), [])
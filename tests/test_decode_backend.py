@@ -0,0 +1,83 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+import numpy as np
+from src.DecodeBackend import OpenCVBackend, FFmpegPipeBackend, open_backend, size_bucket
+
+class TestSizeBucket(unittest.TestCase):
+
+    def test_snaps_to_bucket(self):
+        self.assertEqual(size_bucket(3840, 2160, 1280, 720), (1280, 720))
+        self.assertEqual(size_bucket(3840, 2160, 1100, 700), (1280, 720))
+        self.assertEqual(size_bucket(3840, 2160, 800, 900), (960, 540))
+
+    def test_full_resolution_when_window_is_larger(self):
+        self.assertIsNone(size_bucket(1280, 720, 1920, 1080))
+        self.assertIsNone(size_bucket(3840, 2160, 3840, 2160))
+
+@unittest.skipUnless(shutil.which('ffmpeg'), "ffmpeg no disponible")
+class TestDecodeBackends(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.video_path = os.path.join(cls.tmp_dir, 'clip.mp4')
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-y', '-f', 'lavfi',
+            '-i', 'testsrc2=size=160x120:rate=25:duration=2',
+            '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-g', '10', cls.video_path
+        ], check=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_backends_decode_the_same_frames(self):
+        opencv = OpenCVBackend(self.video_path)
+        ffmpeg = FFmpegPipeBackend(self.video_path)
+        try:
+            for backend in (opencv, ffmpeg):
+                self.assertEqual((backend.width, backend.height, backend.fps), (160, 120, 25.0))
+                self.assertEqual(backend.frame_count, 50)
+            for frame in (0, 23):
+                opencv.set_position(frame)
+                ffmpeg.set_position(frame)
+                _, expected = opencv.read()
+                buffer = np.empty((120, 160, 3), np.uint8)
+                ret, decoded = ffmpeg.read(buffer)
+                self.assertTrue(ret)
+                self.assertIs(decoded, buffer)
+                self.assertLess(np.abs(decoded.astype(int) - expected).mean(), 1.0)
+                self.assertEqual(ffmpeg.position, frame + 1)
+        finally:
+            opencv.release()
+            ffmpeg.release()
+
+    def test_scaled_output(self):
+        for backend in (OpenCVBackend(self.video_path), FFmpegPipeBackend(self.video_path)):
+            backend.set_output_size((80, 60))
+            ret, frame = backend.read()
+            backend.release()
+            self.assertTrue(ret)
+            self.assertEqual(frame.shape, (60, 80, 3))
+
+    def test_skip_nonref_keeps_frame_positions(self):
+        backend = FFmpegPipeBackend(self.video_path)
+        backend.set_skip_nonref(True)
+        frames = 0
+        while backend.read()[0]:
+            frames += 1
+        backend.release()
+        # Los frames descartados se repiten: sigue habiendo uno por cada 1/fps
+        self.assertEqual(frames, 50)
+        self.assertEqual(backend.position, 50)
+
+    def test_unknown_backend_falls_back_to_opencv(self):
+        backend = open_backend(self.video_path, 'desconocido')
+        self.assertIsInstance(backend, OpenCVBackend)
+        backend.release()
+
+if __name__ == '__main__':
+    unittest.main()
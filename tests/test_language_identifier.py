@@ -0,0 +1,86 @@
+import threading
+import unittest
+from langdetect import DetectorFactory
+from src.LanguageIdentifier import LanguageIdentifier
+
+CANDIDATES = ['es-ES', 'en-US', 'fr-FR', 'de-DE', 'it-IT', 'pt-PT', 'ja-JP', 'zh-CN', 'ko-KR', 'ru-RU']
+ENGLISH = "this is a short test sentence about the weather and the city"
+# Lo que escribe un reconocedor forzado al español con voz en inglés: parece español
+FORCED_SPANISH = "el tiempo de la city es short y el weather"
+RUSSIAN = "это короткое тестовое предложение о погоде и о городе"
+
+class CountingRecognizer:
+    """Devuelve el texto de responds_to para cada idioma que entiende"""
+
+    def __init__(self, responds_to):
+        if not isinstance(responds_to, dict):
+            responds_to = {language: ENGLISH for language in responds_to}
+        self.responds_to = responds_to
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, audio_data, language):
+        with self._lock:
+            self.calls.append(language)
+        return self.responds_to.get(language)
+
+class TestLanguageIdentifier(unittest.TestCase):
+
+    def setUp(self):
+        DetectorFactory.seed = 0
+
+    def test_samples_are_spread_across_the_file(self):
+        segments = [(i * 1000, i * 1000 + 500 + (i % 3) * 100) for i in range(30)]
+        picks = LanguageIdentifier.pick_samples(segments, count=3)
+        self.assertEqual(len(picks), 3)
+        self.assertTrue(picks[0] < 10 <= picks[1] < 20 <= picks[2])
+        self.assertNotIn(picks[0], LanguageIdentifier.pick_samples(segments, count=3, exclude={picks[0]}))
+        self.assertEqual(LanguageIdentifier.pick_samples([], count=3), [])
+
+    def test_votes_and_stops_at_quorum(self):
+        recognizer = CountingRecognizer({'en-US'})
+        identifier = LanguageIdentifier(recognizer, CANDIDATES, max_workers=2)
+        language, texts = identifier.identify({0: 'a', 5: 'b', 9: 'c'})
+        self.assertEqual(language, 'en-US')
+        self.assertGreaterEqual(len(texts), 2)
+        self.assertLess(len(recognizer.calls), len(CANDIDATES) * 3)
+
+    def test_text_in_another_language_is_not_a_match(self):
+        # El reconocedor "entiende" en español, pero langdetect ve inglés: cuenta para en-US
+        recognizer = CountingRecognizer({'es-ES', 'en-US'})
+        identifier = LanguageIdentifier(recognizer, CANDIDATES, max_workers=1)
+        language, texts = identifier.identify({0: 'a', 1: 'b', 2: 'c'})
+        self.assertEqual(language, 'en-US')
+        self.assertEqual(set(texts), {0, 1})
+        # Pasada de detección con un idioma por fragmento y una sola confirmación
+        self.assertEqual(recognizer.calls, ['es-ES', 'en-US', 'fr-FR', 'en-US'])
+
+    def test_forced_language_text_does_not_win(self):
+        # Forzado al español, el reconocedor escribe algo que langdetect toma por español
+        recognizer = CountingRecognizer({'es-ES': FORCED_SPANISH, 'en-US': ENGLISH})
+        identifier = LanguageIdentifier(recognizer, CANDIDATES, max_workers=2)
+        language, texts = identifier.identify({0: 'a', 1: 'b', 2: 'c'})
+        self.assertEqual(language, 'en-US')
+        self.assertEqual(set(texts.values()), {ENGLISH})
+        self.assertLessEqual(identifier.requests, LanguageIdentifier.max_requests_for(len(CANDIDATES)))
+
+    def test_nothing_understood(self):
+        identifier = LanguageIdentifier(CountingRecognizer(set()), CANDIDATES[:3])
+        self.assertEqual(identifier.identify({0: 'a'}), (None, {}))
+
+    def test_last_candidate_is_tried(self):
+        # Solo el último idioma de la lista entiende la voz
+        recognizer = CountingRecognizer({'ru-RU': RUSSIAN})
+        identifier = LanguageIdentifier(recognizer, CANDIDATES, max_workers=2)
+        language, texts = identifier.identify({0: 'a', 1: 'b', 2: 'c'})
+        self.assertEqual(language, 'ru-RU')
+        self.assertEqual(set(texts.values()), {RUSSIAN})
+
+    def test_requests_are_capped(self):
+        # Cada candidato se prueba una vez: 4 rondas de 3 muestras y la confirmación
+        self.assertEqual(LanguageIdentifier.max_requests_for(len(CANDIDATES)), 18)
+        recognizer = CountingRecognizer(set())
+        identifier = LanguageIdentifier(recognizer, CANDIDATES, max_workers=4)
+        self.assertEqual(identifier.identify({0: 'a', 1: 'b', 2: 'c'}), (None, {}))
+        self.assertEqual(set(recognizer.calls), set(CANDIDATES))
+        self.assertLessEqual(len(recognizer.calls), 18)
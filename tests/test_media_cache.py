@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from src.MediaCache import MediaCache
+
+class TestMediaCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = MediaCache(root=os.path.join(self.tmp_dir, 'cache'), max_bytes=1000)
+        self.media_path = os.path.join(self.tmp_dir, 'clip.mp4')
+        with open(self.media_path, 'wb') as f:
+            f.write(b'x' * 128)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_put_and_get(self):
+        key = self.cache.key_for(self.media_path)
+        self.assertIsNone(self.cache.get(key, 'audio.wav'))
+        path = self.cache.put_bytes(key, 'audio.wav', b'data')
+        self.assertEqual(self.cache.get(key, 'audio.wav'), path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b'data')
+
+    def test_fingerprint_changes_with_content(self):
+        key = self.cache.key_for(self.media_path)
+        with open(self.media_path, 'wb') as f:
+            f.write(b'y' * 256)
+        self.assertNotEqual(self.cache.key_for(self.media_path), key)
+
+    def test_failed_write_leaves_nothing(self):
+        key = self.cache.key_for(self.media_path)
+        with self.assertRaises(RuntimeError):
+            with self.cache.writer(key, 'audio.wav') as tmp_path:
+                with open(tmp_path, 'wb') as f:
+                    f.write(b'partial')
+                raise RuntimeError("fallo")
+        self.assertIsNone(self.cache.get(key, 'audio.wav'))
+        self.assertEqual(os.listdir(self.cache.entry_dir(key)), [])
+
+    def test_lru_eviction(self):
+        self.cache.put_bytes('aa01', 'audio.wav', b'1' * 400)
+        old = time.time() - 100
+        os.utime(self.cache.path_for('aa01', 'audio.wav'), (old, old))
+        self.cache.put_bytes('bb02', 'audio.wav', b'2' * 400)
+        os.utime(self.cache.path_for('bb02', 'audio.wav'), (old + 10, old + 10))
+        # Acceso reciente: aa01 pasa a ser el más usado
+        self.cache.get('aa01', 'audio.wav')
+        self.cache.put_bytes('cc03', 'audio.wav', b'3' * 400)
+
+        self.assertIsNotNone(self.cache.get('aa01', 'audio.wav'))
+        self.assertIsNone(self.cache.get('bb02', 'audio.wav'))
+        self.assertIsNotNone(self.cache.get('cc03', 'audio.wav'))
+        self.assertLessEqual(self.cache.total_bytes(), 1000)
+
+    def test_writes_under_budget_do_not_walk_the_cache(self):
+        with mock.patch.object(self.cache, '_entries', wraps=self.cache._entries) as entries:
+            # Solo la primera escritura mide la caché; las siguientes ajustan la estimación
+            self.cache.put_bytes('aa01', 'transcript.json', b'1' * 100)
+            for size in (150, 200, 250):
+                self.cache.put_bytes('aa01', 'transcript.json', b'1' * size)
+            self.cache.put_bytes('bb02', 'audio.wav', b'2' * 300)
+            self.assertEqual(entries.call_count, 1)
+            self.assertEqual(self.cache._total, 550)
+
+            self.cache.put_bytes('cc03', 'audio.wav', b'3' * 600)
+            self.assertEqual(entries.call_count, 2)
+        self.assertLessEqual(self.cache._total, 1000)
+        self.assertEqual(self.cache._total, self.cache.total_bytes())
+
+    def test_pinned_entry_survives_eviction(self):
+        self.cache.put_bytes('aa01', 'audio.wav', b'1' * 600)
+        self.cache.pin('aa01')
+        self.cache.put_bytes('bb02', 'audio.wav', b'2' * 600)
+        self.assertIsNotNone(self.cache.get('aa01', 'audio.wav'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import os
+import shutil
+import tempfile
+import unittest
+import wave
+from src.MediaCache import MediaCache
+from src.MediaInfo import MediaInfo
+
+class TestMediaInfo(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = MediaCache(root=os.path.join(self.tmp_dir, 'cache'))
+        self.media_path = os.path.join(self.tmp_dir, 'tone.wav')
+        with wave.open(self.media_path, 'wb') as f:
+            f.setnchannels(2)
+            f.setsampwidth(2)
+            f.setframerate(22050)
+            f.writeframes(b'\0' * 22050 * 4)
+
+    def tearDown(self):
+        MediaInfo._session.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_cached_on_disk_and_in_session(self):
+        key = self.cache.key_for(self.media_path)
+        MediaInfo({'duration': 12.5, 'streams': [
+            {'type': 'video', 'codec': 'h264', 'width': 640, 'height': 360, 'fps': 25.0}
+        ]}).save(self.cache, key)
+
+        info = MediaInfo.for_file(self.media_path, self.cache, key)
+        self.assertEqual(info.duration, 12.5)
+        self.assertEqual(info.frame_count, 312)
+        self.assertTrue(info.has_video)
+        self.assertFalse(info.has_audio)
+        self.assertIs(MediaInfo.for_file(self.media_path, self.cache, key), info)
+
+    @unittest.skipUnless(shutil.which('ffprobe') or shutil.which('ffmpeg'), "ffmpeg no disponible")
+    def test_probe_audio_file(self):
+        info = MediaInfo.probe(self.media_path)
+        self.assertAlmostEqual(info.duration, 1.0, places=2)
+        self.assertFalse(info.has_video)
+        self.assertEqual(info.sample_rate, 22050)
+        self.assertEqual(info.channels, 2)
+        self.assertEqual(info.channel_layout, 'stereo')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+from src.MediaCache import MediaCache
+from src.Playlist import Playlist
+from src.Preloader import MediaPreloader, PRELOAD_AUDIO_MS
+from src.player import VideoPlayer
+
+class TestPlaylist(unittest.TestCase):
+
+    def test_navigation(self):
+        playlist = Playlist(['a.mp4', 'b.mp4', 'c.mp3'])
+        self.assertEqual(playlist.current, 'a.mp4')
+        self.assertEqual(playlist.peek_next(), 'b.mp4')
+        self.assertEqual(playlist.advance(), 'b.mp4')
+        self.assertEqual(playlist.advance(), 'c.mp3')
+        self.assertIsNone(playlist.peek_next())
+        self.assertIsNone(playlist.advance())
+        self.assertEqual(playlist.current, 'c.mp3')
+        self.assertEqual(playlist.back(), 'b.mp4')
+        self.assertEqual(playlist.select(0), 'a.mp4')
+        self.assertIsNone(playlist.back())
+
+    def test_add_to_empty_list(self):
+        playlist = Playlist()
+        self.assertIsNone(playlist.current)
+        playlist.add(['a.mp4'])
+        self.assertEqual(playlist.current, 'a.mp4')
+        with self.assertRaises(IndexError):
+            playlist.select(3)
+
+@unittest.skipUnless(shutil.which('ffmpeg'), "ffmpeg no disponible")
+class TestMediaPreloader(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.video_path = os.path.join(cls.tmp_dir, 'clip.mp4')
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-y', '-f', 'lavfi',
+            '-i', 'testsrc2=size=320x240:rate=25:duration=2',
+            '-f', 'lavfi', '-i', 'sine=frequency=440:duration=2',
+            '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', cls.video_path
+        ], check=True)
+        cls.cache = MediaCache(os.path.join(cls.tmp_dir, 'cache'))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_prepares_capture_frames_and_audio(self):
+        preloader = MediaPreloader(self.video_path, self.cache, output_size=(160, 120))
+        preloader.run()
+        media = preloader.result
+        try:
+            self.assertIsNotNone(media)
+            self.assertEqual(media.key, self.cache.key_for(self.video_path))
+            self.assertEqual(media.decode_size, None)
+            # Medio segundo a 25 fps ya en el anillo; la captura sigue tras ellos
+            self.assertEqual(media.frames, 12)
+            self.assertEqual(media.cap.position, 12)
+            # El anillo solo tiene los buffers que se llenan, al tamaño de decodificación
+            self.assertEqual(media.ring.capacity, 12)
+            self.assertEqual({buffer.shape for buffer in media.ring.buffers}, {media.cap.frame_shape})
+            self.assertAlmostEqual(media.ring.peek(timeout=0)[1], 0.0)
+            self.assertTrue(media.audio_stream.wait_ready(PRELOAD_AUDIO_MS, timeout=5.0))
+            # Otro archivo de audio: el stream precargado no sirve y se cierra
+            stream = media.audio_stream
+            self.assertIsNone(media.take_audio_stream('otro.wav'))
+            self.assertTrue(stream._closed)
+        finally:
+            if media:
+                media.release()
+
+    def test_adopted_ring_grows_keeping_frames(self):
+        preloader = MediaPreloader(self.video_path, self.cache)
+        preloader.run()
+        media = preloader.result
+        try:
+            ring = media.ring
+            for _ in range(2):
+                ring.release()
+            ring.grow(16)
+            self.assertEqual(ring.capacity, 16)
+            self.assertEqual(ring.depth, 10)
+            self.assertAlmostEqual(ring.peek(timeout=0)[1], 2 / 25)
+            # Los huecos nuevos se asignan cuando el decodificador los usa
+            self.assertEqual(ring.buffers[12:], [None] * 4)
+        finally:
+            media.release()
+
+    def test_frames_fit_the_memory_budget(self):
+        frame_bytes = 320 * 240 * 3
+        budget = 3 * frame_bytes + 2 * 1024 ** 2
+        preloader = MediaPreloader(self.video_path, self.cache, budget_bytes=budget)
+        preloader.run()
+        media = preloader.result
+        try:
+            self.assertLessEqual(media.memory_bytes(), budget)
+            self.assertGreaterEqual(media.frames, 1)
+        finally:
+            media.release()
+
+    def test_cancelled_preload_keeps_nothing(self):
+        preloader = MediaPreloader(self.video_path, self.cache)
+        preloader.cancel()
+        preloader.run()
+        self.assertIsNone(preloader.result)
+        self.assertIsNone(preloader.media.cap)
+        self.assertIsNone(preloader.media.audio_stream)
+
+@unittest.skipUnless(shutil.which('ffmpeg'), "ffmpeg no disponible")
+class TestAudioPlaylist(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for name in ('a.wav', 'b.wav'):
+            path = os.path.join(self.tmp_dir, name)
+            subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi',
+                            '-i', 'sine=frequency=440:duration=3', path], check=True)
+            self.paths.append(path)
+        self.player = VideoPlayer()
+        self.player.media_cache = MediaCache(os.path.join(self.tmp_dir, 'cache'))
+
+    def tearDown(self):
+        self.player.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_next_audio_item_starts_from_zero(self):
+        focus = []
+        with mock.patch.object(self.player, 'generate_subtitles',
+                               side_effect=lambda: focus.append(self.player.get_current_position())):
+            self.player.set_playlist(self.paths)
+            self.player.play()
+            # Final del primer archivo: el reloj va por su duración
+            self.player.clock.reset(3.0)
+            self.player.clock.start(3.0)
+            self.player.play_next()
+        self.assertTrue(self.player.is_playing)
+        # Los subtítulos del siguiente se generan desde su principio
+        self.assertEqual(focus, [0, 0])
+        self.assertLess(self.player.get_current_position(), 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import numpy as np
+from src.FrameBuffer import FrameDecoder, FrameRing
+from src.PlaybackQoS import (QoSPolicy, NORMAL, SKIP_NONREF, LOWER_RESOLUTION, REDUCE_RATE,
+                             RECOVER_WINDOWS)
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestQoSPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def run_window(self, policy, presented, late):
+        """Una ventana de un segundo con los frames dados"""
+        for _ in range(presented):
+            policy.on_presented()
+        policy.on_late(late)
+        self.clock.now += 1.0
+        policy.on_presented()
+
+    def test_escalates_after_consecutive_bad_windows(self):
+        policy = QoSPolicy(supports_skip_nonref=True, clock=self.clock)
+        self.run_window(policy, 20, 10)
+        self.assertEqual(policy.level, NORMAL)
+        self.run_window(policy, 20, 10)
+        self.assertEqual(policy.level, SKIP_NONREF)
+        self.assertTrue(policy.skip_nonref)
+        self.run_window(policy, 20, 10)
+        self.run_window(policy, 20, 10)
+        self.assertEqual(policy.level, LOWER_RESOLUTION)
+        self.assertEqual(policy.output_scale, 0.5)
+        for _ in range(4):
+            self.run_window(policy, 20, 10)
+        self.assertEqual(policy.level, REDUCE_RATE)
+        self.assertEqual(policy.frame_step, 2)
+        self.assertEqual(policy.stats()['qos_escalations'], 3)
+
+    def test_unsupported_strategy_is_skipped(self):
+        policy = QoSPolicy(supports_skip_nonref=False, clock=self.clock)
+        self.run_window(policy, 20, 10)
+        self.run_window(policy, 20, 10)
+        self.assertEqual(policy.level, LOWER_RESOLUTION)
+        self.assertFalse(policy.skip_nonref)
+
+    def test_recovery_needs_longer_good_streak(self):
+        policy = QoSPolicy(clock=self.clock)
+        self.run_window(policy, 20, 10)
+        self.run_window(policy, 20, 10)
+        self.assertEqual(policy.level, LOWER_RESOLUTION)
+        for _ in range(RECOVER_WINDOWS - 1):
+            self.run_window(policy, 30, 0)
+        self.assertEqual(policy.level, LOWER_RESOLUTION)
+        self.run_window(policy, 30, 0)
+        self.assertEqual(policy.level, NORMAL)
+
+        # Recae enseguida: la siguiente relajación espera el doble
+        self.run_window(policy, 20, 10)
+        self.run_window(policy, 20, 10)
+        self.assertEqual(policy.level, LOWER_RESOLUTION)
+        for _ in range(RECOVER_WINDOWS):
+            self.run_window(policy, 30, 0)
+        self.assertEqual(policy.level, LOWER_RESOLUTION)
+        for _ in range(RECOVER_WINDOWS):
+            self.run_window(policy, 30, 0)
+        self.assertEqual(policy.level, NORMAL)
+
+    def test_sparse_windows_do_not_count(self):
+        policy = QoSPolicy(clock=self.clock)
+        for _ in range(5):
+            self.run_window(policy, 0, 2)
+        self.assertEqual(policy.level, NORMAL)
+
+class FakeCapture:
+    """Backend que cuenta frames leídos y saltados"""
+    output_size = None
+    accurate_seek = False
+    skip_nonref = False
+    frame_shape = (2, 2, 3)
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.position = 0
+        self.read_frames = []
+        self.grabbed = 0
+
+    def set_output_size(self, size):
+        pass
+
+    def set_skip_nonref(self, enabled):
+        self.skip_nonref = enabled
+
+    def read(self, buffer=None):
+        if self.position >= self.frames:
+            return False, None
+        self.read_frames.append(self.position)
+        self.position += 1
+        return True, np.full(self.frame_shape, self.position - 1, np.uint8)
+
+    def grab(self):
+        if self.position >= self.frames:
+            return False
+        self.position += 1
+        self.grabbed += 1
+        return True
+
+class StoppedClock:
+    is_running = True
+
+    def __init__(self, position):
+        self._position = position
+
+    def position(self):
+        return self._position
+
+class TestFrameDecoderSkipping(unittest.TestCase):
+
+    def decode(self, cap, ring, **kwargs):
+        decoder = FrameDecoder(cap, ring, 10.0, start_index=0, **kwargs)
+        decoder.run()
+        timestamps = []
+        while ring.peek(timeout=0) is not None:
+            timestamps.append(ring.peek(timeout=0)[1])
+            ring.release()
+        return timestamps
+
+    def test_late_frames_are_grabbed_without_retrieving(self):
+        cap = FakeCapture(20)
+        ring = FrameRing(32)
+        # El reloj ya va por el frame 10: los anteriores nunca se presentarían
+        timestamps = self.decode(cap, ring, clock=StoppedClock(1.0))
+        self.assertEqual(cap.grabbed, 11)
+        self.assertEqual(cap.read_frames, list(range(11, 20)))
+        self.assertAlmostEqual(timestamps[0], 1.1)
+        self.assertTrue(ring.eof)
+
+    def test_reduced_rate_and_nonref_follow_policy(self):
+        clock = FakeClock()
+        policy = QoSPolicy(supports_skip_nonref=True, clock=clock)
+        for _ in range(6):
+            policy.on_late(10)
+            clock.now += 1.0
+            policy.on_presented()
+        self.assertEqual(policy.level, REDUCE_RATE)
+        cap = FakeCapture(10)
+        timestamps = self.decode(cap, FrameRing(32), qos=policy)
+        self.assertTrue(cap.skip_nonref)
+        self.assertEqual(cap.read_frames, [0, 2, 4, 6, 8])
+        self.assertEqual([round(t, 1) for t in timestamps], [0.0, 0.2, 0.4, 0.6, 0.8])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,18 @@
+import os
+import unittest
+from benchmarks.bench_startup import measure_once
+
+# Holgado para máquinas lentas de CI; el arranque actual ronda los 150 ms
+STARTUP_BUDGET_MS = float(os.environ.get('REPRODUCTOR_STARTUP_BUDGET_MS', 3000))
+
+class TestStartup(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.result = measure_once()
+
+    def test_heavy_modules_are_deferred(self):
+        self.assertEqual(self.result['loaded'], [])
+
+    def test_time_to_first_window(self):
+        self.assertLess(self.result['total_ms'], STARTUP_BUDGET_MS)
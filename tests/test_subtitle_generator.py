@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import unittest
+import wave
+import numpy as np
+from src.Recognizers import FakeRecognizer
+from src.Segmenter import Segmenter
+from src.SubtitleGenerator import SubtitleGenerator
+
+SAMPLE_RATE = 16000
+
+def write_bursts(path, duration, burst=2.0, gap=0.5):
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = 0.5 * np.sin(2 * np.pi * 220 * t)
+    signal[(t % (burst + gap)) >= burst] = 0
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes((signal * 32767).astype(np.int16).tobytes())
+
+class TestSegmenter(unittest.TestCase):
+
+    def test_absolute_offsets(self):
+        # 1 s de silencio, 1 s de tono, 1 s de silencio, 1 s de tono
+        t = np.arange(4 * SAMPLE_RATE) / SAMPLE_RATE
+        signal = (0.5 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+        signal[(t < 1) | ((t >= 2) & (t < 3))] = 0
+        segments = Segmenter().segment(signal, SAMPLE_RATE)
+        self.assertEqual(segments, [(850, 2150), (2850, 4000)])
+
+    def test_long_speech_is_split(self):
+        t = np.arange(12 * SAMPLE_RATE) / SAMPLE_RATE
+        signal = (0.5 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+        segments = Segmenter().segment(signal, SAMPLE_RATE)
+        self.assertEqual(segments[0], (0, 3000))
+        self.assertTrue(all(end - start <= 3000 for start, end in segments))
+        self.assertEqual(segments[-1][1], 12000)
+
+    def test_silence_only(self):
+        self.assertEqual(Segmenter().segment(np.zeros(SAMPLE_RATE, np.int16), SAMPLE_RATE), [])
+
+class TestSubtitleGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.audio_path = os.path.join(self.tmp_dir, 'speech.wav')
+        write_bursts(self.audio_path, 20)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def generate(self, recognizer, **kwargs):
+        generator = SubtitleGenerator(self.audio_path, recognizer=recognizer, **kwargs)
+        cues = []
+        generator.subtitle_ready.connect(lambda text, start, end, lang: cues.append((start, end, lang)))
+        generator.run()
+        return generator, cues
+
+    def test_parallel_results_in_timeline_order(self):
+        recognizer = FakeRecognizer(
+            latency=0.02, jitter=0.05, seed=3,
+            text_for=lambda audio: "hola esto es una prueba de subtítulos"
+        )
+        generator, cues = self.generate(recognizer, max_workers=4)
+        self.assertEqual(generator.detected_language, 'es-ES')
+        self.assertGreater(len(cues), 4)
+        starts = [start for start, _, _ in cues]
+        self.assertEqual(starts, sorted(starts))
+        self.assertGreater(recognizer.max_concurrent, 1)
+
+    def test_concurrency_limit(self):
+        recognizer = FakeRecognizer(
+            latency=0.01, text_for=lambda audio: "hola esto es una prueba de subtítulos"
+        )
+        self.generate(recognizer, max_workers=2)
+        self.assertLessEqual(recognizer.max_concurrent, 2)
+
+    def test_resume_skips_transcribed_chunks(self):
+        recognizer = FakeRecognizer(text_for=lambda audio: "hola esto es una prueba de subtítulos")
+        generator, cues = self.generate(recognizer, max_workers=2, covered=[(0.0, 10.0)], language='es-ES')
+        self.assertTrue(generator.completed)
+        self.assertTrue(cues)
+        self.assertTrue(all(end > 10.0 for _, end, _ in cues))
+        # Con el idioma ya conocido no se repite la detección
+        self.assertEqual(recognizer.calls, len(cues))
+
+    def test_focus_is_transcribed_first(self):
+        recognizer = FakeRecognizer(latency=0.01, text_for=lambda audio: "hola esto es una prueba de subtítulos")
+        generator, cues = self.generate(recognizer, max_workers=2, language='es-ES', focus=12.0)
+        starts = [start for start, _, _ in cues]
+        self.assertLessEqual(starts[0], 12.0)
+        self.assertGreater(starts[0], 9.0)
+        # Después del foco se rellena el principio del archivo
+        self.assertEqual(sorted(starts), sorted(set(starts)))
+        self.assertIn(min(starts), starts[len(starts) // 2:])
+
+if __name__ == '__main__':
+    unittest.main()
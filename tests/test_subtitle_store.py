@@ -0,0 +1,37 @@
+import unittest
+from src.SubtitleStore import SubtitleStore
+
+class TestSubtitleStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = SubtitleStore()
+        for i in range(100):
+            self.store.add(f"cue {i}", "", i * 2.0, i * 2.0 + 1.5, 'es')
+
+    def test_lookup(self):
+        self.assertEqual(self.store.find(10.5), 5)
+        self.assertEqual(self.store.find(11.8), -1)
+        self.assertEqual(self.store.find(-5), -1)
+        self.assertEqual(self.store.find(500), -1)
+
+    def test_lead_before_start(self):
+        self.assertEqual(self.store.find(9.95), 5)
+
+    def test_sequential_and_seek(self):
+        found = [self.store.find(t / 10) for t in range(0, 2000)]
+        self.assertEqual(found[105], 5)
+        self.assertEqual(self.store.find(150.2), 75)
+        self.assertEqual(self.store.find(3.0), 1)
+
+    def test_out_of_order_insertion(self):
+        store = SubtitleStore()
+        store.add("c", "", 20.0, 22.0, 'es')
+        self.assertEqual(store.find(20.5), 0)
+        store.add("a", "", 0.0, 2.0, 'es')
+        store.add("b", "", 10.0, 12.0, 'es')
+        self.assertEqual([cue[0] for cue in store], ["a", "b", "c"])
+        self.assertEqual(store.originals[store.find(20.5)], "c")
+        self.assertEqual(store.originals[store.find(11.0)], "b")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from src.SyncClock import MasterClock, AVSync, RESYNC_THRESHOLD, SLEW_FACTOR
+
+class FakeTime:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+class FakeAudio:
+    """Posición del audio que devuelve el mezclador, o None si aún no suena"""
+
+    def __init__(self, position=None):
+        self.position = position
+
+    def __call__(self):
+        return self.position
+
+class TestMasterClock(unittest.TestCase):
+
+    def setUp(self):
+        self.time = FakeTime()
+        self.clock = MasterClock(clock=self.time)
+
+    def test_wall_time_without_audio(self):
+        self.clock.start(2.0)
+        self.time.now += 0.5
+        self.assertAlmostEqual(self.clock.position(), 2.5)
+
+    def test_small_error_is_slewed(self):
+        audio = FakeAudio()
+        self.clock.set_source(audio)
+        self.clock.start(0.0)
+        self.time.now += 1.0
+        audio.position = 1.05
+        # 50 ms de error: se corrige una fracción por lectura, sin saltos
+        self.assertAlmostEqual(self.clock.position(), 1.0 + 0.05 * SLEW_FACTOR)
+
+    def test_large_error_resyncs_to_audio(self):
+        audio = FakeAudio()
+        self.clock.set_source(audio)
+        self.clock.start(0.0)
+        self.time.now += 1.0
+        audio.position = 1.0 + RESYNC_THRESHOLD * 2
+        self.assertAlmostEqual(self.clock.position(), audio.position)
+        # La interpolación sigue desde la posición corregida
+        audio.position = None
+        self.time.now += 0.1
+        self.assertAlmostEqual(self.clock.position(), 1.0 + RESYNC_THRESHOLD * 2 + 0.1)
+
+    def test_pause_holds_position(self):
+        self.clock.start(1.0)
+        self.time.now += 0.5
+        self.clock.pause()
+        self.time.now += 10.0
+        self.assertFalse(self.clock.is_running)
+        self.assertAlmostEqual(self.clock.position(), 1.5)
+        self.clock.start(self.clock.position())
+        self.time.now += 0.25
+        self.assertAlmostEqual(self.clock.position(), 1.75)
+
+    def test_reset_stops_at_position(self):
+        self.clock.start(0.0)
+        self.clock.reset(30.0)
+        self.time.now += 5.0
+        self.assertAlmostEqual(self.clock.position(), 30.0)
+
+class FixedClock:
+
+    def __init__(self, position=0.0):
+        self.now = position
+
+    def position(self):
+        return self.now
+
+class TestAVSync(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FixedClock(10.0)
+        # 25 fps: 40 ms por frame, espera por encima de 20 ms y descarte por debajo de -80 ms
+        self.sync = AVSync(self.clock, 25.0)
+
+    def test_frame_on_time_is_presented(self):
+        self.assertEqual(self.sync.decide(10.01), (AVSync.PRESENT, 0.0))
+        self.assertEqual(self.sync.decide(9.93), (AVSync.PRESENT, 0.0))
+        self.assertAlmostEqual(self.sync.last_drift, -0.07)
+        self.assertAlmostEqual(self.sync.max_drift, 0.07)
+
+    def test_early_frame_waits_at_most_one_frame(self):
+        action, delay = self.sync.decide(10.03)
+        self.assertEqual(action, AVSync.WAIT)
+        self.assertAlmostEqual(delay, 0.03)
+        action, delay = self.sync.decide(11.0)
+        self.assertEqual(action, AVSync.WAIT)
+        self.assertAlmostEqual(delay, 0.04)
+
+    def test_late_frame_is_dropped(self):
+        self.assertEqual(self.sync.decide(9.9), (AVSync.DROP, 0.0))
+        # Los descartes no cuentan en el desfase medido
+        self.assertEqual(self.sync.last_drift, 0.0)
+
+    def test_stats_count_each_decision(self):
+        self.sync.decide(10.0)
+        self.sync.decide(10.015)
+        self.sync.decide(10.5)
+        self.sync.decide(9.0)
+        stats = self.sync.stats()
+        self.assertEqual(stats['sync_presented'], 2)
+        self.assertEqual(stats['sync_waits'], 1)
+        self.assertEqual(stats['sync_dropped'], 1)
+        self.assertAlmostEqual(stats['drift_ms'], 15.0)
+        self.assertAlmostEqual(stats['mean_drift_ms'], 0.75)
+        self.sync.reset_stats()
+        self.assertEqual(self.sync.stats()['sync_presented'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
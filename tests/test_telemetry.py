@@ -0,0 +1,52 @@
+import json
+import os
+import tempfile
+import unittest
+from src.Telemetry import Histogram, Telemetry, TelemetryDump
+
+class TestHistogram(unittest.TestCase):
+
+    def test_percentiles_follow_distribution(self):
+        histogram = Histogram()
+        for _ in range(90):
+            histogram.record(1.0)
+        for _ in range(10):
+            histogram.record(100.0)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        # Cubos de un cuarto de octava: el error relativo queda por debajo del 19 %
+        self.assertAlmostEqual(snapshot['p50'], 1.0, delta=0.19)
+        self.assertAlmostEqual(snapshot['p99'], 100.0, delta=19)
+        self.assertEqual(snapshot['max'], 100.0)
+        self.assertAlmostEqual(snapshot['mean'], 10.9)
+
+    def test_extreme_values(self):
+        histogram = Histogram()
+        histogram.record(0.0)
+        histogram.record(1e9)
+        self.assertEqual(histogram.percentile(100), 1e9)
+        self.assertEqual(Histogram().percentile(50), 0.0)
+
+class TestTelemetryDump(unittest.TestCase):
+
+    def test_writes_json_lines(self):
+        telemetry = Telemetry()
+        telemetry.record('decode_ms', 2.0)
+        telemetry.increment('frames_dropped', 3)
+        telemetry.set_gauge('transcription_coverage', 0.5)
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        try:
+            dump = TelemetryDump(telemetry, path, interval=60, extra=lambda: {'depth': 4})
+            dump.write()
+            dump.start()
+            dump.stop()
+            with open(path, encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+        finally:
+            os.unlink(path)
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[0]['histograms']['decode_ms']['count'], 1)
+        self.assertEqual(lines[0]['counters']['frames_dropped'], 3)
+        self.assertEqual(lines[0]['gauges']['transcription_coverage'], 0.5)
+        self.assertEqual(lines[0]['playback'], {'depth': 4})
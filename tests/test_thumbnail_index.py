@@ -0,0 +1,95 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+import numpy as np
+from src.KeyframeIndex import KeyframeIndex
+from src.MediaCache import MediaCache
+from src.ThumbnailIndex import ThumbnailIndex, ThumbnailBuilder, sweep_order, thumbnail_size
+
+class TestThumbnailIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache = MediaCache(os.path.join(self.tmp_dir, 'cache'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_sizes_and_bounded_count(self):
+        self.assertEqual(thumbnail_size(1920, 1080), (160, 90))
+        self.assertEqual(thumbnail_size(1080, 1920), (50, 90))
+        # Tres horas con el máximo de miniaturas: el intervalo crece, la tira no
+        index = ThumbnailIndex.open(self.cache, 'ab' * 20, 3 * 3600, 1920, 1080, max_thumbnails=100)
+        self.assertEqual(index.count, 100)
+        self.assertEqual(index.interval, 108.0)
+        self.assertEqual(index.nbytes, 100 * 160 * 90 * 3)
+
+    def test_filled_thumbnails_survive_reopening(self):
+        key = 'cd' * 20
+        index = ThumbnailIndex.open(self.cache, key, 20.0, 320, 240, interval=5.0)
+        self.assertEqual(index.count, 4)
+        self.assertIsNone(index.get(10.0))
+        index.store(2, np.full((90, 120, 3), 7, np.uint8))
+        index.failed[3] = True
+        index.save(self.cache, key)
+
+        reopened = ThumbnailIndex.open(self.cache, key, 20.0, 320, 240, interval=5.0)
+        self.assertEqual(int(reopened.get(11.0)[0, 0, 0]), 7)
+        self.assertEqual(reopened.missing(), [0, 1])
+        # Otro intervalo no reutiliza la tira
+        other = ThumbnailIndex.open(self.cache, key, 20.0, 320, 240, interval=2.0)
+        self.assertEqual(other.missing(), list(range(10)))
+
+    def test_sweep_goes_coarse_to_fine(self):
+        order = sweep_order(10)
+        self.assertEqual(order[:3], [0, 8, 4])
+        self.assertEqual(sorted(order), list(range(10)))
+
+@unittest.skipUnless(shutil.which('ffmpeg'), "ffmpeg no disponible")
+class TestThumbnailBuilder(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.mkdtemp()
+        cls.video_path = os.path.join(cls.tmp_dir, 'clip.mp4')
+        # Un keyframe cada 4 s
+        subprocess.run([
+            'ffmpeg', '-v', 'error', '-y', '-f', 'lavfi',
+            '-i', 'testsrc2=size=320x240:rate=25:duration=12',
+            '-c:v', 'libx264', '-g', '100', '-sc_threshold', '0', '-pix_fmt', 'yuv420p', cls.video_path
+        ], check=True)
+        cls.cache = MediaCache(os.path.join(cls.tmp_dir, 'cache'))
+        cls.key = cls.cache.key_for(cls.video_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir, ignore_errors=True)
+
+    def test_builds_one_decode_per_keyframe(self):
+        index = ThumbnailIndex.open(self.cache, self.key, 12.0, 320, 240, interval=1.0)
+        builder = ThumbnailBuilder(self.video_path, index, self.cache, self.key,
+                                   KeyframeIndex([0.0, 4.0, 8.0]))
+        builder.run()
+        self.assertEqual(index.missing(), [])
+        self.assertEqual(builder.decodes, 3)
+        # Las miniaturas del mismo GOP comparten imagen
+        np.testing.assert_array_equal(index.get(5.0), index.get(7.0))
+        self.assertEqual(index.get(5.0).shape, (90, 120, 3))
+        self.assertGreater(int(index.get(5.0).max()), 0)
+        self.assertIsNotNone(self.cache.get(self.key, 'thumbnails.json'))
+
+    def test_requested_position_goes_first(self):
+        index = ThumbnailIndex.open(self.cache, 'ef' * 20, 12.0, 320, 240, interval=1.0)
+        builder = ThumbnailBuilder(self.video_path, index)
+        builder.request(9.2)
+        seconds, slots = builder._next_job()
+        self.assertEqual((seconds, slots), (9.0, [9]))
+        # Después, las vecinas; luego el barrido normal
+        self.assertEqual(builder._next_job()[0], 8.0)
+        self.assertEqual(builder._next_job()[0], 10.0)
+        self.assertEqual(builder._next_job()[0], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
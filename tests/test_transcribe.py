@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+from src.Recognizers import FakeRecognizer
+from src.Transcriber import Transcriber
+from src.transcribe import JobState, collect_media, main, output_paths
+from tests.test_subtitle_generator import write_bursts
+
+class TestTranscriber(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.audio_path = os.path.join(self.tmp_dir, 'speech.wav')
+        write_bursts(self.audio_path, 10)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_reports_through_callbacks(self):
+        cues, regions, languages = [], [], []
+        transcriber = Transcriber(
+            self.audio_path, max_workers=2,
+            recognizer=FakeRecognizer(text_for=lambda audio: "hola esto es una prueba de subtítulos"),
+            on_subtitle=lambda text, start, end, lang: cues.append((start, lang)),
+            on_chunk_done=lambda start, end: regions.append((start, end)),
+            on_language=languages.append
+        )
+        self.assertTrue(transcriber.run())
+        self.assertEqual(languages, ['es-ES'])
+        self.assertEqual(len(regions), transcriber.total_chunks)
+        self.assertEqual(len(cues), transcriber.done_chunks)
+        self.assertAlmostEqual(transcriber.duration, 10.0, places=2)
+
+    @unittest.skipUnless(shutil.which('ffmpeg'), "ffmpeg no disponible")
+    def test_resume_reuses_segments_of_another_extraction(self):
+        # El reproductor segmenta 44,1 kHz estéreo; la CLI, 16 kHz mono
+        stereo_path = os.path.join(self.tmp_dir, 'stereo.wav')
+        subprocess.run(['ffmpeg', '-v', 'error', '-y', '-i', self.audio_path, '-ac', '2', '-ar', '44100',
+                        stereo_path], check=True)
+        stored = []
+        first = Transcriber(stereo_path, language='es-ES', on_segments=stored.extend,
+                            recognizer=FakeRecognizer(text_for=lambda audio: "hola"))
+        first.cancel()
+        first.run()
+        self.assertEqual(stored, first.segments)
+        covered = [(0.0, stored[1][1] / 1000.0)]
+
+        regions = []
+        recognizer = FakeRecognizer(text_for=lambda audio: "hola")
+        second = Transcriber(self.audio_path, recognizer=recognizer, language='es-ES',
+                             covered=covered, segments=stored,
+                             on_chunk_done=lambda start, end: regions.append((start, end)))
+        self.assertTrue(second.run())
+        # Los cortes guardados marcan qué falta: nada se repite ni se salta
+        self.assertEqual(second.segments, stored)
+        self.assertEqual(recognizer.calls, len(stored) - 2)
+        self.assertEqual(sorted(regions)[0][0], covered[0][1])
+        self.assertAlmostEqual(sorted(regions)[-1][1], 10.0, places=2)
+
+class TestBatchTranscription(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.media_dir = os.path.join(self.tmp_dir, 'media')
+        os.makedirs(os.path.join(self.media_dir, 'season1'))
+        write_bursts(os.path.join(self.media_dir, 'season1', 'ep1.wav'), 6)
+        write_bursts(os.path.join(self.media_dir, 'ep2.wav'), 6)
+        with open(os.path.join(self.media_dir, 'notes.txt'), 'w') as f:
+            f.write('no es multimedia')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_collect_media_from_directories_and_globs(self):
+        from_dir = collect_media([self.media_dir])
+        self.assertEqual([os.path.basename(p) for p, _ in from_dir], ['ep2.wav', 'ep1.wav'])
+        self.assertTrue(all(root == self.media_dir for _, root in from_dir))
+        from_glob = collect_media([os.path.join(self.media_dir, '**', '*.wav')])
+        self.assertEqual(sorted(p for p, _ in from_glob), sorted(p for p, _ in from_dir))
+
+    def test_output_paths_mirror_structure(self):
+        media = os.path.join(self.media_dir, 'season1', 'ep1.wav')
+        outputs = output_paths(media, self.media_dir, ['srt', 'json'], os.path.join(self.tmp_dir, 'subs'))
+        self.assertEqual(outputs['srt'], os.path.join(self.tmp_dir, 'subs', 'season1', 'ep1.srt'))
+        self.assertEqual(output_paths(media, self.media_dir, ['vtt'])['vtt'],
+                         os.path.join(self.media_dir, 'season1', 'ep1.vtt'))
+
+    def test_job_state_keeps_last_record(self):
+        path = os.path.join(self.tmp_dir, 'state.jsonl')
+        state = JobState(path)
+        state.append({'path': 'a.mp4', 'key': 'k1', 'status': 'failed'})
+        state.append({'path': 'a.mp4', 'key': 'k1', 'status': 'done'})
+        with open(path, 'a') as f:
+            f.write('{"path": "b.mp4", "sta')
+        reloaded = JobState(path)
+        self.assertTrue(reloaded.is_done('a.mp4', 'k1', {}))
+        self.assertFalse(reloaded.is_done('a.mp4', 'k2', {}))
+        self.assertNotIn('b.mp4', reloaded.records)
+
+    @unittest.skipUnless(shutil.which('ffmpeg'), "ffmpeg no disponible")
+    def test_batch_writes_outputs_and_resumes(self):
+        subs = os.path.join(self.tmp_dir, 'subs')
+        report_path = os.path.join(self.tmp_dir, 'report.json')
+        args = [self.media_dir, '--recognizer', 'fake', '--language', 'es-ES', '--processes', '2',
+                '--formats', 'srt', 'json', '--output-dir', subs, '--report', report_path]
+        with mock.patch.dict(os.environ, {'REPRODUCTOR_CACHE_DIR': os.path.join(self.tmp_dir, 'cache')}):
+            self.assertEqual(main(args), 0)
+            with open(report_path) as f:
+                report = json.load(f)
+            self.assertEqual((report['done'], report['failed']), (2, 0))
+            with open(os.path.join(subs, 'season1', 'ep1.json')) as f:
+                self.assertTrue(json.load(f)['cues'])
+            self.assertTrue(os.path.exists(os.path.join(subs, 'ep2.srt')))
+
+            self.assertEqual(main(args), 0)
+            with open(report_path) as f:
+                self.assertEqual(json.load(f)['skipped'], 2)
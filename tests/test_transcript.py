@@ -0,0 +1,62 @@
+import os
+import shutil
+import tempfile
+import unittest
+from src.MediaCache import MediaCache
+from src.Transcript import Transcript, format_timestamp, parse_timestamp
+
+class TestTranscript(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.transcript = Transcript()
+        self.transcript.language = 'es-ES'
+        self.transcript.add("hola", 1.5, 3.25, 'es')
+        self.transcript.add("adiós\nsegunda línea", 3661.0, 3662.5, 'es')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_timestamps(self):
+        self.assertEqual(format_timestamp(3661.5), "01:01:01,500")
+        self.assertEqual(format_timestamp(1.25, '.'), "00:00:01.250")
+        self.assertAlmostEqual(parse_timestamp("01:01:01,500"), 3661.5)
+        self.assertAlmostEqual(parse_timestamp("02:03.040"), 123.04)
+
+    def test_srt_and_vtt_round_trip(self):
+        for content in (self.transcript.to_srt(), self.transcript.to_vtt()):
+            parsed = Transcript.parse(content, 'es-ES')
+            self.assertEqual(parsed.cues, self.transcript.cues)
+            self.assertTrue(parsed.finished)
+
+    def test_coverage_merges_regions(self):
+        transcript = Transcript()
+        transcript.mark_covered(10.0, 12.0)
+        transcript.mark_covered(0.0, 2.0)
+        transcript.mark_covered(12.0, 15.0)
+        self.assertEqual(transcript.coverage, [(0.0, 2.0), (10.0, 15.0)])
+        transcript.mark_covered(1.0, 11.0)
+        self.assertEqual(transcript.coverage, [(0.0, 15.0)])
+        self.assertEqual(transcript.covered_seconds(), 15.0)
+
+    def test_save_and_load(self):
+        cache = MediaCache(root=os.path.join(self.tmp_dir, 'cache'))
+        media_path = os.path.join(self.tmp_dir, 'clip.mp4')
+        with open(media_path, 'wb') as f:
+            f.write(b'x' * 128)
+        key = cache.key_for(media_path)
+        self.assertIsNone(Transcript.load(cache, key))
+
+        self.transcript.mark_covered(0.0, 12.0)
+        self.transcript.set_translations('en', {"hola": "hello"})
+        self.transcript.save(cache, key)
+
+        loaded = Transcript.load(cache, key)
+        self.assertEqual(loaded.cues, self.transcript.cues)
+        self.assertEqual(loaded.language, 'es-ES')
+        self.assertEqual(loaded.coverage, [(0.0, 12.0)])
+        self.assertEqual(loaded.translations, {'en': {"hola": "hello"}})
+        self.assertFalse(loaded.finished)
+
+if __name__ == '__main__':
+    unittest.main()
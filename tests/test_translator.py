@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from PyQt5.QtCore import Qt
+from src.Translator import TranslationWorker, FakeTranslator
+
+class RecordingTranslator(FakeTranslator):
+    """Traductor falso que guarda los textos de cada petición"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def translate_batch(self, texts, source, target):
+        self.batches.append((list(texts), target))
+        return super().translate_batch(texts, source, target)
+
+class TestTranslationWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.tmp_dir, 'translations.sqlite')
+        self.workers = []
+
+    def tearDown(self):
+        for worker in self.workers:
+            worker.stop()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_worker(self, batch_size=25):
+        backend = RecordingTranslator()
+        worker = TranslationWorker(self.cache_path, backend=backend, batch_size=batch_size)
+        worker.results = []
+        worker.done = threading.Condition()
+
+        def on_translated(start, text, target, translation):
+            with worker.done:
+                worker.results.append((start, text, target, translation))
+                worker.done.notify_all()
+
+        # Conexión directa: la señal se atiende en el hilo del worker, sin bucle de eventos
+        worker.translated.connect(on_translated, Qt.ConnectionType.DirectConnection)
+        self.workers.append(worker)
+        return worker, backend
+
+    def wait_results(self, worker, count, timeout=5.0):
+        with worker.done:
+            self.assertTrue(worker.done.wait_for(lambda: len(worker.results) >= count, timeout))
+        return worker.results
+
+    def test_batches_are_capped_at_batch_size(self):
+        worker, backend = self.make_worker(batch_size=25)
+        # Con la condición tomada el worker no puede sacar nada: la cola se llena entera
+        with worker._cond:
+            for i in range(60):
+                worker.request(float(i), f"frase {i}", 'es', 'en')
+        results = self.wait_results(worker, 60)
+        self.assertEqual([len(texts) for texts, _ in backend.batches], [25, 25, 10])
+        self.assertIn((3.0, 'frase 3', 'en', '[en] frase 3'), results)
+
+    def test_cached_translations_skip_the_backend(self):
+        worker, backend = self.make_worker()
+        worker.request(0.0, "hola", 'es', 'en')
+        self.wait_results(worker, 1)
+        worker.stop()
+
+        # Otro worker sobre la misma base: la traducción sale de la caché
+        worker, backend = self.make_worker()
+        worker.request(5.0, "hola", 'es', 'en')
+        results = self.wait_results(worker, 1)
+        self.assertEqual(results, [(5.0, 'hola', 'en', '[en] hola')])
+        self.assertEqual(backend.requests, 0)
+
+    def test_cancel_pending_drops_queued_items(self):
+        worker, backend = self.make_worker()
+        with worker._cond:
+            for i in range(5):
+                worker.request(float(i), f"vieja {i}", 'es', 'en')
+            worker.cancel_pending()
+            worker.request(10.0, "nueva", 'es', 'en')
+        results = self.wait_results(worker, 1)
+        time.sleep(0.2)
+        self.assertEqual(results, [(10.0, 'nueva', 'en', '[en] nueva')])
+        self.assertEqual(backend.texts, 1)
+
+    def test_target_change_translates_only_missing_entries(self):
+        worker, backend = self.make_worker()
+        worker.request(0.0, "uno", 'es', 'fr')
+        self.wait_results(worker, 1)
+        with worker._cond:
+            worker.request(0.0, "uno", 'es', 'en')
+            worker.request(1.0, "dos", 'es', 'en')
+        self.wait_results(worker, 3)
+
+        # Vuelta al francés: solo falta "dos"
+        with worker._cond:
+            worker.cancel_pending()
+            worker.request(0.0, "uno", 'es', 'fr')
+            worker.request(1.0, "dos", 'es', 'fr')
+        results = self.wait_results(worker, 5)
+        self.assertEqual(backend.batches[-1], (['dos'], 'fr'))
+        self.assertEqual(backend.requests, 3)
+        self.assertEqual(results[-2:], [(0.0, 'uno', 'fr', '[fr] uno'), (1.0, 'dos', 'fr', '[fr] dos')])
+
+if __name__ == '__main__':
+    unittest.main()